@@ -43,6 +43,11 @@ description:
     - A group named 'MaagedSystems' gets created with all the Power Server Managed by the HMC
       and Power Server grouping features enables only when `group_lpars_by_managed_system` option set to false
       in the dynamic inventory playbook.
+    - The partitions and Power Servers retrieved from the HMCs can be cached with the inventory cache
+      options, repeated runs within I(cache_timeout) are then served without contacting the HMCs.
+      Use C(--flush-cache) to force a refresh.
+extends_documentation_fragment:
+    - inventory_cache
 
 options:
     hmc_hosts:
@@ -145,6 +150,48 @@ options:
             - This is not valid for Power Servers.
         default: omit
         type: str
+    max_workers:
+        description:
+            - Maximum number of HMCs queried concurrently.
+            - Hosts and groups are added in the order of I(hmc_hosts) regardless of which HMC answers first.
+        default: 4
+        type: int
+    max_workers_per_hmc:
+        description:
+            - Maximum number of Power Servers of a single HMC whose partitions are fetched concurrently.
+            - Lower this value if the HMC throttles concurrent REST requests.
+        default: 4
+        type: int
+    incremental_refresh:
+        description:
+            - Requires I(cache). Instead of serving the cached inventory as is, the Power Servers are listed from
+              every HMC and only the partitions of the Power Servers whose quick properties changed since the cached
+              snapshot are fetched again, the others are reused from the cache.
+            - Changes within a partition that do not change the Power Server quick properties, for example a new
+              RMC IP address, are picked up once the partitions are older than I(incremental_max_age).
+        default: false
+        type: bool
+    incremental_max_age:
+        description:
+            - Maximum age in seconds of the cached partitions of a Power Server reused by I(incremental_refresh).
+        default: 3600
+        type: int
+    referenced_fields_only:
+        description:
+            - Only valid with I(advanced_fields).
+            - Keeps only the LPAR/VIOS properties referenced in I(compose), I(groups), I(keyed_groups) and I(filters),
+              along with the properties needed to identify the partitions, instead of every property of the partition XML.
+              This reduces the memory used by the plugin and the size of the cached inventory.
+        default: false
+        type: bool
+    fields:
+        description:
+            - Only valid with I(advanced_fields).
+            - List of LPAR/VIOS property names to retain from the partition XML, along with the properties needed to
+              identify the partitions. Combined with the referenced properties when I(referenced_fields_only) is set.
+            - All properties are retained when neither I(fields) nor I(referenced_fields_only) is set.
+        type: list
+        elements: str
 '''
 
 EXAMPLES = '''
@@ -271,8 +318,13 @@ system_groups:
 '''
 
 import xml.etree.ElementTree as ET
+import io
+import re
 import json
 import sys
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from ansible.plugins.inventory import BaseInventoryPlugin, Constructable, Cacheable
 from ansible.module_utils.six import string_types, viewitems, reraise
 from ansible.errors import AnsibleParserError
@@ -291,6 +343,10 @@ LOG_FILENAME = "/tmp/ansible_power_hmc.log"
 logger = logging.getLogger(__name__)
 
 
+ATOM_ENTRY = "{http://www.w3.org/2005/Atom}entry"
+FIELD_NAME_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+
 def init_logger():
     logging.basicConfig(
         filename=LOG_FILENAME,
@@ -322,6 +378,11 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
 
         self.group_prefix = 'power_hmc_'
         self.template_handle = None
+        self.lpar_fields = None
+        self.tag_lookup = {}
+        # previous snapshot and fingerprints of the systems, used by incremental_refresh
+        self.previous_systems = {}
+        self.system_states = {}
 
     def verify_file(self, path):
         """
@@ -341,7 +402,59 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
 
         self.template_handle = Templar(loader=loader)
         self._configure(path)
-        self._populate_from_systems(self.get_lpars_by_system())
+        self._populate_from_systems(self.get_systems(path, cache))
+
+    def get_systems(self, path, cache=True):
+        """
+        Return the systems with their partitions from the inventory cache, or from the HMCs on a cache miss
+        """
+        cache_key = self.get_cache_key(path)
+        user_cache_setting = self.get_option('cache')
+        # cache is False when the user asked for --flush-cache
+        attempt_to_read_cache = user_cache_setting and cache
+        cache_needs_update = user_cache_setting and not cache
+
+        state_key = cache_key + '_state'
+        self.previous_systems = {}
+        self.system_states = {}
+
+        systems = None
+        if attempt_to_read_cache and self.incremental_refresh:
+            # Only systems whose fingerprint changed since the cached snapshot are fetched again
+            self.previous_systems = self.load_previous_systems(self._cache.get(cache_key), self._cache.get(state_key))
+            cache_needs_update = True
+        elif attempt_to_read_cache:
+            try:
+                systems = self._cache[cache_key]
+                logger.debug("Inventory served from cache %s", cache_key)
+            except KeyError:
+                cache_needs_update = True
+
+        if systems is None:
+            systems = self.get_lpars_by_system()
+
+        if cache_needs_update:
+            self._cache[cache_key] = systems
+            if self.incremental_refresh:
+                self._cache[state_key] = self.system_states
+        return systems
+
+    def load_previous_systems(self, systems, states):
+        previous = {}
+        if not systems or not states:
+            return previous
+        for system in systems:
+            state = states.get(system.get('UUID'))
+            if state:
+                previous[system['UUID']] = dict(state, system=system)
+        return previous
+
+    def system_fingerprint(self, system):
+        # The quick properties of a Power Server (state, available memory and processor units...)
+        # change whenever partitions are created, removed or resized on it
+        excluded = system.get("SystemName") in self.exclude_system
+        fields = sorted(self.lpar_fields) if self.lpar_fields is not None else None
+        return hashlib.sha1(json.dumps([system, self.advanced_fields, fields, excluded], sort_keys=True).encode('utf-8')).hexdigest()
 
     def _populate_from_systems(self, systems):
         invalid_identify_unknown_by = False
@@ -350,7 +463,7 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             raise HmcError("There are no systems defined to any valid HMCs provided or no valid connections were established.")
         for system in systems:
             if self.ms_should_be_included(system):
-                for lpar in system["lpars"]:
+                for lpar in system.get("lpars", []):
                     if self.lpar_should_be_included(lpar):
                         try:
                             # Lookup the IP address for LPAR
@@ -403,8 +516,9 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                             logger.debug("Attribute not found in the lpar")
                             continue
 
-                # Creating a group of managed systems
-                del system['lpars']
+                # Creating a group of managed systems, the lpars are left out of the system
+                # variables without modifying the (possibly cached) system data
+                system = dict((key, value) for key, value in system.items() if key != 'lpars')
                 try:
                     ms_ip = system['IPAddress']
                     ms_name = system['SystemName']
@@ -446,90 +560,124 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         if self.template_handle.is_template(self.get_option('hmc_hosts')):
             self.hmc_hosts = self.template_handle.template(variable=self.get_option('hmc_hosts'))
 
-        for hmc_host in self.hmc_hosts:
+        # executor.map returns the results in hmc_hosts order, which keeps the
+        # generated hosts and groups in the same order from run to run
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for hmc_systems in executor.map(self.get_lpars_by_hmc, self.hmc_hosts):
+                systems.extend(hmc_systems)
+        return systems
+
+    def get_lpars_by_hmc(self, hmc_host):
+        systems = []
+        try:
+            hmc = str(hmc_host['hmc'])
+            hmc_username = str(hmc_host['user'])
+            hmc_pass = str(hmc_host['password'])
+            rest_conn = HmcRestClient(hmc, hmc_username, hmc_pass)
             try:
-                hmc = str(hmc_host['hmc'])
-                hmc_username = str(hmc_host['user'])
-                hmc_pass = str(hmc_host['password'])
-                rest_conn = HmcRestClient(hmc, hmc_username, hmc_pass)
+                managed_systems = json.loads(rest_conn.getManagedSystemsQuick())
+                associated_groups = rest_conn.fetchTaggedGroupMembership()
+            except Exception:
+                logger.debug("Could not retrieve systems from %s it may not have any defined", hmc)
+                return systems
+
+            def _fetch(system):
+                fingerprint = self.system_fingerprint(system)
+                previous = self.previous_systems.get(system.get('UUID'))
+                if previous and previous['fingerprint'] == fingerprint and time.time() - previous['fetched'] < self.incremental_max_age:
+                    logger.debug("%s unchanged, reusing cached partitions", system.get("SystemName"))
+                    self.system_states[system['UUID']] = {'fingerprint': fingerprint, 'fetched': previous['fetched']}
+                    return self.reuse_lpars_of_system(previous['system'], system, hmc, hmc_username, associated_groups)
+                system = self.get_lpars_of_system(rest_conn, system, hmc, hmc_username, associated_groups)
+                if system.get('UUID'):
+                    self.system_states[system['UUID']] = {'fingerprint': fingerprint, 'fetched': time.time()}
+                return system
+
+            with ThreadPoolExecutor(max_workers=self.max_workers_per_hmc) as executor:
+                systems.extend(executor.map(_fetch, managed_systems))
+            # Logoff HMC
+            try:
+                rest_conn.logoff()
+            except Exception as del_error:
+                error_msg = parse_error_response(del_error)
+                logger.debug(error_msg)
+                traceback = sys.exc_info()[2]
+                reraise(HmcError, "Error logging off HMC REST Service: %s" % error_msg, traceback)
+        except Exception as error:
+            error_msg = parse_error_response(error)
+            msg = ("Unable to connect to HMC host %s: %s" % (hmc_host, error_msg))
+            display.warning(msg=msg)
+            logger.debug(msg)
+        return systems
+
+    def get_lpars_of_system(self, rest_conn, system, hmc, hmc_username, associated_groups):
+        lpars = []
+        if system.get("SystemName") not in self.exclude_system:
+            # Make calls to full XML APIs which have access to a few additional fields
+            # Note: This call takes nearly 10x as long because it must reach out to each system individually
+            if self.advanced_fields:
+                system_name = system.get("SystemName")
                 try:
-                    managed_systems = json.loads(rest_conn.getManagedSystemsQuick())
-                    associated_groups = rest_conn.fetchTaggedGroupItems()
+                    lpar_xml = rest_conn.getLogicalPartitions(system.get("UUID"))
+                    system_lpars = self.parse_lpars_xml(lpar_xml, hmc, hmc_username, system_name, associated_groups)
+                    lpars.extend(system_lpars)
                 except Exception:
-                    logger.debug("Could not retrieve systems from %s it may not have any defined", hmc)
-                    continue
-
-                for system in managed_systems:
-                    lpars = []
-                    if system.get("SystemName") not in self.exclude_system:
-                        # Make calls to full XML APIs which have access to a few additional fields
-                        # Note: This call takes nearly 10x as long because it must reach out to each system individually
-                        if self.advanced_fields:
-                            system_name = system.get("SystemName")
-                            try:
-                                lpar_xml = rest_conn.getLogicalPartitions(system.get("UUID"))
-                                system_lpars = self.parse_lpars_xml(lpar_xml, hmc, hmc_username, system_name, associated_groups)
-                                lpars.extend(system_lpars)
-                            except Exception:
-                                logger.debug("Could not retrieve LPARs from %s it may not have any defined", system_name)
-                            try:
-                                vios_xml = rest_conn.getVirtualIOServers(system.get("UUID"))
-                                system_vios = self.parse_lpars_xml(vios_xml, hmc, hmc_username, system_name, associated_groups)
-                                lpars.extend(system_vios)
-                            except Exception:
-                                logger.debug("Could not retrieve VIOS from %s it may not have any defined", system_name)
-                        # Call the "quick" JSON API
-                        else:
-                            try:
-                                system_lpars = json.loads(rest_conn.getLogicalPartitionsQuick(system.get("UUID")))
-                                for system_lpar in system_lpars:
-                                    system_lpar['AssociatedGroups'] = self.fetch_associated_groups(system_lpar['UUID'], associated_groups)
-                                    system_lpar['AssociatedHMC'] = hmc
-                                    system_lpar['AssociatedHMCUserName'] = hmc_username
-                                    system_lpar['SystemName'] = system.get("SystemName")
-                                lpars.extend(system_lpars)
-                            except Exception:
-                                logger.debug("Could not retrieve LPARs from %s it may not have any defined", system.get("SystemName"))
-                            try:
-                                system_vios = json.loads(rest_conn.getVirtualIOServersQuick(system.get("UUID")))
-                                for vios in system_vios:
-                                    vios['AssociatedGroups'] = self.fetch_associated_groups(vios['UUID'], associated_groups)
-                                    vios['AssociatedHMC'] = hmc
-                                    vios['AssociatedHMCUserName'] = hmc_username
-                                    vios['SystemName'] = system.get("SystemName")
-                                lpars.extend(system_vios)
-                            except Exception:
-                                logger.debug("Could not retrieve VIOS from %s it may not have any defined", system.get("SystemName"))
-                        system['AssociatedGroups'] = self.fetch_associated_groups(system['UUID'], associated_groups)
-                    system['AssociatedHMC'] = hmc
-                    system['AssociatedHMCUserName'] = hmc_username
-                    system["lpars"] = lpars
-                    systems.append(system)
-                # Logoff HMC
+                    logger.debug("Could not retrieve LPARs from %s it may not have any defined", system_name)
                 try:
-                    rest_conn.logoff()
-                except Exception as del_error:
-                    error_msg = parse_error_response(del_error)
-                    logger.debug(error_msg)
-                    traceback = sys.exc_info()[2]
-                    reraise(HmcError, "Error logging off HMC REST Service: %s" % error_msg, traceback)
-            except Exception as error:
-                error_msg = parse_error_response(error)
-                msg = ("Unable to connect to HMC host %s: %s" % (hmc_host, error_msg))
-                display.warning(msg=msg)
-                logger.debug(msg)
-                continue
-        return systems
+                    vios_xml = rest_conn.getVirtualIOServers(system.get("UUID"))
+                    system_vios = self.parse_lpars_xml(vios_xml, hmc, hmc_username, system_name, associated_groups)
+                    lpars.extend(system_vios)
+                except Exception:
+                    logger.debug("Could not retrieve VIOS from %s it may not have any defined", system_name)
+            # Call the "quick" JSON API
+            else:
+                try:
+                    system_lpars = json.loads(rest_conn.getLogicalPartitionsQuick(system.get("UUID")))
+                    for system_lpar in system_lpars:
+                        system_lpar['AssociatedGroups'] = self.fetch_associated_groups(system_lpar['UUID'], associated_groups)
+                        system_lpar['AssociatedHMC'] = hmc
+                        system_lpar['AssociatedHMCUserName'] = hmc_username
+                        system_lpar['SystemName'] = system.get("SystemName")
+                    lpars.extend(system_lpars)
+                except Exception:
+                    logger.debug("Could not retrieve LPARs from %s it may not have any defined", system.get("SystemName"))
+                try:
+                    system_vios = json.loads(rest_conn.getVirtualIOServersQuick(system.get("UUID")))
+                    for vios in system_vios:
+                        vios['AssociatedGroups'] = self.fetch_associated_groups(vios['UUID'], associated_groups)
+                        vios['AssociatedHMC'] = hmc
+                        vios['AssociatedHMCUserName'] = hmc_username
+                        vios['SystemName'] = system.get("SystemName")
+                    lpars.extend(system_vios)
+                except Exception:
+                    logger.debug("Could not retrieve VIOS from %s it may not have any defined", system.get("SystemName"))
+            system['AssociatedGroups'] = self.fetch_associated_groups(system['UUID'], associated_groups)
+        system['AssociatedHMC'] = hmc
+        system['AssociatedHMCUserName'] = hmc_username
+        system["lpars"] = lpars
+        return system
+
+    def reuse_lpars_of_system(self, previous_system, system, hmc, hmc_username, associated_groups):
+        # Tagged groups are fetched on every run, refresh them on the cached partitions
+        id_key = 'id' if self.advanced_fields else 'UUID'
+        lpars = []
+        for previous_lpar in previous_system.get("lpars", []):
+            lpar = dict(previous_lpar)
+            if id_key in lpar and (associated_groups or not self.advanced_fields):
+                lpar['AssociatedGroups'] = self.fetch_associated_groups(lpar[id_key], associated_groups)
+            lpars.append(lpar)
+        if system.get("SystemName") not in self.exclude_system:
+            system['AssociatedGroups'] = self.fetch_associated_groups(system['UUID'], associated_groups)
+        system['AssociatedHMC'] = hmc
+        system['AssociatedHMCUserName'] = hmc_username
+        system["lpars"] = lpars
+        return system
 
     def parse_lpars_xml(self, xml, hmc, hmcusername, system_name, associated_groups=None):
         if associated_groups is None:
             associated_groups = {}
-        root = ET.fromstring(xml)
-        feed = next(root.iter())
-        entries = feed.findall("{http://www.w3.org/2005/Atom}entry")
         lpars = []
-        for entry in entries:
-            lpar = self.get_tag_text(entry)
+        for lpar in self.iter_lpars_xml(xml, self.lpar_fields):
             lpar['AssociatedHMC'] = hmc
             lpar['AssociatedHMCUserName'] = hmcusername
             lpar['SystemName'] = system_name
@@ -538,6 +686,29 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             lpars.append(lpar)
         return lpars
 
+    def iter_lpars_xml(self, xml, fields=None):
+        """
+        Stream the entries of a LogicalPartition or VirtualIOServer feed and yield one flattened dict per entry.
+        Each entry is dropped from the tree once flattened, so the full feed tree is never held in memory.
+        """
+        if isinstance(xml, str):
+            xml = xml.encode('utf-8')
+        source = io.BytesIO(xml) if isinstance(xml, bytes) else xml
+        context = ET.iterparse(source, events=('start', 'end'))
+        event, root = next(context)
+        depth = 0
+        for event, elem in context:
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            # Only the entries directly under the feed describe partitions
+            if depth == 0 and elem.tag == ATOM_ENTRY:
+                lpar = self.flatten_entry(elem, fields)
+                root.remove(elem)
+                elem.clear()
+                yield lpar
+
     def _configure(self, path):
         config = self._read_config_data(path)
 
@@ -559,9 +730,17 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
             advanced_fields=dict(type='bool', value=config.get("advanced_fields", False)),
             group_lpars_by_managed_system=dict(type='bool', value=config.get("group_lpars_by_managed_system", True)),
             identify_unknown_by=dict(type='str', value=config.get("identify_unknown_by", "omit")),
+            max_workers=dict(type='int', value=config.get("max_workers", 4)),
+            max_workers_per_hmc=dict(type='int', value=config.get("max_workers_per_hmc", 4)),
+            incremental_refresh=dict(type='bool', value=config.get("incremental_refresh", False)),
+            incremental_max_age=dict(type='int', value=config.get("incremental_max_age", 3600)),
+            referenced_fields_only=dict(type='bool', value=config.get("referenced_fields_only", False)),
+            fields=dict(type='list', value=config.get("fields", [])),
         )
 
         self.validate_and_set_args(args)
+        self.lpar_fields = self.get_lpar_fields()
+        self.tag_lookup = {}
 
     def validate_and_set_args(self, args):
         for arg in args:
@@ -585,6 +764,10 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
                     setattr(self, arg, args[arg].get("value"))
                 else:
                     raise AnsibleParserError("%s must be a boolean value. Current value is: %s" % (arg, args[arg].get("value")))
+            elif args[arg]["type"] == 'int':
+                if isinstance(args[arg].get("value"), bool) or not isinstance(args[arg].get("value"), int) or args[arg].get("value") < 1:
+                    raise AnsibleParserError("%s must be a positive integer. Current value is: %s" % (arg, args[arg].get("value")))
+                setattr(self, arg, args[arg].get("value"))
             elif args[arg]["type"] == 'list':
                 if not isinstance(args[arg].get("value"), list):
                     raise AnsibleParserError("%s is currently %s and needs to be defined as a %s." % (arg, args[arg].get("value"), 'list'))
@@ -620,16 +803,59 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
     def get_lpar_os_type(self, lpar):
         return lpar["PartitionType"]
 
-    def get_tag_text(self, e):
+    def flatten_entry(self, entry, fields=None):
+        """
+        Flattens the text of the leaf elements of a partition entry into a dict keyed by tag name,
+        walking the entry once without building intermediate dicts.
+        Property names are looked up by qualified tag in tag_lookup, which is filled as new tags
+        are met and maps tags that are not retained to None. It is shared across entries for the
+        configured lpar_fields.
+        """
         lpar_data = {}
-        for child in e:
+        tag_lookup = self.tag_lookup if fields is self.lpar_fields else {}
+        stack = list(reversed(entry))
+        while stack:
+            child = stack.pop()
             if child.text is None or child.text.strip() == "":
-                lpar_data.update(self.get_tag_text(child))
-            else:
-                tag = child.tag.split("}")[-1]
-                lpar_data[tag] = child.text
+                stack.extend(reversed(child))
+                continue
+            try:
+                name = tag_lookup[child.tag]
+            except KeyError:
+                name = child.tag.split("}")[-1]
+                if fields is not None and name not in fields:
+                    name = None
+                tag_lookup[child.tag] = name
+            if name is not None:
+                lpar_data[name] = child.text
         return lpar_data
 
+    def get_lpar_fields(self):
+        """
+        LPAR properties to retain from the partition XML, None to retain all of them
+        """
+        if not self.fields and not self.referenced_fields_only:
+            return None
+        fields = set(['id', 'PartitionName', 'PartitionType', 'PartitionState', 'ResourceMonitoringIPAddress', self.identify_unknown_by])
+        fields.update(self.fields)
+        if self.referenced_fields_only:
+            fields.update(self.get_referenced_fields())
+        return fields
+
+    def get_referenced_fields(self):
+        """
+        Names of the LPAR properties possibly used by compose, groups, keyed_groups and filters
+        """
+        fields = set()
+        expressions = list(self.compose.values()) + list(self.groups.values())
+        for keyed_group in self.keyed_groups:
+            expressions.append(keyed_group.get('key', '') if isinstance(keyed_group, dict) else keyed_group)
+        for expression in expressions:
+            if isinstance(expression, string_types):
+                fields.update(FIELD_NAME_RE.findall(expression))
+        fields.update(self.filters.keys())
+        return fields
+
     def is_lpar_excluded(self, lpar):
         if "ResourceMonitoringIPAddress" in lpar and lpar["ResourceMonitoringIPAddress"] in self.exclude_ip:
             # LPAR excluded due to IP address
@@ -665,8 +891,5 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         return False
 
     def fetch_associated_groups(self, id, tagged_groups):
-        grps = []
-        for group_name, group_ele in tagged_groups.items():
-            if id in group_ele:
-                grps.append(group_name)
-        return grps
+        # tagged_groups maps each member uuid to its group names (fetchTaggedGroupMembership)
+        return list(tagged_groups.get(id, []))
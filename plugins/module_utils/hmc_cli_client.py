@@ -2,8 +2,11 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 import logging
 import os
+import time
+import hashlib
 from collections import OrderedDict
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_file_cache import private_directory
 logger = logging.getLogger(__name__)
 
 
@@ -24,51 +27,127 @@ def resolve_return_code(rc):
         return "Unknown issue"
 
 
+def command_error(status_code, stdout, stderr):
+    stderr = stderr.replace("\n", "").replace("\r", "").replace("\\", "")
+    stdout = stdout.replace("\r", "").replace("..|", "\n").replace("../", "\n").replace("..-", "\n").replace("\\", "\n").replace("...", "")
+    stdout = "".join(list(OrderedDict.fromkeys(stdout.split("\n"))))
+    errMsg = None
+    if stdout not in (None, '') and stderr:
+        errMsg = stdout + " ERROR MSG => " + stderr
+    elif stdout not in (None, ''):
+        errMsg = stdout
+    else:
+        errMsg = stderr
+    if not errMsg:
+        return HmcError(resolve_return_code(status_code))
+    else:
+        return HmcError(errMsg)
+
+
+BATCH_DELIMITER = '__ANSIBLE_POWER_HMC_STATUS__ '
+SSH_CONTROL_PERSIST = 0
+# Same per user directory as the ssh connection plugin of Ansible, kept short so that
+# the socket paths stay within the length limit of unix sockets
+SSH_CONTROL_DIR = os.path.join(os.path.expanduser('~'), '.ansible', 'cp')
+
+
 class HmcCliConnection:
 
     ##
     # Constructor for HmcCliConnection
     #
-    def __init__(self, module, ip, username, password):
+    def __init__(self, module, ip, username, password, control_persist=None):
         self.ip = ip
         self.pwd = password
         self.user = username
         self.module = module
 
-    def execute(self, cmd):
-        stderr = None
-        stdout = None
+        # Commands can share one multiplexed SSH connection per HMC and user, kept open for
+        # control_persist seconds after its last use, so that only the first command pays
+        # the SSH handshake and authentication, also across the tasks of a play. It is off
+        # unless enabled through ANSIBLE_POWER_HMC_SSH_CONTROL_PERSIST or control_persist,
+        # and stays off when the socket directory could be reached by other users
+        if control_persist is None:
+            control_persist = os.environ.get('ANSIBLE_POWER_HMC_SSH_CONTROL_PERSIST', SSH_CONTROL_PERSIST)
+        if str(control_persist) in ['False', 'false', 'FALSE', 'no', 'No', 'NO']:
+            control_persist = 0
+        self.control_persist = int(control_persist)
+        self.control_path = None
+        if self.control_persist > 0:
+            if private_directory(SSH_CONTROL_DIR):
+                key = hashlib.sha1('{0}@{1}'.format(username, ip).encode('utf-8')).hexdigest()[:10]
+                self.control_path = os.path.join(SSH_CONTROL_DIR, key)
+            else:
+                logger.debug("SSH connection multiplexing disabled, %s is not private to the user", SSH_CONTROL_DIR)
+        self.command_timings = []
 
+    def ssh_options(self):
+        if not self.control_path:
+            return ''
+        return " -o ControlMaster=auto -o ControlPath='{0}' -o ControlPersist={1}s ".format(self.control_path, self.control_persist)
+
+    def ssh_command(self, cmd):
         host_key_ignore = ''
         # This env 'ANSIBLE_HOST_KEY_CHECKING' only will work in case if it is set as environment variable
         # All other options like from ansible config file or inventory file wont work
         if os.environ.get('ANSIBLE_HOST_KEY_CHECKING') in ['False', 'false', 'FALSE', '0', 'no', 'No', 'NO']:
             host_key_ignore = ' -o StrictHostKeyChecking=no '
 
-        logger.debug("COMMAND: %s", cmd)
+        ssh_options = host_key_ignore + self.ssh_options()
         if self.pwd:
-            ssh_hmc_cmd = "sshpass -p  '{0}' ssh '{1}'@{2} {3} '{4}'".format(self.pwd, self.user, self.ip, host_key_ignore, cmd)
+            ssh_hmc_cmd = "sshpass -p  '{0}' ssh '{1}'@{2} {3} '{4}'".format(self.pwd, self.user, self.ip, ssh_options, cmd)
         else:
-            ssh_hmc_cmd = "ssh '{0}'@{1} {2} '{3}'".format(self.user, self.ip, host_key_ignore, cmd)
+            ssh_hmc_cmd = "ssh '{0}'@{1} {2} '{3}'".format(self.user, self.ip, ssh_options, cmd)
+        return ssh_hmc_cmd
 
+    def run(self, cmd, name):
+        ssh_hmc_cmd = self.ssh_command(cmd)
         logger.debug(ssh_hmc_cmd)
+        reused = bool(self.control_path) and os.path.exists(self.control_path)
+        start = time.time()
         status_code, stdout, stderr = self.module.run_command(ssh_hmc_cmd, use_unsafe_shell=True)
+        elapsed = time.time() - start
+        self.command_timings.append({'cmd': name, 'elapsed': elapsed, 'reused': reused})
+        logger.debug("COMMAND TIME: %.3fs (%s connection)", elapsed, 'reused' if reused else 'new')
+        return status_code, stdout, stderr
+
+    def execute(self, cmd):
+        logger.debug("COMMAND: %s", cmd)
+        status_code, stdout, stderr = self.run(cmd, cmd.split(' ', 1)[0])
 
         if status_code != 0:
-            stderr = stderr.replace("\n", "").replace("\r", "").replace("\\", "")
-            stdout = stdout.replace("\r", "").replace("..|", "\n").replace("../", "\n").replace("..-", "\n").replace("\\", "\n").replace("...", "")
-            stdout = "".join(list(OrderedDict.fromkeys(stdout.split("\n"))))
-            errMsg = None
-            if stdout not in (None, '') and stderr:
-                errMsg = stdout + " ERROR MSG => " + stderr
-            elif stdout not in (None, ''):
-                errMsg = stdout
-            else:
-                errMsg = stderr
-            if not errMsg:
-                raise HmcError(resolve_return_code(status_code))
-            else:
-                raise HmcError(errMsg)
+            raise command_error(status_code, stdout, stderr)
 
         logger.debug("COMMAND RESULT: %s", stdout)
         return stdout
+
+    def execute_batch(self, cmds, raise_on_error=True):
+        """Run cmds one after the other in a single SSH invocation.
+
+        The output of each command, stderr included, is followed by a delimiter line
+        carrying its exit status. Returns a (status_code, stdout) tuple per command.
+        Unless raise_on_error is False, HmcError is raised for the first failed command.
+        """
+        logger.debug("COMMANDS: %s", cmds)
+        batch_cmd = ' '.join('{0} 2>&1; echo "{1}$?";'.format(cmd, BATCH_DELIMITER) for cmd in cmds)
+        status_code, stdout, stderr = self.run(batch_cmd, ','.join(cmd.split(' ', 1)[0] for cmd in cmds))
+
+        results = []
+        output = []
+        for line in stdout.splitlines(True):
+            # a command output without trailing newline puts the delimiter at the end of its last line
+            head, delimiter, result_code = line.partition(BATCH_DELIMITER)
+            output.append(head)
+            if delimiter:
+                results.append((int(result_code), ''.join(output)))
+                output = []
+        if len(results) != len(cmds):
+            # The SSH session failed before running every command
+            raise command_error(status_code or 255, ''.join(output), stderr)
+
+        if raise_on_error:
+            for result_code, result in results:
+                if result_code != 0:
+                    raise command_error(result_code, result, '')
+        logger.debug("COMMAND RESULTS: %s", results)
+        return results
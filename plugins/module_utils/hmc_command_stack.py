@@ -10,6 +10,13 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import re
+
+# One field of an HMC attribute list and its separating comma. The field is either
+# double quoted, with "" standing for a literal double quote and commas kept, or
+# runs up to the next comma
+HMC_CSV_FIELD = re.compile(r'(")([^"]*(?:""[^"]*)*)(?:"|\Z)([^,]*),?|([^,]*),?')
+
 
 class HmcCommandStack():
 
@@ -32,6 +39,7 @@ class HmcCommandStack():
                'CHHWRES': 'chhwres',
                'LSHWRES': 'lshwres',
                'MIGRLPAR': 'migrlpar',
+               'LSLPARMIGR': 'lslparmigr',
                'LPAR_NETBOOT': 'lpar_netboot',
                'LSREFCODE': 'lsrefcode',
                'VIOSVRCMD': 'viosvrcmd',
@@ -303,6 +311,10 @@ class HmcCommandStack():
                                 '--ALL': ' --all',
                                 '--ID': ' --id ',
                                 '-W': ' -w '},
+                   'LSLPARMIGR': {'-R': {'LPAR': ' -r lpar'},
+                                  '-M': ' -m ',
+                                  '-F': ' -F ',
+                                  '--FILTER': {'LPAR_NAMES': 'lpar_names', 'LPAR_IDS': 'lpar_ids'}},
                    'LPAR_NETBOOT': {'-A': ' -A',
                                     '-M': ' -M',
                                     '-D': ' -D',
@@ -329,6 +341,7 @@ class HmcCommandStack():
                                   '--PASSWD': ' --passwd ',
                                   '--TEST': ' --test'},
                    'LSHMCUSR': {'-T': {'DEFAULT': ' -t default ', 'USER': ' -t user '},
+                                '-F': ' -F ',
                                 '--FILTER': {'NAMES': 'names', 'RESOURCES': 'resources',
                                              'RESOURCEROLES': 'resourceroles', 'TASKROLES': 'taskroles',
                                              'PASSWORD_ENCRYPTIONS': 'password_encryptions'}},
@@ -466,153 +479,66 @@ class HmcCommandStack():
             innerDict.update({keyvalue[0].upper(): keyvalue[1]})
         return innerDict
 
+    def splitCSV(self, csvData):
+        # Single pass over the comma separated fields of an HMC attribute list,
+        # returning (field, quoted) pairs with the quoting removed. The scan ends
+        # with an empty match at the end of the data, which is only a field of its
+        # own after a trailing comma
+        matches = HMC_CSV_FIELD.findall(csvData)
+        if csvData and not csvData.endswith(','):
+            matches.pop()
+        fields = []
+        for quote, quotedText, trailing, plainText in matches:
+            if quote:
+                fields.append((quotedText.replace('""', '"') + trailing, True))
+            else:
+                fields.append((plainText, False))
+        return fields
+
     def parseCSV(self, csvData, userConfig=None):
         if userConfig and '-F' in userConfig:
             return self.parseAttributes(userConfig['-F'], csvData)
 
         dict = {}
-        key_bkup = ""
-        value_bkup = ""
-        valueHasColonDelim = False
-        caseLshmccert = False
-        csvList = csvData.split(',')
-        csvIter = iter(csvList)
-        next(csvIter)
-        prevdata = ""
-        for each in csvList:
-            if csvIter.__length_hint__():
-                nextdata = next(csvIter)
-            else:
-                nextdata = ""
-            try:
-                if valueHasColonDelim:
-                    if '=' not in each:
-                        value_bkup += ',' + each
-                        continue
-                    if ': ' in each and '=' not in each.split(': ')[0]:
-                        value_bkup += ',' + each
-                        if nextdata == "":
-                            dict[key_bkup].append(self.parseColonSV(value_bkup))
-                        continue
-                    # To handle colon seperated data which starts with double quote
-                    if ': ' in each and '""' in each[0: 2]:
-                        if value_bkup:
-                            dict[key_bkup].append(self.parseColonSV(value_bkup))
-
-                        value_bkup = each.strip('""')
-                        continue
-                    # To handle simple colon seperated data
-                    if ': ' in each:
-                        if value_bkup:
-                            dict[key_bkup].append(self.parseColonSV(value_bkup))
-
-                        value_bkup = ""
-                        # Identifying the end of colon data
-                        if ': ' not in nextdata and '=' in nextdata:
-                            dict[key_bkup].append(self.parseColonSV(each))
-                            valueHasColonDelim = False
-                            continue
-                    # To confirm that the colon data finised, here handling
-                    #  the next non colon data as well and going out of colon
-                    #  parsing
-                    else:
-                        if value_bkup:
-                            dict[key_bkup].append(self.parseColonSV(value_bkup))
-
-                        key, value = each.split('=')
-                        key = key.strip('"').strip('\r\n')
-                        value = value.strip('\r\n')
-                        dict.update({key.upper(): value})
-                        valueHasColonDelim = False
-                else:
-                    if caseLshmccert:
-                        key = key_bkup
-                        value = dict[key_bkup] + ',' + each.strip('"')
-                        if '"' in each[-1]:
-                            caseLshmccert = False
-                    elif '<' in each and ('>' in each or '>' in nextdata[-4]):
-                        t = each.split('=')
-                        if t[0][0] != '<':
-                            key = t.pop(0)
-                            value = '='.join(t)
-                            value = value.strip('"')
-                        else:
-                            key = dict.keys()[0]
-                            value = dict[key] + ',' + '='.join(t)
-                    elif '<' in prevdata and '>' in each[-4]:
-                        key = key_bkup
-                        value = dict[key_bkup] + ',' + each.strip('"')
-                    elif '"' in each[0]:
-                        t = each.split('=')
-                        if len(t) == 3:
-                            key = t[0].strip('"')
-                            value = t[1] + '=' + t[2]
-                            caseLshmccert = True
-                        else:
-                            key, value = each.split('=')
-                    else:
-                        key, value = each.split('=', 1)
-                    key = key.strip('"').strip('\r\n')
-                    value = value.strip('\r\n')
-                    dict.update({key.upper(): value})
-
-            except ValueError as errMsg:
-                if "too many values to unpack" in repr(errMsg):
-                    if ': ' in each:
-                        temp = each.split('=')
-                        valueHasColonDelim = True
-                        key = temp[0].strip('"')
-                        dict.update({key.upper(): []})
-                        value = each.lstrip('"')
-                        value = value.strip(key)
-                        value = value.strip('=')
-                        # if the next data is empty, then handle the parsing of
-                        # colon data here itself
-                        if nextdata == "":
-                            dict[key.upper()].append(self.parseColonSV(value))
-                else:
-                    value = each.strip('"').strip('\r\n')
-                    value = value_bkup + ',' + value.strip('\r\n')
-                    dict.pop(key_bkup)
-                    dict.update({key_bkup: value})
-            key_bkup, value_bkup = key.upper(), value
-            prevdata = each
+        key = None
+        for field, quoted in self.splitCSV(csvData.strip('\r\n')):
+            name, sep, value = field.partition('=')
+            if not sep:
+                # an unquoted piece of a list belongs to the previous attribute
+                if key is not None and isinstance(dict[key], str):
+                    dict[key] += ',' + field
+                continue
+            key = name.strip('"').upper()
+            # quoted lists of colon separated attribute records, such as
+            # "attr=""a=1: b=2"",""a=3: b=4""", are parsed into a list of dicts
+            if quoted and ': ' in value:
+                records = [record for record, recordQuoted in self.splitCSV(value)]
+                if all('=' in each for record in records for each in record.split(': ')):
+                    value = [self.parseColonSV(record) for record in records]
+            dict[key] = value
 
         return dict
 
-    def parseMultiLineCSV(self, csvData, userConfig=None):
-        eachDict = {}
-        listOfDict = []
-        lines = csvData.split('\n')
+    def iter_records(self, lines, userConfig=None):
+        # Parses a multi line output one record at a time, so that a caller looking
+        # for one record stops parsing the output once it is found
         for line in lines:
+            line = line.rstrip('\r\n')
             if not line:  # to remove empty lines
                 continue
-            eachDict = self.parseCSV(line, userConfig)
-            listOfDict.append(eachDict)
+            yield self.parseCSV(line, userConfig)
+
+    def parseMultiLineCSV(self, csvData, userConfig=None):
+        return list(self.iter_records(csvData.split('\n'), userConfig))
 
-        return listOfDict
+    def fieldsBuilder(self, cmdKey, fields):
+        # -F projection listing only the given attributes, to be parsed with
+        # parseCSV(result, {'-F': ','.join(fields)})
+        return self.HMC_CMD_OPT[cmdKey]['-F'] + ','.join(fields)
 
     def parseAttributes(self, i_csvAttrStr, i_csvValueStr):
         l_attrs = i_csvAttrStr.split(',')
-        l_values = i_csvValueStr.strip().split(',')
-        if ',"' in i_csvValueStr or '"' in i_csvValueStr:
-            csvValueList = []
-            finalList = []
-            startComma = False
-            for each in l_values:
-                if startComma and '"' in each[-1]:
-                    csvValueList.append(each.strip('"'))
-                    startComma = False
-                    finalList.append(','.join(csvValueList))
-                    csvValueList = []
-                elif '"' in each[0]:
-                    csvValueList.append(each.strip('"'))
-                    startComma = True
-                elif startComma:
-                    csvValueList.append(each)
-                else:
-                    finalList.append(each)
-            l_values = finalList
+        l_values = [field for field, quoted in self.splitCSV(i_csvValueStr.strip())]
 
         if len(l_attrs) != len(l_values):
             raise Exception("#  of values returned (" + str(len(l_values)) + ") is not equal to #  of attributes specified (" + str(len(l_attrs)) + ")")
@@ -0,0 +1,100 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+import os
+import stat
+import fcntl
+import json
+import time
+import hashlib
+import tempfile
+from contextlib import contextmanager
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Per user directory holding the state the modules share between tasks
+CACHE_ROOT = os.path.join(os.path.expanduser('~'), '.ansible', 'power_hmc')
+
+
+def private_directory(path):
+    # Creates path readable only by the current user, or checks that an existing one is.
+    # Returns None when the directory is owned by someone else or open to other users,
+    # so that nothing gets read from or written to a location others can tamper with
+    try:
+        os.makedirs(path, 0o700)
+    except OSError:
+        if not os.path.isdir(path):
+            logger.debug("Unable to create private directory %s", path)
+            return None
+    try:
+        path_stat = os.lstat(path)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(path_stat.st_mode) or path_stat.st_uid != os.getuid() or path_stat.st_mode & 0o077:
+        logger.debug("Ignoring %s, it is not a directory owned by the user with mode 0700", path)
+        return None
+    return path
+
+
+class HmcFileCache:
+    """JSON values kept one file per key in a private directory of the user.
+
+    Values are ignored once they are older than ttl seconds.
+    """
+
+    def __init__(self, name, ttl, directory=None, clock=None):
+        self.ttl = ttl
+        self.directory = directory or os.path.join(CACHE_ROOT, name)
+        self.clock = clock or time
+
+    def _path(self, *key):
+        digest = hashlib.sha256('\0'.join(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + '.json')
+
+    @contextmanager
+    def lock(self, *key):
+        # Serializes the processes working on the value of key, such as the forks of a
+        # play which would all compute it at once on a cold cache. Closing the lock
+        # file releases the lock
+        lock_file = None
+        if private_directory(self.directory):
+            try:
+                lock_file = open(self._path(*key)[:-len('.json')] + '.lock', 'a')
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            except (IOError, OSError) as error:
+                logger.debug("Unable to lock %s cache: %s", self.directory, error)
+        try:
+            yield
+        finally:
+            if lock_file:
+                lock_file.close()
+
+    def load(self, *key):
+        if not private_directory(self.directory):
+            return None
+        try:
+            with open(self._path(*key)) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if self.clock.time() - entry.get('created', 0) >= self.ttl:
+            self.invalidate(*key)
+            return None
+        return entry.get('value')
+
+    def store(self, value, *key):
+        if not private_directory(self.directory):
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump({'value': value, 'created': self.clock.time()}, cache_file)
+            os.replace(tmp_path, self._path(*key))
+        except (IOError, OSError) as error:
+            logger.debug("Unable to write %s cache: %s", self.directory, error)
+
+    def invalidate(self, *key):
+        try:
+            os.remove(self._path(*key))
+        except (IOError, OSError):
+            pass
@@ -5,17 +5,39 @@
 
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
+import os
 import time
 import re
 import subprocess
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_command_stack import HmcCommandStack
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_cli_client import HmcCliConnection
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_file_cache import HmcFileCache
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
 
 import logging
 logger = logging.getLogger(__name__)
 
+# Seconds a partition name to managed system index stays usable by later tasks
+LPAR_INDEX_TTL = 120
+
+
+class HmcLparIndex:
+    """File backed index of partition names to the managed systems hosting them, keyed by HMC host and user.
+
+    Lets the tasks of a play resolve partitions without listing the partitions of every
+    managed system again. Entries are ignored once they are older than ttl seconds.
+    """
+
+    def __init__(self, ttl, directory=None):
+        self.cache = HmcFileCache('lpar_index', ttl, directory)
+
+    def load(self, hmc_ip, username):
+        return self.cache.load(hmc_ip, username) or {}
+
+    def store(self, hmc_ip, username, index):
+        self.cache.store(index, hmc_ip, username)
+
 
 class Hmc():
 
@@ -224,12 +246,10 @@ class Hmc():
             self.OPT['LSSYSCFG']['-M'] + cecName + \
             self.OPT['LSSYSCFG']['-F'] + 'lpar_id'
 
-        result = self.hmcconn.execute(lssyscfgCmd).strip()
-        if 'No results were found' in result:
-            return 1
-        existing_lpar_list = list(map(int, result.split('\n')))
+        # 'No results were found' leaves the set empty
+        existing_lpar_ids = set(int(line) for line in self.hmcconn.execute(lssyscfgCmd).splitlines() if line.strip().isdigit())
         supp_id_list = list(range(1, int(max_supp_lpars)))
-        avail_list = list(set(supp_id_list) - set(existing_lpar_list))
+        avail_list = list(set(supp_id_list) - existing_lpar_ids)
         result_list = sorted(avail_list)
         return result_list[0]
 
@@ -281,41 +301,54 @@ class Hmc():
             self.OPT['CHSYSSTATE']['-O']['ON']
         self.hmcconn.execute(chsysstateCmd)
 
-    def getManagedSystemDetails(self, cecName):
+    def getManagedSystemDetails(self, cecName, fields=None):
         lssyscfgCmd = self.CMD['LSSYSCFG'] + \
             self.OPT['LSSYSCFG']['-R']['SYS'] + \
             self.OPT['LSSYSCFG']['-M'] + cecName
+        userConfig = None
+        if fields:
+            lssyscfgCmd += self.cmdClass.fieldsBuilder('LSSYSCFG', fields)
+            userConfig = {'-F': ','.join(fields)}
         result = self.hmcconn.execute(lssyscfgCmd)
-        res_dict = self.cmdClass.parseCSV(result)
+        res_dict = self.cmdClass.parseCSV(result, userConfig)
         res = dict((k.lower(), v) for k, v in res_dict.items())
         return res
 
-    def getManagedSystemHwres(self, system_name, resource, level):
+    def getManagedSystemHwres(self, system_name, resource, level, fields=None):
         lshwresCmd = self.CMD['LSHWRES'] + \
             self.OPT['LSHWRES']['-R'] + resource + \
             self.OPT['LSHWRES']['-M'] + system_name + \
             self.OPT['LSHWRES']['--LEVEL'] + level
+        userConfig = None
+        if fields:
+            lshwresCmd += self.cmdClass.fieldsBuilder('LSHWRES', fields)
+            userConfig = {'-F': ','.join(fields)}
         result = self.hmcconn.execute(lshwresCmd)
-        res_dict = self.cmdClass.parseCSV(result)
+        res_dict = self.cmdClass.parseCSV(result, userConfig)
         res = dict((k.lower(), v) for k, v in res_dict.items())
         return res
 
-    def checkManagedSysState(self, cecName, expectedStates, timeoutInMin=12):
+    def checkManagedSysState(self, cecName, expectedStates, timeoutInMin=12, events=None):
         POLL_INTERVAL_IN_SEC = 30
         WAIT_UNTIL_IN_SEC = timeoutInMin * 60
 
+        def _stateReached():
+            cec_state = self.getManagedSystemDetails(cecName, fields=['state']).get('state')
+            logger.debug(cec_state)
+            return cec_state in expectedStates
+
+        # An HmcEventListener checks the state as soon as the HMC reports a change of the system
+        if events:
+            return events.wait(_stateReached, WAIT_UNTIL_IN_SEC, events.watchSystem(cecName))
+
         # Polling logic to make sure CEC state changed as expectedState
         waited = 0
         stateSuccess = False
         while waited < WAIT_UNTIL_IN_SEC:
-            res = self.getManagedSystemDetails(cecName)
-            cec_state = res.get('state')
-            if cec_state in expectedStates:
-                logger.debug(cec_state)
+            if _stateReached():
                 stateSuccess = True
                 break
             else:
-                logger.debug(cec_state)
                 waited += POLL_INTERVAL_IN_SEC
 
             # waiting for 30 seconds
@@ -362,6 +395,37 @@ class Hmc():
             migrlparCmd += self.OPT['MIGRLPAR']['-W'] + str(wait)
         self.hmcconn.execute(migrlparCmd)
 
+    def getMigrationState(self, srcCEC, dstCEC=None, lparName=None, lparID=None):
+        # Where a partition stands in its migration: 'migrating' while a migration of it
+        # runs, 'source' while it is idle on srcCEC, 'destination' once it left srcCEC and,
+        # when dstCEC is given, is found there. None when this cannot be told
+        lparFilter = dict(LPAR_NAMES=lparName) if lparName else dict(LPAR_IDS=str(lparID))
+        lslparmigrCmd = self.CMD['LSLPARMIGR'] +\
+            self.OPT['LSLPARMIGR']['-R']['LPAR'] +\
+            self.OPT['LSLPARMIGR']['-M'] + srcCEC +\
+            self.cmdClass.filterBuilder('LSLPARMIGR', lparFilter) +\
+            self.OPT['LSLPARMIGR']['-F'] + 'migration_state'
+        cmds = [lslparmigrCmd]
+        if dstCEC:
+            lssyscfgCmd = self.CMD['LSSYSCFG'] +\
+                self.OPT['LSSYSCFG']['-R']['LPAR'] +\
+                self.OPT['LSSYSCFG']['-M'] + dstCEC +\
+                self.cmdClass.filterBuilder('LSSYSCFG', lparFilter) +\
+                self.OPT['LSSYSCFG']['-F'] + 'name'
+            cmds.append(lssyscfgCmd)
+        results = self.hmcconn.execute_batch(cmds, raise_on_error=False)
+
+        rc, output = results[0]
+        if 'No results were found' not in output:
+            states = [line for line in output.splitlines() if line]
+            if rc != 0 or not states:
+                return None
+            return 'source' if states[0] == 'Not Migrating' else 'migrating'
+        if not dstCEC:
+            return 'destination'
+        rc, output = results[1]
+        return 'destination' if rc == 0 and 'No results were found' not in output and output.strip() else None
+
     def _configMandatoryLparSettings(self, delta_config=None):
         lparMandatConfig = {'PROFILE_NAME': 'default_profile',
                             'MIN_MEM': '2048',
@@ -418,26 +482,33 @@ class Hmc():
 
         self.hmcconn.execute(mksyscfg)
 
-    def getPartitionConfig(self, system_name, name, prof=None):
+    def getPartitionConfig(self, system_name, name, prof=None, fields=None):
         filter_config = dict(LPAR_NAMES=name)
         lssyscfg = self.CMD['LSSYSCFG'] +\
             self.OPT['LSSYSCFG']['-R']['LPAR'] +\
             self.OPT['LSSYSCFG']['-M'] + system_name +\
             self.cmdClass.filterBuilder("LSSYSCFG", filter_config)
-
-        result = self.hmcconn.execute(lssyscfg)
-        res_dict = self.cmdClass.parseCSV(result)
-        res = dict((k.lower(), v) for k, v in res_dict.items())
-
-        if prof:
+        # fields only projects the partition attributes, the profile is listed in full
+        userConfig = None
+        if fields:
+            lssyscfg += self.cmdClass.fieldsBuilder('LSSYSCFG', fields)
+            userConfig = {'-F': ','.join(fields)}
+
+        if not prof:
+            result = self.hmcconn.execute(lssyscfg)
+        else:
             filter_config['PROFILE_NAMES'] = prof
             logger.debug(filter_config)
             lssyscfg_prof = self.CMD['LSSYSCFG'] +\
                 self.OPT['LSSYSCFG']['-R']['PROF'] +\
                 self.OPT['LSSYSCFG']['-M'] + system_name +\
                 self.cmdClass.filterBuilder("LSSYSCFG", filter_config)
+            # partition and profile are listed over one SSH session
+            (rc, result), (rc_prof, result_prof) = self.hmcconn.execute_batch([lssyscfg, lssyscfg_prof])
+        res_dict = self.cmdClass.parseCSV(result, userConfig)
+        res = dict((k.lower(), v) for k, v in res_dict.items())
 
-            result_prof = self.hmcconn.execute(lssyscfg_prof)
+        if prof:
             res_dict_prof = self.cmdClass.parseCSV(result_prof)
             res_prof = dict((k.lower(), v) for k, v in res_dict_prof.items())
             res.update({'profile_config': res_prof})
@@ -491,15 +562,19 @@ class Hmc():
             " " + viosName + " " + profName + " " + systemName
         self.hmcconn.execute(lpar_netboot)
 
-    def getPartitionRefcode(self, system_name, name):
+    def getPartitionRefcode(self, system_name, name, fields=None):
         filter_config = dict(LPAR_NAMES=name)
         lsrefcode = self.CMD['LSREFCODE'] +\
             self.OPT['LSREFCODE']['-R']['LPAR'] +\
             self.OPT['LSREFCODE']['-M'] + system_name +\
             self.cmdClass.filterBuilder("LSREFCODE", filter_config)
+        userConfig = None
+        if fields:
+            lsrefcode += self.cmdClass.fieldsBuilder('LSREFCODE', fields)
+            userConfig = {'-F': ','.join(fields)}
         result = self.hmcconn.execute(lsrefcode)
-        res_dict = self.cmdClass.parseCSV(result)
-        res = dict((k, v) for k, v in res_dict.items())
+        res_dict = self.cmdClass.parseCSV(result, userConfig)
+        res = dict((k.upper(), v) for k, v in res_dict.items())
 
         return res
 
@@ -521,17 +596,28 @@ class Hmc():
                 self.OPT['MKAUTHKEYS']['--PASSWD'] + passwd
         self.hmcconn.execute(mkauthcmd)
 
-    def listUsr(self, user_type=None, filt=None):
+    def listUsrCmd(self, user_type=None, filt=None, fields=None):
         listHmcUsr = self.CMD['LSHMCUSR']
         if user_type:
             listHmcUsr += self.OPT['LSHMCUSR']['-T'][user_type.upper()]
         if filt:
             listHmcUsr += self.cmdClass.filterBuilder('LSHMCUSR', filt)
-        result = self.hmcconn.execute(listHmcUsr)
+        if fields:
+            listHmcUsr += self.cmdClass.fieldsBuilder('LSHMCUSR', fields)
+        return listHmcUsr
+
+    def parseUsrList(self, result, fields=None):
         if 'No results were found' in result:
             return []
+        if fields:
+            users = self.cmdClass.parseMultiLineCSV(result, {'-F': ','.join(fields)})
+            return [self.cmdClass.convertKeysToUpper(user) for user in users]
         return self.cmdClass.parseMultiLineCSV(result)
 
+    def listUsr(self, user_type=None, filt=None, fields=None):
+        result = self.hmcconn.execute(self.listUsrCmd(user_type, filt, fields))
+        return self.parseUsrList(result, fields)
+
     def createUsr(self, configDict):
         config = {each.upper(): str(configDict[each]) for each in configDict if configDict[each] is not None}
         mkhmcusrCmd = self.CMD['MKHMCUSR'] +\
@@ -539,6 +625,15 @@ class Hmc():
         self.hmcconn.execute(mkhmcusrCmd)
 
     def modifyUsr(self, configDict=None, enable=False, modify_type=None):
+        self.hmcconn.execute(self.modifyUsrCmd(configDict, enable, modify_type))
+
+    def modifyAndListUsr(self, configDict=None, enable=False, modify_type=None, user_type=None, filt=None):
+        # The users are listed after the change over the same SSH session
+        cmds = [self.modifyUsrCmd(configDict, enable, modify_type), self.listUsrCmd(user_type, filt)]
+        (rc, result), (list_rc, list_result) = self.hmcconn.execute_batch(cmds)
+        return self.parseUsrList(list_result)
+
+    def modifyUsrCmd(self, configDict=None, enable=False, modify_type=None):
         chhmcusrCmd = self.CMD['CHHMCUSR']
         config = {each.upper(): str(configDict[each]) for each in configDict if configDict[each] is not None}
         if enable:
@@ -549,7 +644,7 @@ class Hmc():
                 self.cmdClass.i_a_ConfigBuilder('CHHMCUSR', '-I', config)
         elif config:
             chhmcusrCmd += self.cmdClass.i_a_ConfigBuilder('CHHMCUSR', '-I', config)
-        self.hmcconn.execute(chhmcusrCmd)
+        return chhmcusrCmd
 
     def removeUsr(self, usr=None, rm_type=None):
         rmhmcusrCmd = self.CMD['RMHMCUSR']
@@ -559,24 +654,42 @@ class Hmc():
             rmhmcusrCmd += self.OPT['RMHMCUSR']['-T'][rm_type.upper()]
         self.hmcconn.execute(rmhmcusrCmd)
 
-    def checkForOSToBootUpFully(self, system_name, name, timeoutInMin=60):
+    def checkForOSToBootUpFully(self, system_name, name, timeoutInMin=60, events=None):
         POLL_INTERVAL_IN_SEC = 30
         WAIT_UNTIL_IN_SEC = timeoutInMin * 60 - 600
+        INSTALL_GRACE_IN_SEC = 600
         waited = 0
         rmcActive = False
         ref_code = None
-        # wait for 10 mins before polling
-        time.sleep(600)
-        while waited < WAIT_UNTIL_IN_SEC:
-            conf_dict = self.getPartitionConfig(system_name, name)
-            if conf_dict['rmc_state'] == 'active':
-                rmcActive = True
-                break
-            else:
-                waited += POLL_INTERVAL_IN_SEC
-            time.sleep(POLL_INTERVAL_IN_SEC)
+        started = time.time()
+        rmcWentDown = False
+
+        def _rmcActive():
+            nonlocal rmcWentDown
+            if self.getPartitionConfig(system_name, name, fields=['rmc_state'])['rmc_state'] == 'active':
+                # an RMC state still active from before the netboot is not trusted
+                return rmcWentDown or time.time() - started >= INSTALL_GRACE_IN_SEC
+            rmcWentDown = True
+            return False
+
+        if events:
+            # An HmcEventListener follows the installation through the partition events
+            # instead of waiting 10 mins before polling
+            rmcActive = events.wait(_rmcActive, timeoutInMin * 60, events.watchPartition(system_name, name))
+        else:
+            # wait for 10 mins before polling
+            time.sleep(INSTALL_GRACE_IN_SEC)
+            while waited < WAIT_UNTIL_IN_SEC:
+                if _rmcActive():
+                    rmcActive = True
+                    break
+                else:
+                    waited += POLL_INTERVAL_IN_SEC
+                time.sleep(POLL_INTERVAL_IN_SEC)
+        # the polls only read rmc_state, the full configuration is listed once at the end
+        conf_dict = self.getPartitionConfig(system_name, name)
         if not rmcActive:
-            res = self.getPartitionRefcode(system_name, name)
+            res = self.getPartitionRefcode(system_name, name, fields=['refcode'])
             ref_code = res['REFCODE']
         return rmcActive, conf_dict, ref_code
 
@@ -612,16 +725,36 @@ class Hmc():
 
         self.hmcconn.execute(updlic_cmd)
 
-    def get_firmware_level(self, system_name):
-        lslic_cmd = self.CMD['LSLIC'] +\
+    def _lslic_level_cmd(self, system_name):
+        return self.CMD['LSLIC'] +\
             self.OPT['LSLIC']['-M'] + system_name +\
             self.OPT['LSLIC']['-F']['SPNAMELEVEL']
-        raw_result = self.hmcconn.execute(lslic_cmd)
+
+    def _parse_firmware_level(self, raw_result):
         headers = "service_pack,level,ecnumber"
         res_dict = self.cmdClass.parseAttributes(headers, raw_result)
         parsed_res = dict((k.lower(), v) for k, v in res_dict.items())
         return parsed_res
 
+    def get_firmware_level(self, system_name):
+        raw_result = self.hmcconn.execute(self._lslic_level_cmd(system_name))
+        return self._parse_firmware_level(raw_result)
+
+    def get_firmware_levels(self, system_names):
+        # Firmware levels of many systems read over one SSH session, by system name.
+        # A system whose level cannot be read maps to None
+        lslic_cmds = [self._lslic_level_cmd(system_name) for system_name in system_names]
+        results = self.hmcconn.execute_batch(lslic_cmds, raise_on_error=False) if lslic_cmds else []
+
+        levels = {}
+        for system_name, (rc, output) in zip(system_names, results):
+            if rc != 0:
+                logger.debug("Unable to read the firmware level of %s: %s", system_name, output)
+                levels[system_name] = None
+                continue
+            levels[system_name] = self._parse_firmware_level(output)
+        return levels
+
     def list_all_managed_systems(self):
         lssysconn_cmd = self.CMD['LSSYSCONN'] +\
             self.OPT['LSSYSCONN']['-R']['ALL'] +\
@@ -665,15 +798,84 @@ class Hmc():
 
         return lines
 
-    def list_all_lpars_details(self, sys_name, filter=None):
-        lines = []
+    def _lssyscfg_sys_state(self):
+        return self.CMD['LSSYSCFG'] + self.OPT['LSSYSCFG']['-R']['SYS'] + self.OPT['LSSYSCFG']['-F'] + 'name,state'
+
+    def _operating_systems(self, output):
+        # states such as 'Power Off' hold blanks, so systems are split per line
+        mss = [ms.rsplit(',', 1) for ms in output.splitlines() if ms]
+        return [ms_name for ms_name, state in mss if state == 'Operating']
+
+    def list_lpar_names_by_system(self, ms_names=None):
+        # Partition names of every Operating managed system, or of the given ones,
+        # all systems listed over one SSH session. Systems which fail to list are skipped
+        if ms_names is None:
+            ms_names = self._operating_systems(self.hmcconn.execute(self._lssyscfg_sys_state()))
+        lssyscfgLpar = self.CMD['LSSYSCFG'] + self.OPT['LSSYSCFG']['-R']['LPAR'] + self.OPT['LSSYSCFG']['-M']
+        lssyscfgCmds = [lssyscfgLpar + ms_name + self.OPT['LSSYSCFG']['-F'] + 'name' for ms_name in ms_names]
+        results = self.hmcconn.execute_batch(lssyscfgCmds, raise_on_error=False) if lssyscfgCmds else []
+
+        lpar_names = {}
+        for ms_name, (rc, output) in zip(ms_names, results):
+            if rc != 0:
+                logger.debug("Unable to list partitions of %s: %s", ms_name, output)
+                continue
+            lpar_names[ms_name] = [name for name in output.splitlines() if name]
+        return lpar_names
+
+    def _lpar_index_still_valid(self, lpar_name, ms_names, indexed_systems):
+        # Lists the Operating systems and looks the partition up on its indexed
+        # systems over one SSH session
+        lssyscfgLpar = self.CMD['LSSYSCFG'] + self.OPT['LSSYSCFG']['-R']['LPAR'] + self.OPT['LSSYSCFG']['-M']
+        lparFilter = self.cmdClass.filterBuilder("LSSYSCFG", dict(LPAR_NAMES=lpar_name)) + self.OPT['LSSYSCFG']['-F'] + 'name'
+        lssyscfgCmds = [self._lssyscfg_sys_state()] + [lssyscfgLpar + ms_name + lparFilter for ms_name in ms_names]
+        results = self.hmcconn.execute_batch(lssyscfgCmds, raise_on_error=False)
+        rc, output = results[0]
+        if rc != 0 or sorted(self._operating_systems(output)) != sorted(indexed_systems):
+            return False
+        return all(rc == 0 and lpar_name in output.splitlines() for rc, output in results[1:])
+
+    def get_managed_systems_of_lpar(self, lpar_name, index_ttl=None):
+        # Managed systems hosting a partition of the given name. The name to system index
+        # built here is kept for index_ttl seconds, set through ANSIBLE_POWER_HMC_LPAR_INDEX_TTL
+        # when not given, 0 or false disabling it. An indexed answer is only used while the
+        # Operating systems are still the indexed ones and the partition is still found on
+        # its indexed systems, so that a migrated or removed partition or a system coming up
+        # rebuilds the index. A partition of the same name created meanwhile on another
+        # indexed system is not seen until the index expires, so duplicate names are only
+        # detected as of the time the index was built
+        if index_ttl is None:
+            index_ttl = os.environ.get('ANSIBLE_POWER_HMC_LPAR_INDEX_TTL', LPAR_INDEX_TTL)
+        if str(index_ttl) in ['False', 'false', 'FALSE', 'no', 'No', 'NO']:
+            index_ttl = 0
+        lpar_index = HmcLparIndex(int(index_ttl)) if int(index_ttl) > 0 else None
+
+        if lpar_index:
+            entry = lpar_index.load(self.hmcconn.ip, self.hmcconn.user)
+            ms_names = entry.get('lpars', {}).get(lpar_name)
+            if ms_names and self._lpar_index_still_valid(lpar_name, ms_names, entry.get('systems', [])):
+                return ms_names
+
+        systems = self._operating_systems(self.hmcconn.execute(self._lssyscfg_sys_state()))
+        index = {}
+        for ms_name, lpar_names in self.list_lpar_names_by_system(systems).items():
+            for name in lpar_names:
+                index.setdefault(name, []).append(ms_name)
+        if lpar_index:
+            lpar_index.store(self.hmcconn.ip, self.hmcconn.user, {'systems': systems, 'lpars': index})
+        return index.get(lpar_name, [])
+
+    def iter_lpars_details(self, sys_name, filter=None):
+        # Partitions of sys_name parsed one at a time, as dicts of the filter attributes,
+        # or of all attributes when no filter is given. The listing is read whole, leaving
+        # the loop early only skips parsing the remaining partitions
         lssyscfgCmd = self.CMD['LSSYSCFG'] +\
             self.OPT['LSSYSCFG']['-R']['LPAR'] +\
             self.OPT['LSSYSCFG']['-M'] + sys_name
+        userConfig = None
         if filter:
             lssyscfgCmd += self.OPT['LSSYSCFG']['-F'] + filter
+            userConfig = {'-F': filter}
 
-        raw_result = self.hmcconn.execute(lssyscfgCmd)
-        lines = raw_result.split()
-
-        return lines
+        lines = (line for line in self.hmcconn.execute(lssyscfgCmd).splitlines() if 'No results were found' not in line)
+        return self.cmdClass.iter_records(lines, userConfig)
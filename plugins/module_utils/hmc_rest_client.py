@@ -1,10 +1,19 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
+import os
+import io
+import copy
+import ssl
 import time
 import json
+import socket
+import threading
 from ansible.module_utils.urls import open_url
 import ansible.module_utils.six.moves.urllib.error as urllib_error
+from ansible.module_utils.six.moves import http_client
+from ansible.module_utils.six.moves.urllib.parse import urlparse
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_file_cache import HmcFileCache
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import Error
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
 import re
@@ -30,12 +39,109 @@ systems/power/firmware/uom/mc/2012_10/" xmlns="http://www.ibm.com/xmlns/systems/
 /firmware/uom/mc/2012_10/" xmlns:ns2="http://www.w3.org/XML/1998/namespace/k2"'
 
 
+XMLNS_DECL_RE = re.compile(br'xmlns(?::([\w.-]+))?\s*=\s*(?:"[^"]*"|\'[^\']*\')')
+# A start tag up to, and excluding, one of its attributes. Attribute values are matched whole,
+# so only a match found in an attribute name position is a declaration or prefixed attribute
+XML_START_TAG_RE = re.compile(br'<[\w.:-]+(?:\s+[\w.:-]+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*\s+\Z')
+# Sections whose content is character data even where it looks like markup
+XML_VERBATIM_RE = re.compile(br'(<!\[CDATA\[.*?\]\]>|<!--.*?-->)', re.S)
+
+# Queries evaluated once per mapping, group or volume of large feeds. They are compiled
+# once and evaluated relative to the element of the loop rather than wrapping every
+# element in an ElementTree and rescanning it with '//' expressions.
+HMC_XPATH_QUERIES = {
+    'scsi_mappings': '//VirtualSCSIMapping',
+    'fc_mappings': '//VirtualFibreChannelMapping',
+    'client_adapter': 'ClientAdapter',
+    'client_partition_id': 'ClientAdapter/LocalPartitionID',
+    'client_slot': 'ClientAdapter/VirtualSlotNumber',
+    'client_remote_partition_id': 'ClientAdapter/RemoteLogicalPartitionID',
+    'client_remote_slot': 'ClientAdapter/RemoteSlotNumber',
+    'client_connecting_partition_id': 'ClientAdapter/ConnectingPartitionID',
+    'client_connecting_slot': 'ClientAdapter/ConnectingVirtualSlotNumber',
+    'client_wwpns': 'ClientAdapter/WWPNs',
+    'server_port_name': 'ServerAdapter/PhysicalPort/PortName',
+    'server_port_location_code': 'ServerAdapter/PhysicalPort/LocationCode',
+    'storage': 'Storage',
+    'storage_pv_unique_id': 'Storage/PhysicalVolume/VolumeUniqueID',
+    'storage_pv_name': 'Storage/PhysicalVolume/VolumeName',
+    'storage_pv_capacity': 'Storage/PhysicalVolume/VolumeCapacity',
+    'storage_media_name': 'Storage//MediaName',
+    'storage_mount_type': 'Storage//MountType',
+    'storage_size': 'Storage//Size',
+    'target_name': 'TargetDevice//TargetName',
+    'target_optical_device': 'TargetDevice/VirtualOpticalTargetDevice',
+    'target_optical_name': 'TargetDevice/VirtualOpticalTargetDevice/TargetName',
+    'groups': '//Group',
+    'group_name': './/GroupName',
+    'group_lpar_hrefs': './/AssociatedLogicalPartitions//link/@href',
+    'group_ms_hrefs': './/AssociatedManagedSystems//link/@href',
+    'group_vios_hrefs': './/AssociatedVirtualIOServers//link/@href',
+    'pv_unique_device_id': 'UniqueDeviceID',
+    'pv_volume_name': 'VolumeName',
+    'pv_volume_capacity': 'VolumeCapacity',
+    'pv_reserve_policy': 'ReservePolicy',
+    'pv_available_for_usage': 'AvailableForUsage',
+}
+HMC_XPATHS = {} if NEED_LXML else dict((name, etree.XPath(query)) for name, query in HMC_XPATH_QUERIES.items())
+
+
+def _in_start_tag(markup, pos):
+    # Whether pos is where an attribute name of a start tag begins. Markup holds no
+    # CDATA section or comment, so the last '<' before pos opens the enclosing tag
+    start = markup.rfind(b'<', 0, pos)
+    return start >= 0 and XML_START_TAG_RE.match(markup, start, pos) is not None
+
+
+def _strip_namespace_declarations(markup, prefixes):
+    # Drops the namespace declarations of the start tags in markup, adding the prefixes
+    # they declare to prefixes. Only the occurrences of 'xmlns' are looked at.
+    kept = []
+    end = 0
+    for match in XMLNS_DECL_RE.finditer(markup):
+        if not _in_start_tag(markup, match.start()):
+            continue
+        if match.group(1):
+            prefixes.add(match.group(1))
+        kept.append(markup[end:match.start()])
+        end = match.end()
+    if not kept:
+        return markup
+    kept.append(markup[end:])
+    return b''.join(kept)
+
+
 def xml_strip_namespace(xml_str):
+    if isinstance(xml_str, str):
+        xml_str = xml_str.encode('utf-8')
     parser = etree.XMLParser(recover=True, encoding='utf-8')
+
+    # Renaming every parsed element costs more than parsing the document itself, so the
+    # namespace declarations and tag prefixes are dropped from the tags of the raw document
+    # instead and the parser builds unqualified tags directly. Text, attribute values, CDATA
+    # sections and comments are left as they are. Documents with prefixed attributes, which
+    # would be left unbound, still have their tags renamed after parsing.
+    sections = XML_VERBATIM_RE.split(xml_str) if b'<!' in xml_str else [xml_str]
+    prefixes = set()
+    for i in range(0, len(sections), 2):
+        sections[i] = _strip_namespace_declarations(sections[i], prefixes)
+    if prefixes:
+        tag_prefix_re = re.compile(b'<(/?)(?:' + b'|'.join(re.escape(prefix) for prefix in prefixes) + b'):')
+        for i in range(0, len(sections), 2):
+            sections[i] = tag_prefix_re.sub(br'<\1', sections[i])
+    # The prefixes are rarely met outside of tags once stripped, so a substring check rules
+    # out most documents before the tags are searched for prefixed attributes
+    markup = sections[::2]
+    prefixes.add(b'xml')
+    prefixed = any(prefix + b':' in section for prefix in prefixes for section in markup)
+    if prefixed:
+        attribute_prefix_re = re.compile(b'(?:' + b'|'.join(re.escape(prefix) for prefix in prefixes) + br'):[\w.-]+\s*=')
+        prefixed = any(_in_start_tag(section, match.start()) for section in markup for match in attribute_prefix_re.finditer(section))
+    if not prefixed:
+        return etree.fromstring(b''.join(sections), parser)
+
     root = etree.fromstring(xml_str, parser)
-    for elem in root.getiterator():
-        if not hasattr(elem.tag, 'find'):
-            continue
+    for elem in root.iter(etree.Element):
         i = elem.tag.find('}')
         if i >= 0:
             elem.tag = elem.tag[i + 1:]
@@ -158,6 +264,12 @@ def _job_RequestPayload(reqdOperation, jobParams, schemaVersion="V1_0"):
     return ET.tostring(root)
 
 
+def _jobTimeoutError(job_doc):
+    job_name = job_doc.xpath("//OperationName")[0].text.strip()
+    logger.debug("%s job stuck in RUNNING state. Timed out!!", job_name)
+    return HmcError("Job: {0} timed out!!".format(job_name))
+
+
 def add_taggedIO_details(lpar_template_dom):
     taggedIO_payload = '''<iBMiPartitionTaggedIO kxe="false" kb="CUD" schemaVersion="V1_0">
                 <Metadata>
@@ -233,30 +345,490 @@ def add_physical_io(rest_conn, server_dom, lpar_template_dom, drcnames):
     ioConfigurationTag.addnext(etree.XML(profileioslots_payload))
 
 
+class SystemClock:
+    """Wall clock used by the job poller, replaceable by a fake clock in unit tests"""
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class JobPoller:
+    """Polling schedule for HMC REST jobs.
+
+    The first status check happens after initial_interval seconds, every
+    following wait is multiplied by backoff_factor and capped at max_interval.
+    """
+
+    def __init__(self, initial_interval=2, max_interval=30, backoff_factor=2.0, clock=None):
+        if initial_interval is None or initial_interval <= 0:
+            raise ParameterError("job_poll initial_interval must be greater than 0")
+        if max_interval is None or max_interval < initial_interval:
+            raise ParameterError("job_poll max_interval must be greater than or equal to initial_interval")
+        if backoff_factor is None or backoff_factor < 1:
+            raise ParameterError("job_poll backoff_factor must be greater than or equal to 1")
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.clock = clock or SystemClock()
+
+    @classmethod
+    def from_params(cls, job_poll=None, clock=None):
+        if isinstance(job_poll, cls):
+            return job_poll
+        job_poll = dict((key, val) for key, val in (job_poll or {}).items() if val is not None)
+        return cls(clock=clock, **job_poll)
+
+    def intervals(self):
+        interval = self.initial_interval
+        while True:
+            yield interval
+            interval = min(interval * self.backoff_factor, self.max_interval)
+
+    def wait(self, check, timeout_in_min, on_timeout=None):
+        """Call check() on the polling schedule until it returns something other than None.
+
+        Once timeout_in_min has elapsed the exception returned by on_timeout() is raised.
+        """
+        deadline = self.clock.time() + timeout_in_min * 60
+        for interval in self.intervals():
+            remaining = deadline - self.clock.time()
+            self.clock.sleep(max(min(interval, remaining), 0))
+            result = check()
+            if result is not None:
+                return result
+            if self.clock.time() >= deadline:
+                raise on_timeout() if on_timeout else HmcError("Job timed out!!")
+
+
+class HmcJob:
+    """Job submitted to the HMC and not waited for.
+
+    result, when given, turns the response of the completed job into the value
+    returned for it, as the waiting variant of the submitting method would.
+    """
+
+    def __init__(self, job_id, template=False, timeout_in_min=30, result=None):
+        self.job_id = job_id
+        self.template = template
+        self.timeout_in_min = timeout_in_min
+        self.result = result
+
+
+class HmcJobManager:
+    """Runs many jobs of one HMC together.
+
+    At most max_concurrent jobs run on the HMC at a time, the others are submitted
+    as running ones complete. All running jobs are checked in one poll loop on the
+    job_poll schedule of the client, and results are returned as jobs complete.
+    """
+
+    def __init__(self, rest_client, max_concurrent=4, poll=None):
+        if max_concurrent is None or max_concurrent < 1:
+            raise ParameterError("max_concurrent must be greater than 0")
+        self.rest_client = rest_client
+        self.max_concurrent = max_concurrent
+        self.poller = JobPoller.from_params(poll) if poll is not None else rest_client.job_poll
+        self.pending = []
+
+    def add(self, key, submit):
+        """Queue a job. submit is called without arguments when the job may start and
+        returns its HmcJob, e.g. functools.partial(rest_conn.getFreePhyVolume, vios_uuid, wait=False)
+        """
+        self.pending.append((key, submit))
+
+    def as_completed(self):
+        """Run the queued jobs and yield (key, result, error) tuples in completion order.
+
+        error is None for jobs completed OK, otherwise the exception raised while
+        submitting, checking or timing out the job.
+        """
+        clock = self.poller.clock
+        pending = self.pending
+        self.pending = []
+        running = []
+        intervals = self.poller.intervals()
+        while pending or running:
+            while pending and len(running) < self.max_concurrent:
+                key, submit = pending.pop(0)
+                try:
+                    job = submit()
+                except Exception as error:
+                    yield key, None, error
+                    continue
+                running.append((key, job, clock.time() + job.timeout_in_min * 60))
+            if not running:
+                continue
+
+            remaining = min(deadline for key, job, deadline in running) - clock.time()
+            clock.sleep(max(min(next(intervals), remaining), 0))
+            still_running = []
+            for key, job, deadline in running:
+                try:
+                    completed, doc = self.rest_client.checkJobStatus(job.job_id, job.template)
+                    if completed:
+                        yield key, job.result(doc) if job.result else doc, None
+                    elif clock.time() >= deadline:
+                        yield key, None, _jobTimeoutError(doc)
+                    else:
+                        still_running.append((key, job, deadline))
+                except Exception as error:
+                    yield key, None, error
+            running = still_running
+
+    def run(self):
+        """Run the queued jobs and return their results by key, in the order the jobs
+        were added. Once every job has finished, the first job error is raised.
+        """
+        keys = [key for key, submit in self.pending]
+        results = {}
+        first_error = None
+        for key, result, error in self.as_completed():
+            if error is not None and first_error is None:
+                first_error = error
+            results[key] = result
+        if first_error is not None:
+            raise first_error
+        return dict((key, results[key]) for key in keys)
+
+
+# Event types after which the HMC expects listeners to refresh all the objects they follow
+EVENT_RESYNC_TYPES = ('CACHE_CLEARED', 'INVALID_URI')
+# Shortest round of an event wait when the HMC answers at once without events
+EVENT_FEED_RETRY = 5
+
+
+class HmcEventListener:
+    """Waits for HMC objects to reach a state, woken up by the HMC REST event feed.
+
+    The condition is checked right away, then again as soon as the feed reports a
+    change of a watched object, and at least every poll_interval seconds in case
+    an event was missed. When the feed cannot be read the wait falls back to polling.
+    """
+
+    def __init__(self, rest_client, poll_interval=30, clock=None):
+        self.rest_client = rest_client
+        self.poll_interval = poll_interval
+        self.clock = clock or SystemClock()
+        self.feed_available = True
+
+    @classmethod
+    def connect(cls, hmc_ip, username, password, poll_interval=30):
+        # Returns None, for the caller to poll, when disabled through
+        # ANSIBLE_POWER_HMC_EVENT_FEED=false or when no REST session can be opened
+        if os.environ.get('ANSIBLE_POWER_HMC_EVENT_FEED') in ['False', 'false', 'FALSE', '0', 'no', 'No', 'NO']:
+            return None
+        try:
+            # A session of its own, out of the session cache, so that close logs it off
+            return cls(HmcRestClient(hmc_ip, username, password, session_cache_ttl=0), poll_interval)
+        except Exception as error:
+            logger.debug("HMC event feed unavailable, falling back to polling: %s", error)
+            return None
+
+    def close(self):
+        try:
+            self.rest_client.logoff()
+        except Exception as error:
+            logger.debug("Log off of the event listener session failed: %s", error)
+
+    def watchSystem(self, system_name):
+        # uuids whose events wake a wait on the system, None to wake on any event
+        try:
+            for system in json.loads(self.rest_client.getManagedSystemsQuick() or '[]'):
+                if system['SystemName'] == system_name:
+                    return [system['UUID']]
+        except Exception as error:
+            logger.debug("Unable to look up the uuid of %s: %s", system_name, error)
+        return None
+
+    def watchPartition(self, system_name, partition_name):
+        # uuids whose events wake a wait on the partition, None to wake on any event
+        system_uuids = self.watchSystem(system_name)
+        if not system_uuids:
+            return None
+        try:
+            for lpar in json.loads(self.rest_client.getLogicalPartitionsQuick(system_uuids[0]) or '[]'):
+                if lpar['PartitionName'] == partition_name:
+                    return [lpar['UUID']]
+        except Exception as error:
+            logger.debug("Unable to look up the uuid of %s: %s", partition_name, error)
+        return None
+
+    def wait(self, check, timeout_in_sec, watch=None):
+        """Return True as soon as check() does, or False once timeout_in_sec elapsed.
+
+        watch lists the uuids whose events trigger a check, None meaning any event.
+        """
+        deadline = self.clock.time() + timeout_in_sec
+        while True:
+            if check():
+                return True
+            now = self.clock.time()
+            if now >= deadline:
+                return False
+            self._waitForEvent(min(now + self.poll_interval, deadline), watch)
+
+    def _related(self, events, watch):
+        for event in events:
+            if watch is None or event['EventType'] in EVENT_RESYNC_TYPES:
+                return True
+            if any(uuid in (event['EventData'] or '') for uuid in watch):
+                return True
+        return False
+
+    def _waitForEvent(self, until, watch):
+        # Returns on the first related event, or at until at the latest
+        while True:
+            remaining = until - self.clock.time()
+            if remaining <= 0:
+                return
+            if not self.feed_available:
+                self.clock.sleep(remaining)
+                return
+            started = self.clock.time()
+            try:
+                events = self.rest_client.getEvents(timeout=remaining)
+            except Exception as error:
+                logger.debug("Reading the HMC event feed failed, falling back to polling: %s", error)
+                self.feed_available = False
+                continue
+            if self._related(events, watch):
+                return
+            if not events:
+                self.clock.sleep(max(min(started + EVENT_FEED_RETRY, until) - self.clock.time(), 0))
+
+
+class PooledResponse:
+    """Fully read response of a pooled request, exposing the parts of the open_url response used by this module"""
+
+    def __init__(self, url, code, reason, headers, body):
+        self.url = url
+        self.code = code
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def read(self):
+        return self.body
+
+    def getcode(self):
+        return self.code
+
+    def info(self):
+        return self.headers
+
+
+# Methods a pooled connection may send again when the HMC dropped it before answering
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'DELETE')
+
+
+class HmcConnectionPool:
+    """Keep-alive HTTPS connections to one HMC.
+
+    Connections are reused across requests instead of paying a TCP connect and
+    TLS handshake every time. Certificates are not validated, same as the
+    open_url calls of this module. Proxy settings from the environment are not
+    honoured, fall back to open_url if the HMC is only reachable through a proxy.
+    """
+
+    def __init__(self, host, max_size=4):
+        self.host = host
+        self.max_size = max_size
+        self.ssl_context = ssl.create_default_context()
+        self.ssl_context.check_hostname = False
+        self.ssl_context.verify_mode = ssl.CERT_NONE
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _acquire(self, timeout):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return http_client.HTTPSConnection(self.host, timeout=timeout, context=self.ssl_context), False
+
+    def _release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, url, method='GET', headers=None, data=None, timeout=300):
+        parsed = urlparse(url)
+        path = parsed.path + ('?' + parsed.query if parsed.query else '')
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+
+        while True:
+            conn, reused = self._acquire(timeout)
+            conn.timeout = timeout
+            if conn.sock:
+                conn.sock.settimeout(timeout)
+            sent = False
+            try:
+                conn.request(method, path, body=data, headers=headers or {})
+                sent = True
+                resp = conn.getresponse()
+                body = resp.read()
+            except (http_client.BadStatusLine, ConnectionError):
+                conn.close()
+                # The HMC closed an idle connection, retry once on a fresh one. A request
+                # which may have reached the HMC is only sent again when it is idempotent,
+                # a job or partition request replayed could otherwise run twice
+                if reused and (not sent or method.upper() in IDEMPOTENT_METHODS):
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            break
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+
+        if resp.status >= 300:
+            raise urllib_error.HTTPError(url, resp.status, resp.reason, resp.msg, io.BytesIO(body))
+        return PooledResponse(url, resp.status, resp.reason, resp.msg, body)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class HmcSessionCache:
+    """File backed cache of X-API-Session tokens, keyed by HMC host and user.
+
+    Lets consecutive tasks reuse one HMC session instead of logging on and off
+    every time. Entries live in a directory of the user that nobody else can
+    access and are ignored once they are older than ttl seconds.
+    """
+
+    def __init__(self, ttl, directory=None, clock=None):
+        self.cache = HmcFileCache('sessions', ttl, directory, clock or SystemClock())
+
+    def load(self, hmc_ip, username):
+        return self.cache.load(hmc_ip, username)
+
+    def store(self, hmc_ip, username, session):
+        self.cache.store(session, hmc_ip, username)
+
+    def invalidate(self, hmc_ip, username):
+        self.cache.invalidate(hmc_ip, username)
+
+    def lock(self, hmc_ip, username):
+        return self.cache.lock(hmc_ip, username)
+
+
 class HmcRestClient:
 
-    def __init__(self, hmc_ip, username, password):
+    def __init__(self, hmc_ip, username, password, job_poll=None, keep_alive=None, session_cache_ttl=None):
         if NEED_LXML:
             raise Error("Missing prerequisite lxml package. Hint pip install lxml")
         self.hmc_ip = hmc_ip
         self.username = username
         self.password = password
-
-        self.session = self.logon()
+        self.job_poll = JobPoller.from_params(job_poll)
+
+        # Requests go through a keep-alive connection pool unless disabled by the
+        # caller or by setting ANSIBLE_POWER_HMC_KEEP_ALIVE=false, in which case
+        # every request falls back to a fresh open_url connection
+        if keep_alive is None:
+            keep_alive = os.environ.get('ANSIBLE_POWER_HMC_KEEP_ALIVE') not in ['False', 'false', 'FALSE', '0', 'no', 'No', 'NO']
+        self.pool = HmcConnectionPool(hmc_ip) if keep_alive else None
+        self.request_timings = []
+        self.scsi_indexes = {}
+
+        # Sessions are shared between tasks only when a cache TTL in seconds is given
+        # by the caller or through ANSIBLE_POWER_HMC_SESSION_CACHE_TTL. Cached sessions
+        # are not logged off at the end of a task and are renewed when the HMC
+        # rejects them with 401
+        if session_cache_ttl is None:
+            session_cache_ttl = os.environ.get('ANSIBLE_POWER_HMC_SESSION_CACHE_TTL') or 0
+            try:
+                session_cache_ttl = int(session_cache_ttl)
+            except ValueError:
+                raise ParameterError("ANSIBLE_POWER_HMC_SESSION_CACHE_TTL must be a number of seconds, not '{0}'".format(session_cache_ttl))
+        self.session_cache = HmcSessionCache(session_cache_ttl) if session_cache_ttl > 0 else None
+
+        self.logon_lock = threading.Lock()
+        self.session = None
+        self.session_from_cache = False
+        if self.session_cache:
+            # One process logs on at a time, so that the forks of a play starting on a
+            # cold cache share the first session instead of each leaving its own behind
+            with self.session_cache.lock(hmc_ip, username):
+                self.session = self.session_cache.load(hmc_ip, username)
+                self.session_from_cache = self.session is not None
+                if not self.session:
+                    self.session = self.logon()
+                    self.session_cache.store(hmc_ip, username, self.session)
+        else:
+            self.session = self.logon()
         logger.debug(self.session)
 
+    def _open_url(self, url, headers=None, method='GET', data=None, timeout=300):
+        try:
+            return self._timed_open_url(url, headers, method, data, timeout)
+        except urllib_error.HTTPError as error:
+            if error.code != 401 or 'X-API-Session' not in (headers or {}):
+                raise
+            # The cached session expired on the HMC, log on again and replay the request.
+            # Threads sharing the client log on only once, the others replay their
+            # request with the session renewed meanwhile
+            stale_session = headers['X-API-Session']
+            with self.logon_lock:
+                if stale_session == self.session:
+                    if not self.session_from_cache:
+                        raise
+                    # another process may already have renewed the cached session
+                    with self.session_cache.lock(self.hmc_ip, self.username):
+                        cached_session = self.session_cache.load(self.hmc_ip, self.username)
+                        if cached_session and cached_session != stale_session:
+                            self.session = cached_session
+                        else:
+                            logger.debug("Cached session rejected by %s, logging on again", self.hmc_ip)
+                            self.session = self.logon()
+                            self.session_from_cache = False
+                            self.session_cache.store(self.hmc_ip, self.username, self.session)
+                session = self.session
+            headers = dict(headers, **{'X-API-Session': session})
+            if isinstance(data, str):
+                data = data.replace(stale_session, session)
+            return self._timed_open_url(url, headers, method, data, timeout)
+
+    def _timed_open_url(self, url, headers, method, data, timeout):
+        start = time.time()
+        try:
+            if self.pool:
+                return self.pool.request(url, method=method, headers=headers, data=data, timeout=timeout)
+            return open_url(url,
+                            headers=headers,
+                            method=method,
+                            data=data,
+                            validate_certs=False,
+                            force_basic_auth=True,
+                            timeout=timeout)
+        finally:
+            elapsed = time.time() - start
+            self.request_timings.append({'method': method, 'url': url, 'elapsed': round(elapsed, 3)})
+            logger.debug("%s %s took %.3fs", method, url, elapsed)
+
     def logon(self):
         header = {'Content-Type': 'application/vnd.ibm.powervm.web+xml; type=LogonRequest'}
 
         url = "https://{0}/rest/api/web/Logon".format(self.hmc_ip)
 
-        resp = open_url(url,
-                        headers=header,
-                        method='PUT',
-                        data=_logonPayload(self.username, self.password),
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='PUT',
+                              data=_logonPayload(self.username, self.password),
+                              timeout=300)
         logger.debug(resp.code)
 
         response = resp.read()
@@ -270,82 +842,111 @@ class HmcRestClient:
                   'X-API-Session': self.session}
         url = "https://{0}/rest/api/web/Logon".format(self.hmc_ip)
 
-        open_url(url,
-                 headers=header,
-                 method='DELETE',
-                 validate_certs=False,
-                 force_basic_auth=True,
-                 timeout=300)
-
-    def fetchJobStatus(self, jobId, template=False, timeout_in_min=30):
-
+        try:
+            # keep a cached session alive for the next task
+            if self.session_cache:
+                return
+            self._open_url(url,
+                           headers=header,
+                           method='DELETE',
+                           timeout=300)
+        finally:
+            if self.pool:
+                self.pool.close()
+
+    def checkJobStatus(self, jobId, template=False):
+        # Single status check of a job. Returns whether the job completed OK together
+        # with the job response, and raises HmcError when the job failed
         if template:
             url = "https://{0}/rest/api/templates/jobs/{1}".format(self.hmc_ip, jobId)
         else:
             url = "https://{0}/rest/api/uom/jobs/{1}".format(self.hmc_ip, jobId)
 
         header = {'X-API-Session': self.session, 'Accept': "application/atom+xml"}
-        result = None
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=300).read()
+        doc = xml_strip_namespace(resp)
 
-        jobStatus = ''
-        timeout_counter = 0
-        while True:
-            time.sleep(30)
-            timeout_counter += 1
-            resp = open_url(url,
-                            headers=header,
-                            method='GET',
-                            validate_certs=False,
-                            force_basic_auth=True,
-                            timeout=300).read()
-            doc = xml_strip_namespace(resp)
+        jobStatus = doc.xpath('//Status')[0].text
+        logger.debug("jobStatus: %s", jobStatus)
 
-            jobStatus = doc.xpath('//Status')[0].text
+        if jobStatus == 'COMPLETED_OK':
+            logger.debug(resp)
+            return True, doc
+
+        if jobStatus == 'COMPLETED_WITH_ERROR':
             logger.debug("jobStatus: %s", jobStatus)
+            resp_msg = None
+            resp_msg = doc.xpath("//ParameterName[text()='result']/following-sibling::ParameterValue")
+            if resp_msg:
+                logger.debug("debugger: %s", resp_msg[0].text)
+                raise HmcError(resp_msg[0].text.strip('\n'))
+            else:
+                err_msg = "Failed: Job completed with error"
+                raise HmcError(err_msg)
 
-            if jobStatus == 'COMPLETED_OK':
-                logger.debug(resp)
-                result = doc
-                break
+        if jobStatus != 'RUNNING':
+            logger.debug("jobStatus: %s", jobStatus)
+            err_msg_l = doc.xpath("//ResponseException//Message")
+            err_msg_l = doc.xpath("//ParameterName[text()='ExceptionText']/following-sibling::ParameterValue") if not err_msg_l else err_msg_l
+            if not err_msg_l:
+                err_msg = 'Job failed.'
+            else:
+                err_msg = err_msg_l[0].text
+            raise HmcError(err_msg)
 
-            if jobStatus == 'COMPLETED_WITH_ERROR':
-                logger.debug("jobStatus: %s", jobStatus)
-                resp_msg = None
-                resp_msg = doc.xpath("//ParameterName[text()='result']/following-sibling::ParameterValue")
-                if resp_msg:
-                    logger.debug("debugger: %s", resp_msg[0].text)
-                    raise HmcError(resp_msg[0].text.strip('\n'))
-                else:
-                    err_msg = "Failed: Job completed with error"
-                    raise HmcError(err_msg)
-
-            if jobStatus != 'RUNNING':
-                logger.debug("jobStatus: %s", jobStatus)
-                err_msg_l = doc.xpath("//ResponseException//Message")
-                err_msg_l = doc.xpath("//ParameterName[text()='ExceptionText']/following-sibling::ParameterValue") if not err_msg_l else err_msg_l
-                if not err_msg_l:
-                    err_msg = 'Job failed.'
-                else:
-                    err_msg = err_msg_l[0].text
-                raise HmcError(err_msg)
+        return False, doc
+
+    def fetchJobStatus(self, jobId, template=False, timeout_in_min=30, poll=None):
+        poller = JobPoller.from_params(poll) if poll is not None else self.job_poll
+        last_doc = {}
 
-            if timeout_counter == timeout_in_min * 2:
-                job_name = doc.xpath("//OperationName")[0].text.strip()
-                logger.debug("%s job stuck in %s state. Timed out!!", job_name, jobStatus)
-                raise HmcError("Job: {0} timed out!!".format(job_name))
+        def _checkJob():
+            completed, doc = self.checkJobStatus(jobId, template)
+            last_doc['doc'] = doc
+            return doc if completed else None
 
-        return result
+        def _timedOut():
+            return _jobTimeoutError(last_doc['doc'])
+
+        return poller.wait(_checkJob, timeout_in_min, _timedOut)
+
+    def getEvents(self, timeout=30):
+        # Long poll of the event feed of this session. Returns the events raised since
+        # the previous call, as dicts of EventType, EventID, EventData and EventDetail,
+        # or an empty list when none was raised within timeout seconds
+        url = "https://{0}/rest/api/uom/Event".format(self.hmc_ip)
+        header = {'X-API-Session': self.session,
+                  'Accept': 'application/atom+xml'}
+        try:
+            resp = self._open_url(url,
+                                  headers=header,
+                                  method='GET',
+                                  timeout=timeout)
+        except socket.timeout:
+            return []
+        except urllib_error.URLError as error:
+            if isinstance(error.reason, socket.timeout):
+                return []
+            raise
+        if resp.code == 204:
+            return []
+
+        events = []
+        for event in xml_strip_namespace(resp.read()).xpath('//Event'):
+            events.append(dict((field, event.findtext(field)) for field in ('EventType', 'EventID', 'EventData', 'EventDetail')))
+        return events
 
     def getManagedSystem(self, system_name):
         url = "https://{0}/rest/api/uom/ManagedSystem/search/(SystemName=='{1}')".format(self.hmc_ip, system_name)
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=ManagedSystem'}
-        response = open_url(url,
-                            headers=header,
-                            method='GET',
-                            validate_certs=False,
-                            force_basic_auth=True,
-                            timeout=300)
+        response = self._open_url(url,
+                                  headers=header,
+                                  method='GET',
+                                  timeout=300)
         if response.code == 204:
             return None, None
 
@@ -359,12 +960,10 @@ class HmcRestClient:
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=ManagedSystem'}
 
-        response = open_url(url,
-                            headers=header,
-                            method='GET',
-                            validate_certs=False,
-                            force_basic_auth=True,
-                            timeout=3600)
+        response = self._open_url(url,
+                                  headers=header,
+                                  method='GET',
+                                  timeout=3600)
 
         if response.code == 204:
             return None, None
@@ -376,12 +975,10 @@ class HmcRestClient:
         url = "https://{0}/rest/api/uom/ManagedSystem/quick/All".format(self.hmc_ip)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=300)
         if resp.code != 200:
             logger.debug("Get of Managed Systems failed. Respsonse code: %d", resp.code)
             return None
@@ -392,12 +989,10 @@ class HmcRestClient:
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/quick".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=300)
         if resp.code != 200:
             logger.debug("Get of Logical Partition failed. Respsonse code: %d", resp.code)
             return None
@@ -427,12 +1022,10 @@ class HmcRestClient:
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=LogicalPartition'}
 
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=300)
         if resp.code != 200:
             logger.debug("Get of Logical Partition failed. Respsonse code: %d", resp.code)
             return None, None
@@ -448,28 +1041,44 @@ class HmcRestClient:
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/LogicalPartition?group=Advanced".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=LogicalPartition'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=3600)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=3600)
         if resp.code != 200:
             logger.debug("Get of Logical Partitions failed. Respsonse code: %d", resp.code)
             return None
         response = resp.read()
         return response
 
+    def getLogicalPartitionDoms(self, system_uuid):
+        # Full configuration of every partition of the system from one feed call, by partition
+        # name as (uuid, partition dom), each dom shaped like the one of getLogicalPartition
+        url = "https://{0}/rest/api/uom/ManagedSystem/{1}/LogicalPartition".format(self.hmc_ip, system_uuid)
+        header = {'X-API-Session': self.session,
+                  'Accept': 'application/vnd.ibm.powervm.uom+xml; type=LogicalPartition'}
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=3600)
+        if resp.code != 200:
+            logger.debug("Get of Logical Partitions failed. Respsonse code: %d", resp.code)
+            return {}
+
+        partitions = {}
+        for partition in xml_strip_namespace(resp.read()).xpath('//entry/content/LogicalPartition'):
+            partition_dom = copy.deepcopy(partition)
+            partitions[partition_dom.xpath('//PartitionName')[0].text] = (partition_dom.xpath('//AtomID')[0].text, partition_dom)
+        return partitions
+
     def getLogicalPartitionsQuick(self, system_uuid):
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/LogicalPartition/quick/All".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=300)
         if resp.code != 200:
             logger.debug("Get of Logical Partitions failed. Respsonse code: %d", resp.code)
             return None
@@ -480,12 +1089,10 @@ class HmcRestClient:
         url = "https://{0}/rest/api/uom/LogicalPartition/{1}/quick".format(self.hmc_ip, partition_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=300)
         if resp.code != 200:
             logger.debug("Get of Logical Partition failed. Respsonse code: %d", resp.code)
             return None
@@ -496,12 +1103,10 @@ class HmcRestClient:
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/VirtualIOServer?group={2}".format(self.hmc_ip, system_uuid, group)
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=VirtualIOServer'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=3600)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=3600)
         if resp.code != 200:
             logger.debug("Get of Virtual IO Servers failed. Respsonse code: %d", resp.code)
             return None
@@ -512,12 +1117,10 @@ class HmcRestClient:
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/VirtualIOServer/quick/All".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=300)
         if resp.code != 200:
             logger.debug("Get of Virtual IO Servers failed. Respsonse code: %d", resp.code)
             return None
@@ -533,12 +1136,10 @@ class HmcRestClient:
         else:
             url = "https://{0}/rest/api/uom/VirtualIOServer/{1}".format(self.hmc_ip, vios_uuid)
 
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=3600)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=3600)
 
         if resp.code != 200:
             logger.debug("Get of Virtual IO Server failed. Respsonse code: %d", resp.code)
@@ -551,12 +1152,10 @@ class HmcRestClient:
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=LogicalPartition'}
 
-        open_url(url,
-                 headers=header,
-                 method='DELETE',
-                 validate_certs=False,
-                 force_basic_auth=True,
-                 timeout=300)
+        self._open_url(url,
+                       headers=header,
+                       method='DELETE',
+                       timeout=300)
 
     def updateLparNameAndIDToDom(self, template_xml, config_dict):
         if 'lpar_id' in config_dict:
@@ -620,24 +1219,20 @@ class HmcRestClient:
         partiton_template_xmlstr = partiton_template_xmlstr.decode("utf-8").replace("PartitionTemplate", LPAR_TEMPLATE_NS, 1)
         logger.debug(partiton_template_xmlstr)
 
-        resp = open_url(templateUrl,
-                        headers=header,
-                        data=partiton_template_xmlstr,
-                        method='POST',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
+        resp = self._open_url(templateUrl,
+                              headers=header,
+                              data=partiton_template_xmlstr,
+                              method='POST',
+                              timeout=300).read()
         logger.debug(resp.decode("utf-8"))
 
     def quickGetPartition(self, lpar_uuid):
         header = {'X-API-Session': self.session}
         url = "https://{0}/rest/api/uom/LogicalPartition/{1}/quick".format(self.hmc_ip, lpar_uuid)
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=300)
 
         lpar_quick_dom = resp.read()
         lpar_dict = json.loads(lpar_quick_dom)
@@ -647,12 +1242,10 @@ class HmcRestClient:
         header = {'X-API-Session': self.session}
         url = "https://{0}/rest/api/templates/PartitionTemplate?draft=false&detail=table".format(self.hmc_ip)
 
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=300)
         if resp.code == 200:
             response = resp.read()
         else:
@@ -675,12 +1268,10 @@ class HmcRestClient:
 
         templateUrl = "https://{0}/rest/api/templates/PartitionTemplate/{1}".format(self.hmc_ip, uuid)
         logger.debug(templateUrl)
-        resp = open_url(templateUrl,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._open_url(templateUrl,
+                              headers=header,
+                              method='GET',
+                              timeout=300)
         if resp.code == 200:
             response = resp.read()
         else:
@@ -703,13 +1294,11 @@ class HmcRestClient:
         partiton_template_xmlstr = partiton_template_xmlstr.decode("utf-8").replace("PartitionTemplate", templateNamespace, 1)
 
         templateUrl = "https://{0}/rest/api/templates/PartitionTemplate".format(self.hmc_ip)
-        resp = open_url(templateUrl,
-                        headers=header,
-                        data=partiton_template_xmlstr,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._open_url(templateUrl,
+                              headers=header,
+                              data=partiton_template_xmlstr,
+                              method='PUT',
+                              timeout=300)
         # This is to handle the case of unauthorized access, instead of getting error http code seems to be 200
         response = resp.read()
         response_dom = xml_strip_namespace(response)
@@ -730,14 +1319,12 @@ class HmcRestClient:
 
         templateUrl = "https://{0}/rest/api/templates/PartitionTemplate/{1}".format(self.hmc_ip, template_uuid)
         logger.debug(templateUrl)
-        open_url(templateUrl,
-                 headers=header,
-                 method='DELETE',
-                 validate_certs=False,
-                 force_basic_auth=True,
-                 timeout=300)
-
-    def checkPartitionTemplate(self, template_name, cec_uuid):
+        self._open_url(templateUrl,
+                       headers=header,
+                       method='DELETE',
+                       timeout=300)
+
+    def checkPartitionTemplate(self, template_name, cec_uuid, poll=None, wait=True):
         header = _jobHeader(self.session)
 
         partiton_template_doc = self.getPartitionTemplate(name=template_name)
@@ -754,21 +1341,20 @@ class HmcRestClient:
                      'TargetUuid': cec_uuid}
 
         payload = _job_RequestPayload(reqdOperation, jobParams)
-        resp = open_url(check_url,
-                        headers=header,
-                        data=payload,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
+        resp = self._open_url(check_url,
+                              headers=header,
+                              data=payload,
+                              method='PUT',
+                              timeout=300).read()
 
         checkjob_resp = xml_strip_namespace(resp)
 
         jobID = checkjob_resp.xpath('//JobID')[0].text
+        if not wait:
+            return HmcJob(jobID, template=True)
+        return self.fetchJobStatus(jobID, template=True, poll=poll)
 
-        return self.fetchJobStatus(jobID, template=True)
-
-    def deployPartitionTemplate(self, draft_uuid, cec_uuid):
+    def deployPartitionTemplate(self, draft_uuid, cec_uuid, poll=None, wait=True):
 
         url = "https://{0}/rest/api/templates/PartitionTemplate/{1}/do/deploy".format(self.hmc_ip, draft_uuid)
 
@@ -782,19 +1368,19 @@ class HmcRestClient:
                      'TargetUuid': cec_uuid}
 
         payload = _job_RequestPayload(reqdOperation, jobParams)
-        resp = open_url(url,
-                        headers=header,
-                        data=payload,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
+        resp = self._open_url(url,
+                              headers=header,
+                              data=payload,
+                              method='PUT',
+                              timeout=300).read()
 
         deploy_resp = xml_strip_namespace(resp)
         jobID = deploy_resp.xpath('//JobID')[0].text
-        return self.fetchJobStatus(jobID, template=True)
+        if not wait:
+            return HmcJob(jobID, template=True)
+        return self.fetchJobStatus(jobID, template=True, poll=poll)
 
-    def transformPartitionTemplate(self, draft_uuid, cec_uuid):
+    def transformPartitionTemplate(self, draft_uuid, cec_uuid, poll=None):
 
         url = "https://{0}/rest/api/templates/PartitionTemplate/{1}/do/transform".format(self.hmc_ip, draft_uuid)
         header = _jobHeader(self.session)
@@ -808,19 +1394,17 @@ class HmcRestClient:
 
         payload = _job_RequestPayload(reqdOperation, jobParams)
 
-        resp = open_url(url,
-                        headers=header,
-                        data=payload,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
+        resp = self._open_url(url,
+                              headers=header,
+                              data=payload,
+                              method='PUT',
+                              timeout=300).read()
 
         transform_resp = xml_strip_namespace(resp)
         jobID = transform_resp.xpath('//JobID')[0].text
-        return self.fetchJobStatus(jobID, template=True)
+        return self.fetchJobStatus(jobID, template=True, poll=poll)
 
-    def poweroffPartition(self, vm_uuid, restart, shutdown_option):
+    def poweroffPartition(self, vm_uuid, restart, shutdown_option, poll=None, wait=True):
         url = "https://{0}/rest/api/uom/LogicalPartition/{1}/do/PowerOff".format(self.hmc_ip, vm_uuid)
         header = _jobHeader(self.session)
 
@@ -857,19 +1441,19 @@ class HmcRestClient:
 
         payload = _job_RequestPayload(reqdOperation, jobParams)
 
-        resp = open_url(url,
-                        headers=header,
-                        data=payload,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
+        resp = self._open_url(url,
+                              headers=header,
+                              data=payload,
+                              method='PUT',
+                              timeout=300).read()
 
         shutdown_resp = xml_strip_namespace(resp)
         jobID = shutdown_resp.xpath('//JobID')[0].text
-        return self.fetchJobStatus(jobID, timeout_in_min=10)
+        if not wait:
+            return HmcJob(jobID, timeout_in_min=10)
+        return self.fetchJobStatus(jobID, timeout_in_min=10, poll=poll)
 
-    def poweronPartition(self, vm_uuid, prof_uuid, keylock, iIPLsource, os_type):
+    def poweronPartition(self, vm_uuid, prof_uuid, keylock, iIPLsource, os_type, poll=None, wait=True):
         url = "https://{0}/rest/api/uom/LogicalPartition/{1}/do/PowerOn".format(self.hmc_ip, vm_uuid)
         header = _jobHeader(self.session)
 
@@ -894,29 +1478,27 @@ class HmcRestClient:
 
         payload = _job_RequestPayload(reqdOperation, jobParams)
 
-        resp = open_url(url,
-                        headers=header,
-                        data=payload,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
+        resp = self._open_url(url,
+                              headers=header,
+                              data=payload,
+                              method='PUT',
+                              timeout=300).read()
 
         activate_resp = xml_strip_namespace(resp)
         jobID = activate_resp.xpath('//JobID')[0].text
-        return self.fetchJobStatus(jobID, timeout_in_min=10)
+        if not wait:
+            return HmcJob(jobID, timeout_in_min=10)
+        return self.fetchJobStatus(jobID, timeout_in_min=10, poll=poll)
 
     def getPartitionProfiles(self, vm_uuid):
         url = "https://{0}/rest/api/uom/LogicalPartition/{1}/LogicalPartitionProfile".format(self.hmc_ip, vm_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': 'application/vnd.ibm.powervm.uom+xml; type=LogicalPartitionProfile'}
 
-        response = open_url(url,
-                            headers=header,
-                            method='GET',
-                            validate_certs=False,
-                            force_basic_auth=True,
-                            timeout=300)
+        response = self._open_url(url,
+                                  headers=header,
+                                  method='GET',
+                                  timeout=300)
 
         if response.code == 204:
             return None
@@ -976,7 +1558,7 @@ class HmcRestClient:
         suspendEnableTag = lpar_template_dom.xpath("//suspendEnable")[0]
         suspendEnableTag.addprevious(etree.XML(vscsi_client_payload))
 
-    def getFreePhyVolume(self, vios_uuid):
+    def getFreePhyVolume(self, vios_uuid, poll=None, wait=True):
         logger.debug(vios_uuid)
         url = "https://{0}/rest/api/uom/VirtualIOServer/{1}/do/GetFreePhysicalVolumes".format(self.hmc_ip, vios_uuid)
         header = _jobHeader(self.session)
@@ -988,18 +1570,19 @@ class HmcRestClient:
 
         payload = _job_RequestPayload(reqdOperation, jobParams, "V1_3_0")
 
-        resp = open_url(url,
-                        headers=header,
-                        data=payload,
-                        method='PUT',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300).read()
+        resp = self._open_url(url,
+                              headers=header,
+                              data=payload,
+                              method='PUT',
+                              timeout=300).read()
 
         resp = xml_strip_namespace(resp)
         jobID = resp.xpath('//JobID')[0].text
+        if not wait:
+            return HmcJob(jobID, result=self.parseFreePhyVolumes)
+        return self.parseFreePhyVolumes(self.fetchJobStatus(jobID, poll=poll))
 
-        pv_resp = self.fetchJobStatus(jobID)
+    def parseFreePhyVolumes(self, pv_resp):
         logger.debug("Free Physical Volume job response")
         logger.debug(pv_resp)
         pv_xml = pv_resp.xpath("//Results//ParameterName[text()='result']//following-sibling::ParameterValue")[0].text
@@ -1012,12 +1595,10 @@ class HmcRestClient:
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/VirtualNetwork/quick/All".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=300)
         if resp.code != 200:
             logger.debug("Get of Logical Partitions failed. Respsonse code: %d", resp.code)
             return None
@@ -1125,89 +1706,108 @@ class HmcRestClient:
         if not vios_list:
             return vfcs
         vios_dict = {vios['PartitionID']: vios['PartitionName'] for vios in vios_list}
+        xpaths = HMC_XPATHS
 
         try:
             vios_fc_xml = xml_strip_namespace(self.getVirtualIOServers(system_uuid, 'ViosFCMapping'))
-            vios_fcs = vios_fc_xml.xpath('//VirtualFibreChannelMapping')
-            for vios_fc_raw in vios_fcs:
+            vios_fcs = xpaths['fc_mappings'](vios_fc_xml)
+            for vios_fc in vios_fcs:
                 vfc_dict = {}
-                vios_fc = etree.ElementTree(vios_fc_raw)
-                if vios_fc.find('//ClientAdapter') is None:
+                if not xpaths['client_adapter'](vios_fc):
                     continue
-                part_id = vios_fc.xpath('//ClientAdapter/LocalPartitionID')[0].text
+                part_id = xpaths['client_partition_id'](vios_fc)[0].text
                 if str(lpar_id) == str(part_id):
-                    vios_id = int(vios_fc.xpath('//ClientAdapter/ConnectingPartitionID')[0].text)
-                    vfc_dict['PortName'] = vios_fc.xpath('//ServerAdapter/PhysicalPort/PortName')[0].text
+                    vios_id = int(xpaths['client_connecting_partition_id'](vios_fc)[0].text)
+                    vfc_dict['PortName'] = xpaths['server_port_name'](vios_fc)[0].text
                     vfc_dict['vios'] = vios_dict[vios_id]
-                    vfc_dict['LocationCode'] = vios_fc.xpath('//ServerAdapter/PhysicalPort/LocationCode')[0].text
-                    vfc_dict['WWPNs'] = vios_fc.xpath('//ClientAdapter/WWPNs')[0].text
-                    vfc_dict['ClientVirtualSlotNumber'] = vios_fc.xpath('//ClientAdapter/VirtualSlotNumber')[0].text
-                    vfc_dict['ServerVirtualSlotNumber'] = vios_fc.xpath('//ClientAdapter/ConnectingVirtualSlotNumber')[0].text
+                    vfc_dict['LocationCode'] = xpaths['server_port_location_code'](vios_fc)[0].text
+                    vfc_dict['WWPNs'] = xpaths['client_wwpns'](vios_fc)[0].text
+                    vfc_dict['ClientVirtualSlotNumber'] = xpaths['client_slot'](vios_fc)[0].text
+                    vfc_dict['ServerVirtualSlotNumber'] = xpaths['client_connecting_slot'](vios_fc)[0].text
                     vfcs.append(vfc_dict)
         except Exception:
             pass
 
         return vfcs
 
-    def fetchSCSIDetailsFromVIOS(self, system_uuid, lpar_id, vios_list):
-        vscsis = []
-        if not vios_list:
-            return vscsis
+    def _indexSCSIMapping(self, vios_scsi, vios_dict, scsi_index, volume_index):
+        vscsi_dict = {}
+        xpaths = HMC_XPATHS
+        part_id = xpaths['client_partition_id'](vios_scsi)[0].text
+        # Adds the PVs
+        volume_unique_ids = xpaths['storage_pv_unique_id'](vios_scsi)
+        if volume_unique_ids:
+            volumeUniqueID = volume_unique_ids[0].text
+            vios_id = int(xpaths['client_remote_partition_id'](vios_scsi)[0].text)
+            vol_dict = {"vios": vios_dict[vios_id], 'name': xpaths['storage_pv_name'](vios_scsi)[0].text}
+            volumes = volume_index.setdefault(part_id, {})
+            if volumeUniqueID in volumes:
+                volumes[volumeUniqueID]['Volume'].append(vol_dict)
+                return
+            vscsi_dict['VolumeUniqueID'] = volumeUniqueID
+            vscsi_dict['Volume'] = [vol_dict]
+            vscsi_dict['ClientVirtualSlotNumber'] = xpaths['client_slot'](vios_scsi)[0].text
+            vscsi_dict['ServerVirtualSlotNumber'] = xpaths['client_remote_slot'](vios_scsi)[0].text
+            vscsi_dict['TargetDeviceName'] = xpaths['target_name'](vios_scsi)[0].text
+            vscsi_dict['VolumeCapacity'] = xpaths['storage_pv_capacity'](vios_scsi)[0].text
+            volumes[volumeUniqueID] = vscsi_dict
+            scsi_index.setdefault(part_id, []).append(vscsi_dict)
+        # Adds the VOD
+        elif xpaths['target_optical_device'](vios_scsi):
+            vscsi_dict['ClientVirtualSlotNumber'] = xpaths['client_slot'](vios_scsi)[0].text
+            vscsi_dict['ServerVirtualSlotNumber'] = xpaths['client_remote_slot'](vios_scsi)[0].text
+            vscsi_dict['TargetName'] = xpaths['target_optical_name'](vios_scsi)[0].text
+            if xpaths['storage'](vios_scsi):
+                vscsi_dict['MediaName'] = xpaths['storage_media_name'](vios_scsi)[0].text
+                vscsi_dict['MountType'] = xpaths['storage_mount_type'](vios_scsi)[0].text
+                vscsi_dict['Size'] = xpaths['storage_size'](vios_scsi)[0].text
+            scsi_index.setdefault(part_id, []).append(vscsi_dict)
+
+    def fetchSCSIIndexFromVIOS(self, system_uuid, vios_list):
+        # Builds the vSCSI details of every client partition of the system, keyed by
+        # partition ID, in one pass over the ViosSCSIMapping feed. Volumes mapped through
+        # several VIOSes are merged through a VolumeUniqueID lookup per partition. The
+        # index is reused by later calls until a VIOS is updated through this client.
         vios_dict = {vios['PartitionID']: vios['PartitionName'] for vios in vios_list}
+        index_key = (system_uuid, tuple(sorted(vios_dict.items())))
+        if index_key in self.scsi_indexes:
+            return self.scsi_indexes[index_key]
+        scsi_index = {}
+        volume_index = {}
+        xpaths = HMC_XPATHS
 
         try:
             vios_scsi_xml = xml_strip_namespace(self.getVirtualIOServers(system_uuid, 'ViosSCSIMapping'))
-            vios_scsis = vios_scsi_xml.xpath('//VirtualSCSIMapping')
-            for vios_scsi_raw in vios_scsis:
-                vscsi_dict = {}
-                vios_scsi = etree.ElementTree(vios_scsi_raw)
-                # This code is to handle stale adapters
-                if len(vios_scsi.xpath('//ClientAdapter')) < 1:
-                    continue
-                part_id = vios_scsi.xpath('//ClientAdapter/LocalPartitionID')[0].text
-                if str(lpar_id) == str(part_id):
-                    # Adds the PVs
-                    if len(vios_scsi.xpath('//Storage/PhysicalVolume/VolumeUniqueID')) >= 1:
-                        volumeUniqueID = vios_scsi.xpath('//Storage/PhysicalVolume/VolumeUniqueID')[0].text
-                        vscsi_dict['VolumeUniqueID'] = volumeUniqueID
-                        vios_id = int(vios_scsi.xpath('//ClientAdapter/RemoteLogicalPartitionID')[0].text)
-                        vol_dict = {"vios": vios_dict[vios_id], 'name': vios_scsi.xpath('//Storage/PhysicalVolume/VolumeName')[0].text}
-                        vscsi_dict['Volume'] = [vol_dict]
-                        flag = False
-                        for vscsi in vscsis:
-                            if 'VolumeUniqueID' in vscsi and vscsi['VolumeUniqueID'] == volumeUniqueID:
-                                vscsi['Volume'].append(vol_dict)
-                                flag = True
-                        if not flag:
-                            vscsi_dict['ClientVirtualSlotNumber'] = vios_scsi.xpath('//ClientAdapter/VirtualSlotNumber')[0].text
-                            vscsi_dict['ServerVirtualSlotNumber'] = vios_scsi.xpath('//ClientAdapter/RemoteSlotNumber')[0].text
-                            vscsi_dict['TargetDeviceName'] = vios_scsi.xpath('//TargetDevice//TargetName')[0].text
-                            vscsi_dict['VolumeCapacity'] = vios_scsi.xpath('//Storage/PhysicalVolume/VolumeCapacity')[0].text
-                            vscsis.append(vscsi_dict)
-                    # Adds the VOD
-                    elif len(vios_scsi.xpath('//TargetDevice/VirtualOpticalTargetDevice')) >= 1:
-                        vscsi_dict['ClientVirtualSlotNumber'] = vios_scsi.xpath('//ClientAdapter/VirtualSlotNumber')[0].text
-                        vscsi_dict['ServerVirtualSlotNumber'] = vios_scsi.xpath('//ClientAdapter/RemoteSlotNumber')[0].text
-                        vscsi_dict['TargetName'] = vios_scsi.xpath('//TargetDevice/VirtualOpticalTargetDevice/TargetName')[0].text
-                        if len(vios_scsi.xpath('//Storage')) >= 1:
-                            vscsi_dict['MediaName'] = vios_scsi.xpath('//Storage//MediaName')[0].text
-                            vscsi_dict['MountType'] = vios_scsi.xpath('//Storage//MountType')[0].text
-                            vscsi_dict['Size'] = vios_scsi.xpath('//Storage//Size')[0].text
-                        vscsis.append(vscsi_dict)
-        except Exception:
-            pass
-        return vscsis
+        except Exception as error:
+            logger.debug("Unable to read the vSCSI mappings of %s: %s", system_uuid, error)
+            return scsi_index
+        for vios_scsi in xpaths['scsi_mappings'](vios_scsi_xml):
+            # This code is to handle stale adapters
+            if not xpaths['client_adapter'](vios_scsi):
+                continue
+            # A mapping missing some detail is skipped without dropping the others
+            try:
+                self._indexSCSIMapping(vios_scsi, vios_dict, scsi_index, volume_index)
+            except (KeyError, IndexError, ValueError, TypeError) as error:
+                logger.debug("Skipping incomplete vSCSI mapping of %s: %r", system_uuid, error)
+        self.scsi_indexes[index_key] = scsi_index
+        return scsi_index
+
+    def fetchSCSIDetailsFromVIOS(self, system_uuid, lpar_id, vios_list):
+        vscsis = []
+        if not vios_list:
+            return vscsis
+        # Copies, so that callers editing the details leave the cached index as it is
+        return copy.deepcopy(self.fetchSCSIIndexFromVIOS(system_uuid, vios_list).get(str(lpar_id), vscsis))
 
     def getSharedProcessorPools(self, system_uuid):
         url = "https://{0}/rest/api/uom/ManagedSystem/{1}/SharedProcessorPool".format(self.hmc_ip, system_uuid)
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=300)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=300)
         if resp.code != 200:
             logger.debug("Get of Shared Processor Pool failed. Respsonse code: %d", resp.code)
             return None
@@ -1401,12 +2001,10 @@ class HmcRestClient:
     def generic_get(self, url):
         header = {'X-API-Session': self.session,
                   'Accept': '*/*'}
-        resp = open_url(url,
-                        headers=header,
-                        method='GET',
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=3600)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='GET',
+                              timeout=3600)
         if resp.code != 200:
             logger.debug("Get operation failed. Respsonse code: %d", resp.code)
             return None
@@ -1504,13 +2102,11 @@ class HmcRestClient:
         partiton_xmlstr = etree.tostring(partition_dom)
         partiton_xmlstr = partiton_xmlstr.decode("utf-8").replace("LogicalPartition", LPAR_NS, 1)
         logger.debug("INPUT PAYLOAD: \n %s", partiton_xmlstr)
-        resp = open_url(url,
-                        headers=header,
-                        method='POST',
-                        data=partiton_xmlstr,
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=timeout_in_sec)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='POST',
+                              data=partiton_xmlstr,
+                              timeout=timeout_in_sec)
         if resp.code != 200:
             logger.debug("Post operation failed. Respsonse code: %d", resp.code)
             return None
@@ -1552,33 +2148,22 @@ class HmcRestClient:
                 vnics_list.append(vnic_dict)
         return vnics_list
 
-    def fetchTaggedGroupItems(self):
+    def fetchTaggedGroupMembership(self):
+        # Maps the uuid of each partition, system and VIOS to the names of the tagged
+        # groups holding it, in group order, in a single pass over the Group feed
         url = "https://{0}/rest/api/uom/Group".format(self.hmc_ip)
         resp_dom = self.generic_get(url)
-        resp_dict = {}
+        membership = {}
+        xpaths = HMC_XPATHS
         if resp_dom is not None:
-            group_dom_list = resp_dom.xpath("//Group")
-            for group_dom_raw in group_dom_list:
-                uuid_list = []
-                group_dom = etree.ElementTree(group_dom_raw)
-                group_name = group_dom.xpath("//GroupName")[0].text
-                assc_lpar_links = group_dom.xpath("//AssociatedLogicalPartitions//link")
-                assc_ms_links = group_dom.xpath("//AssociatedManagedSystems//link")
-                assc_vios_links = group_dom.xpath("//AssociatedVirtualIOServers//link")
-                for assc_raw_lpar in assc_lpar_links:
-                    assc_lpar = etree.ElementTree(assc_raw_lpar)
-                    lpar_uuid = (assc_lpar.xpath('./@href')[0]).split('/')[-1]
-                    uuid_list.append(lpar_uuid)
-                for assc_raw_ms in assc_ms_links:
-                    assc_ms = etree.ElementTree(assc_raw_ms)
-                    ms_uuid = (assc_ms.xpath('./@href')[0]).split('/')[-1]
-                    uuid_list.append(ms_uuid)
-                for assc_raw_vios in assc_vios_links:
-                    assc_vios = etree.ElementTree(assc_raw_vios)
-                    vios_uuid = (assc_vios.xpath('./@href')[0]).split('/')[-1]
-                    uuid_list.append(vios_uuid)
-                resp_dict[group_name] = uuid_list
-        return resp_dict
+            for group_dom in xpaths['groups'](resp_dom):
+                group_name = xpaths['group_name'](group_dom)[0].text
+                for hrefs in ('group_lpar_hrefs', 'group_ms_hrefs', 'group_vios_hrefs'):
+                    for href in xpaths[hrefs](group_dom):
+                        group_names = membership.setdefault(href.split('/')[-1], [])
+                        if not group_names or group_names[-1] != group_name:
+                            group_names.append(group_name)
+        return membership
 
     def fetchPVsFromVIOSDOM(self, vios_dom, vios_name):
         # Generate the list of PhysicalVolumes available in the VIOS DOM
@@ -1924,6 +2509,8 @@ class HmcRestClient:
                   'Content-Type': 'application/vnd.ibm.powervm.uom+xml; type=VirtualIOServer'}
 
         vios_uuid = vios_dom.xpath('//AtomID')[0].text
+        # The update may change the vSCSI mappings of the system
+        self.scsi_indexes = {}
         timeout_in_sec = 3600
         if timeout:
             if timeout > 60:
@@ -1939,13 +2526,11 @@ class HmcRestClient:
         vios_xmlstr = etree.tostring(vios_dom)
         vios_xmlstr = vios_xmlstr.decode("utf-8").replace("VirtualIOServer", VIOS_NS, 1)
         logger.debug("INPUT PAYLOAD: \n %s", vios_xmlstr)
-        resp = open_url(url,
-                        headers=header,
-                        method='POST',
-                        data=vios_xmlstr,
-                        validate_certs=False,
-                        force_basic_auth=True,
-                        timeout=timeout_in_sec)
+        resp = self._open_url(url,
+                              headers=header,
+                              method='POST',
+                              data=vios_xmlstr,
+                              timeout=timeout_in_sec)
         if resp.code != 200:
             logger.debug("Post operation failed. Respsonse code: %d", resp.code)
             return None
@@ -39,8 +39,28 @@ options:
     system_name:
         description:
             - The name of the managed system.
-        required: true
+            - Either I(system_name) or I(system_names) is required.
         type: str
+    system_names:
+        description:
+            - The names of the managed systems to update or upgrade in a rolling way, instead of a single I(system_name).
+            - The systems are updated in waves of I(wave_size) systems run concurrently. A wave starts once the previous one
+              finished, and no wave starts after a system failed.
+            - The firmware levels of all the systems are read with one query before and one after the waves.
+              The outcome, wave and elapsed seconds of every system are returned in I(systems).
+            - Valid only with I(state).
+        type: list
+        elements: str
+    wave_size:
+        description:
+            - Number of systems of I(system_names) updated at the same time.
+            - Default value is 1.
+        type: int
+    ha_pairs:
+        description:
+            - Groups of systems of I(system_names), like the two frames of an HA pair, which are never updated in the same wave.
+        type: list
+        elements: list
     repository:
         description:
             - The repository from which to retrieve the firmware updates. Valid values are ibmwebsite for the IBM service website,
@@ -121,6 +141,21 @@ EXAMPLES = r'''
       system_name: <System name/mtms>
       state: updated
 
+- name: Update many systems to the latest level, four at a time but never both frames of an HA pair.
+  ibm.power_hmc.firmware_update:
+      hmc_host: '{{ inventory_hostname }}'
+      hmc_auth:
+         username: '{{ ansible_user }}'
+         password: '{{ hmc_password }}'
+      system_names:
+        - <System name1>
+        - <System name2>
+        - <System name3>
+      wave_size: 4
+      ha_pairs:
+        - [<System name1>, <System name2>]
+      state: updated
+
 - name: Upgrade system to specific level at an sftp repo.
   firmware_update:
     hmc_host: '{{ inventory_hostname }}'
@@ -152,6 +187,19 @@ ecnumber:
     type: str
     returned: always
     sample: '01VL940'
+systems:
+    description:
+        - With I(system_names), the C(system_name), C(wave), C(status), C(msg), C(elapsed) seconds and level C(diff) of every system,
+          also returned on failure.
+        - C(status) is one of C(changed), C(unchanged), C(failed), or C(skipped) for the systems of the waves after a failure.
+        - C(status) is C(unknown), with a C(msg), when the update completed but the firmware level of the system could not be
+          read before or after it.
+    type: list
+    elements: dict
+    returned: when I(system_names) is given
+    sample: [{"system_name": "<System name>", "wave": 1, "status": "changed", "msg": null, "elapsed": 1831.2,
+              "diff": {"before": {"service_pack": "FW940.20", "level": "55", "ecnumber": "01VL940"},
+                       "after": {"service_pack": "FW940.30", "level": "61", "ecnumber": "01VL940"}}}]
 '''
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_cli_client import HmcCliConnection
@@ -159,8 +207,11 @@ from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_resource import
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
 
+from concurrent.futures import ThreadPoolExecutor
+
 import logging
 import sys
+import time
 LOG_FILENAME = "/tmp/ansible_power_hmc.log"
 logger = logging.getLogger(__name__)
 
@@ -183,7 +234,7 @@ def create_hmc_conn(module, params):
 
 
 def extract_updlic_options(params):
-    system_name = params['system_name']
+    system_name = params['system_name'] or params.get('system_names')
     repo = params['repository']
     level = params['level']
     remote_repo = params['remote_repo']
@@ -245,6 +296,90 @@ def upgrade_system(module, params):
     return changed, ret_dict, None
 
 
+def plan_waves(system_names, wave_size, ha_pairs=None):
+    # Each system goes to the first wave with room left that holds none of its HA partners
+    partners = {}
+    for pair in ha_pairs or []:
+        for system_name in pair:
+            partners.setdefault(system_name, set()).update(other for other in pair if other != system_name)
+    waves = []
+    for system_name in system_names:
+        for wave in waves:
+            if len(wave) < wave_size and not partners.get(system_name, set()).intersection(wave):
+                wave.append(system_name)
+                break
+        else:
+            waves.append([system_name])
+    return waves
+
+
+def change_system_level(hmc, system_name, upgrade, repo, level, remote_repo):
+    result = {'system_name': system_name, 'status': 'failed', 'msg': None}
+    started = time.time()
+    try:
+        hmc.update_managed_system(system_name, upgrade, repo, level, remote_repo)
+        result['status'] = 'finished'
+    except HmcError as on_system_error:
+        result['msg'] = repr(on_system_error)
+        # same as for a single system, no update available is not a failure of the rollout
+        if upgrade and "no updates available" in result['msg'].lower():
+            result['status'] = 'unchanged'
+    result['elapsed'] = round(time.time() - started, 1)
+    return result
+
+
+def change_systems_level(module, params):
+    hmc = create_hmc_conn(module, params)
+    system_names, repo, level, remote_repo = extract_updlic_options(params)
+    upgrade = params['state'] == 'upgraded'
+    wave_size = params['wave_size'] or 1
+    if wave_size < 1:
+        raise ParameterError("wave_size must be greater than 0")
+    system_names = list(dict.fromkeys(system_names))
+    waves = plan_waves(system_names, wave_size, params['ha_pairs'])
+
+    initial_levels = hmc.get_firmware_levels(system_names)
+    results = dict((system_name, {'system_name': system_name, 'wave': wave_no, 'status': 'skipped', 'msg': None, 'elapsed': 0})
+                   for wave_no, wave in enumerate(waves, 1) for system_name in wave)
+    # A wave starts once every system of the previous one finished, and none starts after a failure
+    for wave_no, wave in enumerate(waves, 1):
+        logger.debug("wave %d/%d: %s", wave_no, len(waves), wave)
+        with ThreadPoolExecutor(max_workers=len(wave)) as executor:
+            for result in executor.map(lambda system_name: change_system_level(hmc, system_name, upgrade, repo, level, remote_repo), wave):
+                results[result['system_name']].update(result)
+        if any(results[system_name]['status'] == 'failed' for system_name in wave):
+            break
+
+    try:
+        new_levels = hmc.get_firmware_levels([system_name for system_name in system_names if results[system_name]['status'] != 'skipped'])
+    except HmcError as error:
+        # the systems are still reported, those updated as unknown
+        logger.debug("Unable to read the firmware levels after the update: %s", repr(error))
+        new_levels = {}
+    for system_name in system_names:
+        result = results[system_name]
+        if system_name in new_levels:
+            result['diff'] = {'before': initial_levels.get(system_name), 'after': new_levels[system_name]}
+        if result['status'] != 'finished':
+            continue
+        # a level which could not be read tells nothing about the update
+        unread = [when for when, levels in (('before', initial_levels), ('after', new_levels)) if levels.get(system_name) is None]
+        if unread:
+            result['status'] = 'unknown'
+            result['msg'] = "firmware level could not be read {0} the update".format(' and '.join(unread))
+        else:
+            result['status'] = 'unchanged' if initial_levels[system_name] == new_levels[system_name] else 'changed'
+
+    systems = [results[system_name] for system_name in system_names]
+    # updlic completed on the systems of unknown status, so they may have changed
+    changed = any(each['status'] in ('changed', 'unknown') for each in systems)
+    failed = [each['system_name'] for each in systems if each['status'] == 'failed']
+    if failed:
+        module.fail_json(changed=changed, msg="system {0} failed for {1}".format('upgrade' if upgrade else 'update', ', '.join(failed)),
+                         systems=systems)
+    return changed, {'msg': 'system {0} finished'.format('upgrade' if upgrade else 'update'), 'systems': systems}, None
+
+
 def accept_level(module, params):
     hmc = create_hmc_conn(module, params)
     system_name = params['system_name']
@@ -268,6 +403,8 @@ def perform_task(module):
     oper = 'action'
     if params['action'] is None:
         oper = 'state'
+    if params.get('system_names'):
+        actions['updated'] = actions['upgraded'] = change_systems_level
     try:
         validate_parameters(params)
         return actions[params[oper]](module, params)
@@ -276,6 +413,11 @@ def perform_task(module):
 
 
 def validate_parameters(params):
+    if params.get('system_names'):
+        if params['action']:
+            raise ParameterError("'system_names' is supported only with 'state'")
+    elif params.get('wave_size') or params.get('ha_pairs'):
+        raise ParameterError("'wave_size' and 'ha_pairs' are supported only with 'system_names'")
     remote_repo = params['remote_repo']
     if remote_repo:
         passwd = remote_repo['passwd']
@@ -300,7 +442,10 @@ def run_module():
                           password=dict(type='str', no_log=True),
                       )
                       ),
-        system_name=dict(type='str', required=True),
+        system_name=dict(type='str'),
+        system_names=dict(type='list', elements='str'),
+        wave_size=dict(type='int'),
+        ha_pairs=dict(type='list', elements='list'),
         action=dict(type='str', choices=['accept']),
         state=dict(type='str', choices=['updated', 'upgraded', ]),
         level=dict(type='str', default='latest'),
@@ -322,7 +467,9 @@ def run_module():
     module = AnsibleModule(
         argument_spec=module_args,
         supports_check_mode=True,
-        mutually_exclusive=[('state', 'action'), ('action', 'repository'), ('action', 'remote_repo'), ('action', 'level')]
+        mutually_exclusive=[('state', 'action'), ('action', 'repository'), ('action', 'remote_repo'), ('action', 'level'),
+                            ('system_name', 'system_names')],
+        required_one_of=[('system_name', 'system_names')]
     )
     if module._verbosity >= 5:
         init_logger()
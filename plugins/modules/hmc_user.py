@@ -659,13 +659,14 @@ def ensure_absent(module, params):
         if not user_info:
             changed = True
     else:
-        user_info = hmc.listUsr()
+        user_fields = ['name', 'authentication_type']
+        user_info = hmc.listUsr(fields=user_fields)
         if not is_user_present(user_info, r_type):
             return False, None, None
 
         hmc.removeUsr(rm_type=r_type)
 
-        user_info = hmc.listUsr()
+        user_info = hmc.listUsr(fields=user_fields)
         if is_user_present(user_info, r_type):
             return False, None, "user removal not succeeded"
         changed = True
@@ -724,20 +725,18 @@ def ensure_update(module, params):
         if attributes:
             m_config.update(attributes)
 
+        # user_info was listed just above, the user is only listed again after a change
         if enable_user:
-            user_info_check = hmc.listUsr(filt=filter_d)
-            if user_info_check[0].get('DISABLED') == '1':
-                hmc.modifyUsr(enable=enable_user, configDict={"NAME": usr_name})
+            if user_info[0].get('DISABLED') == '1':
+                user_info = hmc.modifyAndListUsr(enable=enable_user, configDict={"NAME": usr_name}, filt=filter_d)
                 changed = True
         else:
-            user_info_check = hmc.listUsr(filt=filter_d)
-            if isDifferent(m_config, user_info_check[0]):
-                hmc.modifyUsr(configDict=m_config)
+            if isDifferent(m_config, user_info[0]):
                 if attributes and attributes['new_name'] is not None:
                     filter_d['NAMES'] = attributes['new_name']
+                user_info = hmc.modifyAndListUsr(configDict=m_config, filt=filter_d)
                 changed = True
 
-        user_info = hmc.listUsr(filt=filter_d)
         return changed, user_info[0], None
     elif m_type:
         user_info_check = None
@@ -750,10 +749,10 @@ def ensure_update(module, params):
             else:
                 raise
 
+        user_info = user_info_check
         if isDifferent(attributes, user_info_check[0]):
-            hmc.modifyUsr(modify_type=m_type, configDict=attributes)
+            user_info = hmc.modifyAndListUsr(modify_type=m_type, configDict=attributes, user_type=m_type)
             changed = True
-        user_info = hmc.listUsr(user_type=m_type)
         return changed, user_info, None
     return changed, None, None
 
@@ -178,6 +178,7 @@ from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_resource import
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import parse_error_response
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcRestClient
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcEventListener
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
 
 
@@ -254,16 +255,18 @@ def powerOnManagedSys(module, params):
     hmc = Hmc(hmc_conn)
 
     try:
-        res = hmc.getManagedSystemDetails(system_name)
+        res = hmc.getManagedSystemDetails(system_name, fields=['state'])
         system_state = res.get('state')
         if system_state != 'Power Off':
             changed = False
         else:
-            hmc.managedSystemPowerON(system_name)
-            if hmc.checkManagedSysState(system_name, ['Operating', 'Standby']):
-                changed = True
-            else:
-                changed = False
+            events = HmcEventListener.connect(hmc_host, hmc_user, password)
+            try:
+                hmc.managedSystemPowerON(system_name)
+                changed = hmc.checkManagedSysState(system_name, ['Operating', 'Standby'], events=events)
+            finally:
+                if events:
+                    events.close()
 
     except HmcError as on_system_error:
         return False, repr(on_system_error), None
@@ -282,16 +285,18 @@ def powerOffManagedSys(module, params):
     hmc = Hmc(hmc_conn)
 
     try:
-        res = hmc.getManagedSystemDetails(system_name)
+        res = hmc.getManagedSystemDetails(system_name, fields=['state'])
         system_state = res.get('state')
         if system_state == 'Power Off':
             changed = False
         else:
-            hmc.managedSystemShutdown(system_name)
-            if hmc.checkManagedSysState(system_name, ['Power Off']):
-                changed = True
-            else:
-                changed = False
+            events = HmcEventListener.connect(hmc_host, hmc_user, password)
+            try:
+                hmc.managedSystemShutdown(system_name)
+                changed = hmc.checkManagedSysState(system_name, ['Power Off'], events=events)
+            finally:
+                if events:
+                    events.close()
     except HmcError as on_system_error:
         return False, repr(on_system_error), None
 
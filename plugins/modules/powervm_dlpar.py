@@ -57,11 +57,12 @@ options:
     vm_name:
         description:
             - The name of the powervm partition.
-        required: true
+            - Either I(vm_name) or I(partitions) is required.
         type: str
     proc_settings:
         description:
             - Processor related settings.
+            - With I(partitions), the settings applied to every partition that does not set them itself.
         type: dict
         suboptions:
             proc:
@@ -94,12 +95,72 @@ options:
     mem_settings:
         description:
             - Memory related settings.
+            - With I(partitions), the settings applied to every partition that does not set them itself.
         type: dict
         suboptions:
             mem:
                 description:
                     - The value of dedicated memory value in megabytes to create a partition.
                 type: int
+    partitions:
+        description:
+            - List of partitions to update together, instead of a single I(vm_name).
+            - This option is valid only for I(update_proc_mem) action.
+            - The configuration of all the partitions of a managed system is fetched in one call, and the partitions of
+              every managed system are updated concurrently. The outcome of every partition is returned in I(partition_info).
+        type: list
+        elements: dict
+        suboptions:
+            vm_name:
+                description:
+                    - The name of the powervm partition.
+                type: str
+                required: True
+            system_name:
+                description:
+                    - The name of the managed system of the partition.
+                    - Optional, if not provided I(system_name) is used.
+                type: str
+            proc_settings:
+                description:
+                    - Processor related settings of the partition, same as I(proc_settings).
+                type: dict
+                suboptions:
+                    proc:
+                        description:
+                            - The number of dedicated processors, or virtual processors for shared processor setting.
+                        type: int
+                    proc_unit:
+                        description:
+                            - The number of shared processing units.
+                        type: float
+                    sharing_mode:
+                        description:
+                            - The sharing mode of the partition.
+                        type: str
+                        choices: ['keep_idle_procs', 'share_idle_procs', 'share_idle_procs_active', 'share_idle_procs_always', 'capped', 'uncapped']
+                    uncapped_weight:
+                        description:
+                            - The uncapped weight of the partition.
+                        type: int
+                    pool_id:
+                        description:
+                            - Shared Processor Pool ID to be set.
+                        type: int
+            mem_settings:
+                description:
+                    - Memory related settings of the partition, same as I(mem_settings).
+                type: dict
+                suboptions:
+                    mem:
+                        description:
+                            - The value of dedicated memory value in megabytes.
+                        type: int
+    max_concurrent:
+        description:
+            - Number of partitions of I(partitions) updated at a time on each managed system.
+            - Default value is 4.
+        type: int
     timeout:
         description:
             - The maximum time, in minutes, to wait for partition operating system to complete dlpar.
@@ -232,6 +293,25 @@ EXAMPLES = '''
       mem: 3072
     action: update_proc_mem
 
+- name: Dynamically set the memory of many partitions, two at a time.
+  powervm_dlpar:
+    hmc_host: "{{ inventory_hostname }}"
+    hmc_auth:
+         username: '{{ ansible_user }}'
+         password: '{{ hmc_password }}'
+    system_name: <server name>
+    mem_settings:
+      mem: 4096
+    partitions:
+      - vm_name: <vm name1>
+      - vm_name: <vm name2>
+        proc_settings:
+          proc: 2
+      - vm_name: <vm name3>
+        system_name: <other server name>
+    max_concurrent: 2
+    action: update_proc_mem
+
 - name: Dynamically configure Physical Volume settings on Lpar.
   powervm_dlpar:
     hmc_host: '{{ inventory_hostname }}'
@@ -294,8 +374,11 @@ EXAMPLES = '''
 
 RETURN = '''
 partition_info:
-    description: Return the attributes of the partition.
-    type: dict
+    description:
+        - Return the attributes of the partition.
+        - For I(partitions), the list of C(vm_name), C(system_name), C(status), C(msg), C(elapsed) seconds and
+          C(partition_info) of every partition, also returned on failure. C(status) is one of C(changed), C(unchanged) or C(failed).
+    type: raw
     returned: always
 '''
 
@@ -304,12 +387,17 @@ LOG_FILENAME = "/tmp/ansible_power_hmc.log"
 logger = logging.getLogger(__name__)
 import sys
 import json
+import time
 from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import Error
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ProcMemValidationError
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import parse_error_response
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcRestClient
 from itertools import groupby
 from operator import itemgetter
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 
 def init_logger():
@@ -336,6 +424,11 @@ def validate_parameters(params):
         mandatoryList = ['hmc_host', 'hmc_auth', 'system_name', 'vm_name', 'vod_settings']
         unsupportedList = ['proc_settings', 'mem_settings', 'pv_settings', 'npiv_settings']
 
+    if opr != 'update_proc_mem':
+        unsupportedList = unsupportedList + ['partitions', 'max_concurrent']
+    elif params.get('partitions'):
+        mandatoryList = [each if each != 'vm_name' else 'partitions' for each in mandatoryList]
+
     collate = []
     for eachMandatory in mandatoryList:
         if not params[eachMandatory]:
@@ -348,7 +441,7 @@ def validate_parameters(params):
 
     collate = []
     for eachUnsupported in unsupportedList:
-        if params[eachUnsupported]:
+        if params.get(eachUnsupported):
             collate.append(eachUnsupported)
 
     if collate:
@@ -395,20 +488,22 @@ def fetch_facts(rest_conn, partition_dom):
     return facts
 
 
-def update_proc_mem(module, params):
-    hmc_host = params['hmc_host']
-    hmc_user = params['hmc_auth']['username']
-    password = params['hmc_auth']['password']
-    system_name = params['system_name']
-    vm_name = params['vm_name']
-    timeout = params["timeout"]
-    proc = params['proc_settings']['proc'] if params.get('proc_settings') else None
-    proc_unit = params['proc_settings']['proc_unit'] if params.get('proc_settings') else None
-    sharing_mode = params['proc_settings']['sharing_mode'] if params.get('proc_settings') else None
-    uncapped_weight = params['proc_settings']['uncapped_weight'] if params.get('proc_settings') else None
-    pool_id = params['proc_settings']['pool_id'] if params.get('proc_settings') else None
-    mem = params['mem_settings']['mem'] if params.get('mem_settings') else None
-    validate_parameters(params)
+def proc_mem_settings(proc_settings, mem_settings, defaults=None):
+    settings = dict(defaults or ((key, None) for key in ('proc', 'proc_unit', 'sharing_mode', 'uncapped_weight', 'pool_id', 'mem')))
+    for each_settings in (proc_settings, mem_settings):
+        settings.update((key, value) for key, value in (each_settings or {}).items() if value is not None)
+    return settings
+
+
+def apply_proc_mem(rest_conn, system_uuid, partition_uuid, partition_dom, settings, timeout):
+    '''Update the partition to the proc_mem_settings, returns whether it changed and its facts'''
+    proc = settings['proc']
+    proc_unit = settings['proc_unit']
+    sharing_mode = settings['sharing_mode']
+    uncapped_weight = settings['uncapped_weight']
+    pool_id = settings['pool_id']
+    mem = settings['mem']
+    vm_name = partition_dom.xpath("//PartitionName")[0].text
     changed = False
     difference = False
     isDedicated = None
@@ -425,36 +520,6 @@ def update_proc_mem(module, params):
     newUncappedWeight = None
     newPoolID = None
 
-    try:
-        rest_conn = HmcRestClient(hmc_host, hmc_user, password)
-    except Exception as error:
-        error_msg = parse_error_response(error)
-        module.fail_json(msg=error_msg)
-
-    try:
-        system_uuid, server_dom = rest_conn.getManagedSystem(system_name)
-    except Exception as error:
-        try:
-            rest_conn.logoff()
-        except Exception:
-            logger.debug("Logoff error")
-        error_msg = parse_error_response(error)
-        module.fail_json(msg=error_msg)
-    if not system_uuid:
-        module.fail_json(msg="Given system is not present")
-
-    try:
-        partition_uuid, partition_dom = rest_conn.getLogicalPartition(system_uuid, partition_name=vm_name)
-    except Exception as error:
-        try:
-            rest_conn.logoff()
-        except Exception:
-            logger.debug("Logoff error")
-        error_msg = parse_error_response(error)
-        module.fail_json(msg=error_msg)
-    if partition_uuid is None:
-        module.fail_json(msg="Given powervm instance is not present")
-
     isDedicated = rest_conn.isDedicatedProcConfig(partition_dom)
     if isDedicated and proc_unit is not None:
         raise ParameterError("Given parition is in dedicated configuration.\
@@ -474,7 +539,7 @@ Setting proc units is not supported")
 
     if pool_id is not None and pool_id >= 0:
         if isDedicated:
-            module.fail_json(msg="Shared processor pool only works with shared processor configuration partition")
+            raise ProcMemValidationError("Shared processor pool only works with shared processor configuration partition")
         else:
             prevPoolID = rest_conn.getProcPool(partition_dom)
             logger.debug("prevPoolID: %s", prevPoolID)
@@ -494,10 +559,10 @@ Setting proc units is not supported")
         logger.debug("prevSharingMode: %s", prevSharingMode)
         if isDedicated:
             if sharing_mode in ['capped', 'uncapped']:
-                module.fail_json(msg="Given sharing mode is not supported with dedicated processor configuration")
+                raise ProcMemValidationError("Given sharing mode is not supported with dedicated processor configuration")
         else:
             if sharing_mode not in ['capped', 'uncapped']:
-                module.fail_json(msg="Given sharing mode is not supported with shared processor configuration")
+                raise ProcMemValidationError("Given sharing mode is not supported with shared processor configuration")
         if prevSharingMode != sharing_mode:
             logger.debug("sharing_mode: %s", sharing_mode)
             partition_dom = rest_conn.updateProcSharingMode(partition_dom, sharing_mode)
@@ -506,11 +571,11 @@ Setting proc units is not supported")
     if uncapped_weight:
         prevUncappedWeight = rest_conn.getProcUncappedWeight(partition_dom)
         if isDedicated:
-            module.fail_json(msg="Uncapped weight is not supported with dedicated processor configuration")
+            raise ProcMemValidationError("Uncapped weight is not supported with dedicated processor configuration")
         else:
             if rest_conn.getProcSharingMode(partition_dom) == 'capped' and \
                     (sharing_mode is None or sharing_mode == 'capped'):
-                module.fail_json(msg="Uncapped weight is not supported in case sharing mode is not uncapped")
+                raise ProcMemValidationError("Uncapped weight is not supported in case sharing mode is not uncapped")
         if prevUncappedWeight != uncapped_weight:
             partition_dom = rest_conn.updateProcUncappedWeight(partition_dom, str(uncapped_weight))
             difference = True
@@ -520,7 +585,7 @@ Setting proc units is not supported")
             rest_conn.updateLogicalPartition(partition_dom, timeout)
         except Exception as error:
             error_msg = parse_error_response(error)
-            module.fail_json(msg="HmcError: " + error_msg)
+            raise ProcMemValidationError("HmcError: " + error_msg)
 
         partition_uuid, partition_dom = rest_conn.getLogicalPartition(system_uuid,
                                                                       partition_name=vm_name,
@@ -556,12 +621,149 @@ Setting proc units is not supported")
          or newPoolID != prevPoolID):
         changed = True
 
-    vm_facts = fetch_facts(rest_conn, partition_dom)
+    return changed, fetch_facts(rest_conn, partition_dom)
+
+
+def update_proc_mem(module, params):
+    hmc_host = params['hmc_host']
+    hmc_user = params['hmc_auth']['username']
+    password = params['hmc_auth']['password']
+    system_name = params['system_name']
+    vm_name = params['vm_name']
+    timeout = params["timeout"]
+    settings = proc_mem_settings(params.get('proc_settings'), params.get('mem_settings'))
+    validate_parameters(params)
+
+    try:
+        rest_conn = HmcRestClient(hmc_host, hmc_user, password)
+    except Exception as error:
+        error_msg = parse_error_response(error)
+        module.fail_json(msg=error_msg)
+
+    try:
+        system_uuid, server_dom = rest_conn.getManagedSystem(system_name)
+    except Exception as error:
+        try:
+            rest_conn.logoff()
+        except Exception:
+            logger.debug("Logoff error")
+        error_msg = parse_error_response(error)
+        module.fail_json(msg=error_msg)
+    if not system_uuid:
+        module.fail_json(msg="Given system is not present")
+
+    try:
+        partition_uuid, partition_dom = rest_conn.getLogicalPartition(system_uuid, partition_name=vm_name)
+    except Exception as error:
+        try:
+            rest_conn.logoff()
+        except Exception:
+            logger.debug("Logoff error")
+        error_msg = parse_error_response(error)
+        module.fail_json(msg=error_msg)
+    if partition_uuid is None:
+        module.fail_json(msg="Given powervm instance is not present")
+
+    try:
+        changed, vm_facts = apply_proc_mem(rest_conn, system_uuid, partition_uuid, partition_dom, settings, timeout)
+    except ProcMemValidationError as error:
+        module.fail_json(msg=error.message)
 
     return changed, vm_facts, None
 
 
+def update_partition(rest_conn, system_uuid, partition, settings, timeout):
+    result = {'vm_name': partition['vm_name'], 'system_name': partition['system_name'], 'status': 'failed', 'msg': None}
+    started = time.time()
+    try:
+        partition_uuid, partition_dom = partition['dom']
+        changed, result['partition_info'] = apply_proc_mem(rest_conn, system_uuid, partition_uuid, partition_dom, settings, timeout)
+        result['status'] = 'changed' if changed else 'unchanged'
+    except Exception as error:
+        logger.debug("DLPAR of %s failed: %s", partition['vm_name'], repr(error))
+        result['msg'] = error.message if isinstance(error, Error) else parse_error_response(error)
+    result['elapsed'] = round(time.time() - started, 1)
+    return result
+
+
+def update_proc_mem_batch(module, params):
+    hmc_host = params['hmc_host']
+    hmc_user = params['hmc_auth']['username']
+    password = params['hmc_auth']['password']
+    timeout = params['timeout']
+    max_concurrent = params.get('max_concurrent') or 4
+    validate_parameters(params)
+    if max_concurrent < 1:
+        raise ParameterError("max_concurrent must be greater than 0")
+
+    partitions_by_system = OrderedDict()
+    for each in params['partitions']:
+        partition = dict(each, system_name=each.get('system_name') or params['system_name'])
+        system_partitions = partitions_by_system.setdefault(partition['system_name'], [])
+        if any(listed['vm_name'] == partition['vm_name'] for listed in system_partitions):
+            raise ParameterError("partition {0} of {1} is listed more than once".format(partition['vm_name'], partition['system_name']))
+        system_partitions.append(partition)
+
+    try:
+        rest_conn = HmcRestClient(hmc_host, hmc_user, password)
+    except Exception as error:
+        error_msg = parse_error_response(error)
+        module.fail_json(msg=error_msg)
+
+    defaults = proc_mem_settings(params['proc_settings'], params['mem_settings'])
+    results = []
+    executors = []
+    try:
+        # Every system is looked up before any partition is updated, so that a system
+        # which cannot be read only fails its own partitions
+        systems = OrderedDict()
+        for system_name in partitions_by_system:
+            try:
+                system_uuid, server_dom = rest_conn.getManagedSystem(system_name)
+                partition_doms = rest_conn.getLogicalPartitionDoms(system_uuid) if system_uuid else {}
+                systems[system_name] = (system_uuid, partition_doms, None if system_uuid else "Given system is not present")
+            except Exception as error:
+                logger.debug("Lookup of %s failed: %s", system_name, repr(error))
+                msg = error.message if isinstance(error, Error) else parse_error_response(error)
+                systems[system_name] = (None, {}, msg)
+
+        # The partitions of each system are updated max_concurrent at a time,
+        # all the systems at once
+        futures = []
+        for system_name, partitions in partitions_by_system.items():
+            system_uuid, partition_doms, system_error = systems[system_name]
+            executor = ThreadPoolExecutor(max_workers=max_concurrent)
+            executors.append(executor)
+            for partition in partitions:
+                partition['dom'] = partition_doms.get(partition['vm_name'])
+                if not partition['dom']:
+                    msg = system_error or "Given powervm instance is not present"
+                    futures.append(dict(vm_name=partition['vm_name'], system_name=system_name, status='failed', msg=msg, elapsed=0))
+                    continue
+                settings = proc_mem_settings(partition.get('proc_settings'), partition.get('mem_settings'), defaults)
+                futures.append(executor.submit(update_partition, rest_conn, system_uuid, partition, settings, timeout))
+        results = [each if isinstance(each, dict) else each.result() for each in futures]
+    except Exception as error:
+        error_msg = parse_error_response(error)
+        logger.debug("Line number: %d exception: %s", sys.exc_info()[2].tb_lineno, repr(error))
+        module.fail_json(msg=error_msg)
+    finally:
+        for executor in executors:
+            executor.shutdown()
+        try:
+            rest_conn.logoff()
+        except Exception:
+            logger.debug("Logoff error")
+
+    failed = [each['vm_name'] for each in results if each['status'] == 'failed']
+    if failed:
+        module.fail_json(msg="update_proc_mem failed for partitions: {0}".format(', '.join(failed)), partition_info=results)
+    return any(each['status'] == 'changed' for each in results), results, None
+
+
 def update_lpar(module, params):
+    if params.get('partitions'):
+        return update_proc_mem_batch(module, params)
     if (params['proc_settings'] is not None and any(params['proc_settings'].values())) or \
        (params['mem_settings'] is not None and any(params['mem_settings'].values())):
         return update_proc_mem(module, params)
@@ -885,6 +1087,18 @@ def perform_task(module):
 
 
 def run_module():
+    proc_args = dict(proc=dict(type='int'),
+                     proc_unit=dict(type='float'),
+                     sharing_mode=dict(type='str', choices=['keep_idle_procs',
+                                                            'share_idle_procs',
+                                                            'share_idle_procs_active',
+                                                            'share_idle_procs_always',
+                                                            'capped', 'uncapped']),
+                     uncapped_weight=dict(type='int'),
+                     pool_id=dict(type='int')
+                     )
+    mem_args = dict(mem=dict(type='int'))
+
     # define available arguments/parameters a user can pass to the module
     module_args = dict(
         hmc_host=dict(type='str', required=True),
@@ -897,26 +1111,23 @@ def run_module():
                       )
                       ),
         system_name=dict(type='str', required=True),
-        vm_name=dict(type='str', required=True),
+        vm_name=dict(type='str'),
         timeout=dict(type='int'),
         proc_settings=dict(type='dict',
-                           options=dict(
-                               proc=dict(type='int'),
-                               proc_unit=dict(type='float'),
-                               sharing_mode=dict(type='str', choices=['keep_idle_procs',
-                                                                      'share_idle_procs',
-                                                                      'share_idle_procs_active',
-                                                                      'share_idle_procs_always',
-                                                                      'capped', 'uncapped']),
-                               uncapped_weight=dict(type='int'),
-                               pool_id=dict(type='int')
-                           )
+                           options=proc_args
                            ),
         mem_settings=dict(type='dict',
-                          options=dict(
-                              mem=dict(type='int'),
-                          )
+                          options=mem_args
                           ),
+        partitions=dict(type='list',
+                        elements='dict',
+                        options=dict(
+                            vm_name=dict(type='str', required=True),
+                            system_name=dict(type='str'),
+                            proc_settings=dict(type='dict', options=proc_args),
+                            mem_settings=dict(type='dict', options=mem_args)
+                        )),
+        max_concurrent=dict(type='int'),
         pv_settings=dict(type='list',
                          elements='dict',
                          options=dict(
@@ -949,6 +1160,8 @@ def run_module():
 
     module = AnsibleModule(
         argument_spec=module_args,
+        mutually_exclusive=[('vm_name', 'partitions')],
+        required_one_of=[('vm_name', 'partitions')],
     )
 
     if module._verbosity >= 1:
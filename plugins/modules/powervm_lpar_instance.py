@@ -68,8 +68,21 @@ options:
     vm_name:
         description:
             - The name of the powervm partition.
-        required: true
+            - Either I(vm_name) or I(vm_names) is required.
         type: str
+    vm_names:
+        description:
+            - The names of the powervm partitions to act on together.
+            - Supported for I(action=poweron), I(action=shutdown) and I(action=restart) only.
+            - The partitions are looked up with one listing per managed system and their power jobs run
+              concurrently. The status and elapsed seconds of every partition are returned in I(partition_info).
+        type: list
+        elements: str
+    max_concurrent:
+        description:
+            - Number of power jobs of I(vm_names) run on the HMC at a time.
+            - Default value is 4.
+        type: int
     vm_id:
         description:
             - The partition ID to be set while creating a Logical Partition.
@@ -394,6 +407,28 @@ options:
             - Default value is C(Immediate).
         type: str
         choices: ['Immediate', 'OperatingSystem', 'OSImmediate', 'Dump', 'DumpRetry']
+    job_poll:
+        description:
+            - Polling schedule used while waiting for HMC REST jobs (partition template deploy, power on, power off, free volume discovery) to complete.
+            - The first status check happens after I(initial_interval) seconds and the wait grows by
+              I(backoff_factor) on every poll up to I(max_interval) seconds.
+        type: dict
+        suboptions:
+            initial_interval:
+                description:
+                    - Seconds to wait before the first job status check.
+                    - Default value is 2.
+                type: int
+            max_interval:
+                description:
+                    - Upper bound in seconds for the wait between two job status checks.
+                    - Default value is 30.
+                type: int
+            backoff_factor:
+                description:
+                    - Multiplier applied to the wait after every job status check.
+                    - Default value is 2.
+                type: float
     state:
         description:
             - C(present) creates a partition of the specified I(os_type), I(vm_name), I(proc) and I(memory) on specified I(system_name).
@@ -517,6 +552,19 @@ EXAMPLES = '''
       iIPLsource: 'd'
       action: poweron
 
+- name: Shutdown many logical partitions, eight at a time.
+  powervm_lpar_instance:
+      hmc_host: '{{ inventory_hostname }}'
+      hmc_auth:
+         username: '{{ ansible_user }}'
+         password: '{{ hmc_password }}'
+      vm_names:
+         - <vm_name1>
+         - <vm_name2>
+      max_concurrent: 8
+      shutdown_option: 'Immediate'
+      action: shutdown
+
 - name: Create a partition with all resources.
   powervm_lpar_instance:
       hmc_host: '{{ inventory_hostname }}'
@@ -546,8 +594,11 @@ EXAMPLES = '''
 
 RETURN = '''
 partition_info:
-    description: The configuration of the partition after creation
-    type: dict
+    description:
+        - The configuration of the partition after creation.
+        - For I(vm_names), the list of C(vm_name), C(system_name), C(status), C(msg) and C(elapsed) seconds of every partition,
+          also returned on failure. C(status) is one of C(changed), C(unchanged) or C(failed).
+    type: raw
     sample: {"AllocatedVirtualProcessors": null, "AssociatedManagedSystem": "<system-name>", "CurrentMemory": 1024, \
             "CurrentProcessingUnits": null, "CurrentProcessors": 1, "Description": null, "HasDedicatedProcessors": "true", \
             "HasPhysicalIO": "true", "IsVirtualServiceAttentionLEDOn": "false", "LastActivatedProfile": "default_profile", \
@@ -555,7 +606,7 @@ partition_info:
             "PartitionID": 11, "PartitionName": "<partition-name>", "PartitionState": "not activated", \
             "PartitionType": "AIX/Linux", "PowerManagementMode": null, "ProgressState": null, "RMCState": "inactive", \
             "ReferenceCode": "", "RemoteRestartState": "Invalid", "ResourceMonitoringIPAddress": null, "SharingMode": "sre idle proces"}
-    returned: on success for state C(present)
+    returned: on success for state C(present) and for I(vm_names)
 '''
 
 import sys
@@ -570,9 +621,15 @@ from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions impor
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ProcMemValidationError
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import parse_error_response
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcRestClient
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import JobPoller
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcEventListener
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import add_taggedIO_details
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import add_physical_io
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HMC_XPATHS
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcJobManager
 from random import randint
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from collections import OrderedDict
 from decimal import Decimal
 try:
@@ -721,6 +778,12 @@ def validate_parameters(params):
                            'min_proc_unit', 'max_proc_unit', 'proc_mode', 'weight', 'proc_compatibility_mode', 'shared_proc_pool', 'min_mem', 'max_mem',
                            'vm_id', 'install_settings', 'vnic_config', 'shutdown_option']
 
+    if opr in ('poweron', 'shutdown', 'restart'):
+        if params.get('vm_names'):
+            mandatoryList = [each if each != 'vm_name' else 'vm_names' for each in mandatoryList]
+    else:
+        unsupportedList = unsupportedList + ['vm_names', 'max_concurrent']
+
     collate = []
     for eachMandatory in mandatoryList:
         if not params[eachMandatory]:
@@ -733,7 +796,7 @@ def validate_parameters(params):
 
     collate = []
     for eachUnsupported in unsupportedList:
-        if params[eachUnsupported]:
+        if params.get(eachUnsupported):
             collate.append(eachUnsupported)
 
     if collate:
@@ -742,6 +805,9 @@ def validate_parameters(params):
         else:
             raise ParameterError("unsupported parameters: %s" % (', '.join(collate)))
 
+    # checked before connecting, so that it is not reported as a logon failure
+    JobPoller.from_params(params.get('job_poll'))
+
     if params['volume_config']:
         for each_volume_config in params['volume_config']:
             validate_sub_dict('volume_config', each_volume_config)
@@ -752,13 +818,22 @@ def fetchAllInUsePhyVolumes(rest_conn, vios_uuid):
     vios_response = rest_conn.getVirtualIOServer(vios_uuid, group="ViosStorage")
     phy_vol_list = vios_response.xpath("//MoverServicePartition/following-sibling::PhysicalVolumes/PhysicalVolume")
     for each_phy_vol in phy_vol_list:
-        if each_phy_vol.xpath("AvailableForUsage")[0].text == "false":
-            pvid_in_use.append(each_phy_vol.xpath("UniqueDeviceID")[0].text)
+        if HMC_XPATHS['pv_available_for_usage'](each_phy_vol)[0].text == "false":
+            pvid_in_use.append(HMC_XPATHS['pv_unique_device_id'](each_phy_vol)[0].text)
 
     logger.debug("Disks in use for vios: %s are %s", vios_uuid, pvid_in_use)
     return pvid_in_use
 
 
+def freePhyVolumeValues(pv):
+    # Values of a free PV used to pick a volume, read once per PV
+    reserve_policy = HMC_XPATHS['pv_reserve_policy'](pv)
+    return {'UniqueDeviceID': HMC_XPATHS['pv_unique_device_id'](pv)[0].text,
+            'VolumeName': HMC_XPATHS['pv_volume_name'](pv)[0].text,
+            'VolumeCapacity': int(HMC_XPATHS['pv_volume_capacity'](pv)[0].text),
+            'ReservePolicy': reserve_policy[0].text if reserve_policy else None}
+
+
 def identifyFreeVolume(rest_conn, system_uuid, volume_name=None, volume_size=0, vios_name=None, pvid_list=None):
     user_choice_vios = None
     user_choice_pvid = None
@@ -782,35 +857,47 @@ def identifyFreeVolume(rest_conn, system_uuid, volume_name=None, volume_size=0,
         if not user_choice_vios:
             raise Error("Mentioned vios may not have active RMC state")
 
+    # The in use PVs of every VIOS are fetched while the GetFreePhysicalVolumes
+    # jobs of all the VIOSes run together on the HMC
+    job_manager = HmcJobManager(rest_conn)
+    for vios_uuid, viosname in vios_uuid_list:
+        job_manager.add(vios_uuid, partial(rest_conn.getFreePhyVolume, vios_uuid, wait=False))
+    with ThreadPoolExecutor(max_workers=len(vios_uuid_list)) as executor:
+        in_use_futures = [executor.submit(fetchAllInUsePhyVolumes, rest_conn, vios_uuid) for vios_uuid, viosname in vios_uuid_list]
+        free_pvs = job_manager.run()
+        pvs_in_use = set()
+        for in_use_future in in_use_futures:
+            pvs_in_use.update(in_use_future.result())
+
     pv_complex = []
     keys_list = []
     unique_keys = []
-    pvs_in_use = []
+    pv_values = {}
     for vios_uuid, viosname in vios_uuid_list:
         logger.debug(vios_uuid)
         each_vios_pv_complex = {}
-        pv_xml_list = rest_conn.getFreePhyVolume(vios_uuid)
-        pvs_in_use += fetchAllInUsePhyVolumes(rest_conn, vios_uuid)
+        pv_xml_list = free_pvs[vios_uuid]
         logger.debug(len(pv_xml_list))
         for each in pv_xml_list:
+            pv_values[each] = values = freePhyVolumeValues(each)
+            dvid = values['UniqueDeviceID']
 
             # This condition is to avoid picking already picked UDID in case of mutiple volume config
-            if (pvid_list and each.xpath("UniqueDeviceID")[0].text in pvid_list):
+            if (pvid_list and dvid in pvid_list):
                 continue
 
-            if volume_size > 0 and int(each.xpath("VolumeCapacity")[0].text) >= volume_size:
+            if volume_size > 0 and values['VolumeCapacity'] >= volume_size:
                 logger.debug("Vios Name: %s", viosname)
-                logger.debug("Volume Name: %s", each.xpath("VolumeName")[0].text)
-                each_vios_pv_complex.update({each.xpath("UniqueDeviceID")[0].text: each})
+                logger.debug("Volume Name: %s", values['VolumeName'])
+                each_vios_pv_complex.update({dvid: each})
             elif user_choice_vios:
-                dvid = each.xpath("UniqueDeviceID")[0].text
                 each_vios_pv_complex.update({dvid: each})
-                if viosname == user_choice_vios and each.xpath("VolumeName")[0].text == volume_name:
+                if viosname == user_choice_vios and values['VolumeName'] == volume_name:
                     user_choice_pvid = dvid
 
         if each_vios_pv_complex:
             sorted_each_vios_pv_complex = dict(sorted(each_vios_pv_complex.items(),
-                                               key=lambda x: int(x[1].xpath("VolumeCapacity")[0].text)))
+                                               key=lambda x: pv_values[x[1]]['VolumeCapacity']))
             keys_list += sorted_each_vios_pv_complex.keys()
             pv_complex.append((sorted_each_vios_pv_complex, vios_uuid, viosname))
 
@@ -838,12 +925,12 @@ def identifyFreeVolume(rest_conn, system_uuid, volume_name=None, volume_size=0,
 
         for each_pv_complex in pv_complex:
             if each_DVID in each_pv_complex[0]:
-                logger.debug("Adding to found list: %s", each_pv_complex[0][each_DVID].xpath("VolumeName")[0].text)
-                found_list += [(each_pv_complex[0][each_DVID].xpath("VolumeName")[0].text,
-                                each_pv_complex[2], each_pv_complex[0][each_DVID])]
+                volume_nm = pv_values[each_pv_complex[0][each_DVID]]['VolumeName']
+                logger.debug("Adding to found list: %s", volume_nm)
+                found_list += [(volume_nm, each_pv_complex[2], each_pv_complex[0][each_DVID])]
         if len(found_list) >= 2:
             logger.debug("Identified a volume visible by two vioses")
-            singlepath_l = [each for each in found_list if each[2].xpath("ReservePolicy")[0].text == 'SinglePath']
+            singlepath_l = [each for each in found_list if pv_values[each[2]]['ReservePolicy'] == 'SinglePath']
 
             if user_choice_vios:
                 other_pv = []
@@ -891,8 +978,8 @@ def identifyFreeVolume(rest_conn, system_uuid, volume_name=None, volume_size=0,
                 if eachPVID in pvs_in_use:
                     continue
                 pv_obj = each_pv_complex[0][eachPVID]
-                volume_nm = pv_obj.xpath("VolumeName")[0].text
-                volume_size = int(pv_obj.xpath("VolumeCapacity")[0].text)
+                volume_nm = pv_values[pv_obj]['VolumeName']
+                volume_size = pv_values[pv_obj]['VolumeCapacity']
                 first_of_every_vios.append(tuple([volume_nm, each_pv_complex[2], pv_obj, volume_size]))
                 break
 
@@ -975,15 +1062,7 @@ def fetch_virt_networks(rest_conn, system_uuid, virt_nw_config_list, max_slot_no
 
 
 def get_MS_names_by_lpar_name(hmc_obj, lpar_name):
-    mss = hmc_obj.list_all_managed_system_details("name,state")
-    ms_list = []
-    for ms in mss:
-        ms_name, state = ms.split(',')
-        if state == 'Operating':
-            lpar_names = hmc_obj.list_all_lpars_details(ms_name, "name")
-            if lpar_name in lpar_names:
-                ms_list.append(ms_name)
-    return ms_list
+    return hmc_obj.get_managed_systems_of_lpar(lpar_name)
 
 
 def identify_ManagedSystem_of_lpar(hmc, vm_name):
@@ -1040,7 +1119,7 @@ def create_partition(module, params):
     hmc = Hmc(cli_conn)
 
     try:
-        rest_conn = HmcRestClient(hmc_host, hmc_user, password)
+        rest_conn = HmcRestClient(hmc_host, hmc_user, password, job_poll=params.get('job_poll'))
     except Exception as error:
         error_msg = parse_error_response(error)
         module.fail_json(msg=error_msg)
@@ -1319,7 +1398,9 @@ def poweroff_partition(module, params):
     operation = params['action']
 
     try:
-        rest_conn = HmcRestClient(hmc_host, hmc_user, password)
+        rest_conn = HmcRestClient(hmc_host, hmc_user, password, job_poll=params.get('job_poll'))
+    except ParameterError:
+        raise
     except Exception as error:
         logger.debug(repr(error))
         module.fail_json(msg="Logon to HMC failed")
@@ -1396,7 +1477,9 @@ def poweron_partition(module, params):
     iIPLsource = params['iIPLsource']
 
     try:
-        rest_conn = HmcRestClient(hmc_host, hmc_user, password)
+        rest_conn = HmcRestClient(hmc_host, hmc_user, password, job_poll=params.get('job_poll'))
+    except ParameterError:
+        raise
     except Exception as error:
         logger.debug(repr(error))
         module.fail_json(msg="Logon to HMC failed")
@@ -1480,6 +1563,137 @@ def poweron_partition(module, params):
     return changed, None, None
 
 
+def find_profile_uuid(rest_conn, lpar_uuid, prof_name):
+    profs = rest_conn.getPartitionProfiles(lpar_uuid) or []
+    for prof in profs:
+        prof1 = etree.ElementTree(prof)
+        if prof1.xpath('//ProfileName/text()')[0] == prof_name:
+            return prof1.xpath('//AtomID/text()')[0]
+    raise Error("Provided Logical Partition Profile is not present on the logical Partition")
+
+
+def resolve_partitions(rest_conn, system_name, vm_names):
+    '''Find vm_names with one quick partition listing per managed system.
+    Returns the list of (system_name, partition quick dict) matches by partition name.'''
+    if system_name:
+        system_uuid, server_dom = rest_conn.getManagedSystem(system_name)
+        if not system_uuid:
+            raise Error("Given system is not present")
+        ms_state = server_dom.xpath("//DetailedState")[0].text
+        if ms_state != 'None':
+            raise Error("Given system is in " + ms_state + " state")
+        systems = [(system_name, system_uuid)]
+    else:
+        systems = [(each['SystemName'], each['UUID']) for each in json.loads(rest_conn.getManagedSystemsQuick() or '[]')]
+
+    matches = dict((vm_name, []) for vm_name in vm_names)
+    for each_system, system_uuid in systems:
+        try:
+            lpar_response = rest_conn.getLogicalPartitionsQuick(system_uuid)
+        except Exception as error:
+            if system_name:
+                raise
+            logger.debug("Skipping partitions of %s: %s", each_system, repr(error))
+            continue
+        for eachLpar in json.loads(lpar_response or '[]'):
+            if eachLpar['PartitionName'] in matches:
+                matches[eachLpar['PartitionName']].append((each_system, eachLpar))
+    return matches
+
+
+def submit_power_job(rest_conn, params, lpar):
+    operation = params['action']
+    if operation == 'poweron':
+        prof_uuid = None
+        if params['prof_name']:
+            prof_uuid = find_profile_uuid(rest_conn, lpar['UUID'], params['prof_name'])
+        return rest_conn.poweronPartition(lpar['UUID'], prof_uuid, params['keylock'], params['iIPLsource'], lpar['PartitionType'], wait=False)
+    if operation == 'restart':
+        return rest_conn.poweroffPartition(lpar['UUID'], 'true', params['restart_option'] or 'Immediate', wait=False)
+    return rest_conn.poweroffPartition(lpar['UUID'], 'false', params['shutdown_option'] or 'Delayed', wait=False)
+
+
+def bulk_power_partitions(module, params):
+    rest_conn = None
+    validate_parameters(params)
+    hmc_host = params['hmc_host']
+    hmc_user = params['hmc_auth']['username']
+    password = params['hmc_auth']['password']
+    operation = params['action']
+    vm_names = list(OrderedDict.fromkeys(params['vm_names']))
+
+    try:
+        rest_conn = HmcRestClient(hmc_host, hmc_user, password, job_poll=params.get('job_poll'))
+    except ParameterError:
+        raise
+    except Exception as error:
+        logger.debug(repr(error))
+        module.fail_json(msg="Logon to HMC failed")
+
+    results = OrderedDict((vm_name, {'vm_name': vm_name, 'system_name': None, 'status': 'failed', 'msg': None, 'elapsed': 0})
+                          for vm_name in vm_names)
+    try:
+        matches = resolve_partitions(rest_conn, params['system_name'], vm_names)
+        job_manager = HmcJobManager(rest_conn, params.get('max_concurrent') or 4)
+        clock = job_manager.poller.clock
+        started = {}
+
+        def submit(lpar):
+            started[lpar['PartitionName']] = clock.time()
+            return submit_power_job(rest_conn, params, lpar)
+
+        for vm_name in vm_names:
+            result = results[vm_name]
+            if not matches[vm_name]:
+                result['msg'] = "Logical Partition not found in any of the managed systems"
+                continue
+            if len(matches[vm_name]) > 1:
+                result['msg'] = "Logical Partition found in multiple managed systems: {0}." \
+                    " Please provide the system_name parameter".format(', '.join(each[0] for each in matches[vm_name]))
+                continue
+            result['system_name'], lpar = matches[vm_name][0]
+            activated = lpar['PartitionState'] != 'not activated'
+            if activated == (operation == 'poweron'):
+                result['status'] = 'unchanged'
+                result['msg'] = "Partition already in {0} state".format(lpar['PartitionState'])
+                continue
+            job_manager.add(vm_name, partial(submit, lpar))
+
+        for vm_name, resp, error in job_manager.as_completed():
+            result = results[vm_name]
+            result['elapsed'] = round(clock.time() - started.get(vm_name, clock.time()), 1)
+            if error is None:
+                result['status'] = 'changed'
+                continue
+            result['msg'] = parse_error_response(error)
+            if operation == 'poweron' and vm_name in started:
+                # same as a single poweron, activation into the error state still counts as a change
+                lpar_uuid = matches[vm_name][0][1]['UUID']
+                try:
+                    if json.loads(rest_conn.getLogicalPartitionQuick(lpar_uuid))['PartitionState'] == 'error':
+                        result['status'] = 'changed'
+                except Exception as state_error:
+                    # the partition is reported with the error of its job
+                    logger.debug("Unable to read the state of %s: %s", vm_name, repr(state_error))
+
+    except Exception as error:
+        error_msg = parse_error_response(error)
+        logger.debug("Line number: %d exception: %s", sys.exc_info()[2].tb_lineno, repr(error))
+        module.fail_json(msg=error_msg)
+    finally:
+        try:
+            rest_conn.logoff()
+        except Exception as logoff_error:
+            error_msg = parse_error_response(logoff_error)
+            module.warn(error_msg)
+
+    partition_info = list(results.values())
+    failed = [each['vm_name'] for each in partition_info if each['status'] == 'failed']
+    if failed:
+        module.fail_json(msg="{0} failed for partitions: {1}".format(operation, ', '.join(failed)), partition_info=partition_info)
+    return any(each['status'] == 'changed' for each in partition_info), partition_info, None
+
+
 def install_aix_os(module, params):
     hmc_host = params['hmc_host']
     hmc_user = params['hmc_auth']['username']
@@ -1524,7 +1738,12 @@ def install_aix_os(module, params):
             else:
                 module.fail_json(msg="None of adapters part of the profile is reachable through network. Please attach correct network adapter")
 
-        rmc_state, vm_property, ref_code = hmc.checkForOSToBootUpFully(system_name, vm_name, timeout)
+        events = HmcEventListener.connect(hmc_host, hmc_user, password)
+        try:
+            rmc_state, vm_property, ref_code = hmc.checkForOSToBootUpFully(system_name, vm_name, timeout, events)
+        finally:
+            if events:
+                events.close()
         if rmc_state:
             changed = True
         elif ref_code in ['', '00']:
@@ -1553,7 +1772,7 @@ def partition_details(module, params):
     advanced_info = params['advanced_info']
 
     try:
-        rest_conn = HmcRestClient(hmc_host, hmc_user, password)
+        rest_conn = HmcRestClient(hmc_host, hmc_user, password, job_poll=params.get('job_poll'))
     except Exception as error:
         error_msg = parse_error_response(error)
         module.fail_json(msg=error_msg)
@@ -1651,6 +1870,8 @@ def perform_task(module):
     oper = 'state'
     if params['state'] is None:
         oper = 'action'
+    if params.get('vm_names') and params[oper] in ('shutdown', 'poweron', 'restart'):
+        actions[params[oper]] = bulk_power_partitions
     try:
         return actions[params[oper]](module, params)
     except (ParameterError, HmcError, Error) as error:
@@ -1703,7 +1924,9 @@ def run_module():
                       )
                       ),
         system_name=dict(type='str'),
-        vm_name=dict(type='str', required=True),
+        vm_name=dict(type='str'),
+        vm_names=dict(type='list', elements='str'),
+        max_concurrent=dict(type='int'),
         vm_id=dict(type='int'),
         proc=dict(type='int'),
         max_proc=dict(type='int'),
@@ -1748,6 +1971,13 @@ def run_module():
                          ),
         shutdown_option=dict(type='str', choices=['Delayed', 'Immediate', 'OperatingSystem', 'OSImmediate']),
         restart_option=dict(type='str', choices=['Immediate', 'OperatingSystem', 'OSImmediate', 'Dump', 'DumpRetry']),
+        job_poll=dict(type='dict',
+                      options=dict(
+                          initial_interval=dict(type='int'),
+                          max_interval=dict(type='int'),
+                          backoff_factor=dict(type='float'),
+                      )
+                      ),
         state=dict(type='str',
                    choices=['present', 'absent', 'facts']),
         action=dict(type='str',
@@ -1756,14 +1986,14 @@ def run_module():
 
     module = AnsibleModule(
         argument_spec=module_args,
-        mutually_exclusive=[('state', 'action')],
-        required_one_of=[('state', 'action')],
+        mutually_exclusive=[('state', 'action'), ('vm_name', 'vm_names')],
+        required_one_of=[('state', 'action'), ('vm_name', 'vm_names')],
         required_if=[['state', 'facts', ['hmc_host', 'hmc_auth', 'vm_name']],
                      ['state', 'absent', ['hmc_host', 'hmc_auth', 'vm_name']],
                      ['state', 'present', ['hmc_host', 'hmc_auth', 'system_name', 'vm_name', 'os_type']],
-                     ['action', 'shutdown', ['hmc_host', 'hmc_auth', 'vm_name']],
-                     ['action', 'poweron', ['hmc_host', 'hmc_auth', 'vm_name']],
-                     ['action', 'restart', ['hmc_host', 'hmc_auth', 'vm_name']],
+                     ['action', 'shutdown', ['vm_name', 'vm_names'], True],
+                     ['action', 'poweron', ['vm_name', 'vm_names'], True],
+                     ['action', 'restart', ['vm_name', 'vm_names'], True],
                      ['action', 'install_os', ['hmc_host', 'hmc_auth', 'system_name', 'vm_name', 'install_settings']],
                      ],
         required_by=dict(
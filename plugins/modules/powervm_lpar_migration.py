@@ -96,6 +96,30 @@ options:
             - The maximum time, in minutes, to wait for operation to complete
             - This option can be used only with C(migrate) and C(validate) I(action)
         type: int
+    concurrent_migrations:
+        description:
+            - Validate and migrate the partitions one by one instead of with a single C(migrlpar) command.
+            - Every partition is validated first, all together. The partitions which validated are then migrated
+              with at most I(concurrent_migrations) migrations in flight, keep it within the concurrency limits of the HMC
+              and of the managed systems.
+            - The status, attempts and elapsed seconds of every partition are returned in I(system_info).
+            - This option can be used only with C(migrate) and C(validate) I(action)
+        type: int
+    retries:
+        description:
+            - Number of times a migration is attempted again after a transient failure, like a busy HMC or a dropped SSH session.
+            - Before a new attempt, the partition is looked up after I(retry_delay) seconds. It is attempted again only when it is still
+              on I(src_system) and not migrating, and reported as C(migrated) when it already left I(src_system) for I(dest_system).
+              While its migration is still in progress, it is looked up again after another I(retry_delay), each wait counting as one retry.
+            - Default value is 0.
+            - This option can be used only with I(concurrent_migrations) and C(migrate) I(action)
+        type: int
+    retry_delay:
+        description:
+            - Seconds to wait before attempting a migration again.
+            - Default value is 60.
+            - This option can be used only with I(concurrent_migrations) and C(migrate) I(action)
+        type: int
     action:
         description:
             - C(validate) validate a specified partition/s.
@@ -144,6 +168,19 @@ EXAMPLES = '''
     all_vms: true
     action: migrate
 
+- name: Evacuate a cec, validating every partition first and migrating four at a time
+  powervm_lpar_migration:
+    hmc_host: "{{ inventory_hostname }}"
+    hmc_auth:
+         username: '{{ ansible_user }}'
+         password: '{{ hmc_password }}'
+    src_system: <managed_system_name>
+    dest_system: <destination_system_name>
+    all_vms: true
+    concurrent_migrations: 4
+    retries: 2
+    action: migrate
+
 - name: Adds SSH authentication key of remote HMC.
   powervm_lpar_migration:
     hmc_host: "{{ inventory_hostname }}"
@@ -158,8 +195,12 @@ EXAMPLES = '''
 
 RETURN = '''
 system_info:
-    description: Respective partition migration information
-    type: dict
+    description:
+        - Respective partition migration information
+        - With I(concurrent_migrations), the list of the partitions with their C(status), C(msg), C(validate_elapsed) seconds
+          and, once migrated, C(attempts) and C(elapsed) seconds, also returned on failure.
+          C(status) is one of C(validated), C(validation_failed), C(migrated) or C(failed).
+    type: raw
     returned: always
 '''
 
@@ -172,7 +213,15 @@ from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_resource import
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import parse_error_response
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import sys
+import time
+
+# Validations run together over the shared SSH connection, at most the default MaxSessions of sshd
+MAX_PARALLEL_VALIDATIONS = 10
+# Failures worth another attempt: the HMC or the partition being busy, and dropped SSH sessions
+MIGRATION_RETRY_MARKERS = ('busy', 'try again', 'temporarily', 'maximum number of concurrent',
+                           'connection reset', 'connection refused', 'connection timed out', 'connection closed')
 
 
 def init_logger():
@@ -188,13 +237,13 @@ def validate_parameters(params):
 
     if opr == 'recover':
         mandatoryList = ['hmc_host', 'hmc_auth', 'src_system']
-        unsupportedList = ['dest_system', 'all_vms', 'wait', 'remote_ip']
+        unsupportedList = ['dest_system', 'all_vms', 'wait', 'remote_ip', 'concurrent_migrations']
     elif opr == 'validate':
         mandatoryList = ['hmc_host', 'hmc_auth', 'src_system', 'dest_system']
         unsupportedList = ['all_vms']
     elif opr == 'authenticate':
         mandatoryList = ['hmc_host', 'hmc_auth', 'remote_ip', 'remote_username', 'remote_passwd']
-        unsupportedList = ['all_vms', 'src_system', 'dest_system', 'vm_names', 'vm_ids', 'wait']
+        unsupportedList = ['all_vms', 'src_system', 'dest_system', 'vm_names', 'vm_ids', 'wait', 'concurrent_migrations']
     elif opr == 'migrate':
         mandatoryList = ['hmc_host', 'hmc_auth', 'src_system', 'dest_system']
         unsupportedList = []
@@ -209,9 +258,14 @@ def validate_parameters(params):
         else:
             raise ParameterError("mandatory parameters '%s' are missing" % (','.join(collate)))
 
+    if not params.get('concurrent_migrations'):
+        unsupportedList = unsupportedList + ['retries', 'retry_delay']
+    elif opr == 'validate':
+        unsupportedList = unsupportedList + ['retries', 'retry_delay']
+
     collate = []
     for eachUnsupported in unsupportedList:
-        if params[eachUnsupported]:
+        if params.get(eachUnsupported):
             collate.append(eachUnsupported)
 
     if collate:
@@ -260,6 +314,116 @@ def logical_partition_migration(module, params):
     return changed, None, None
 
 
+def is_transient_migration_error(error_msg):
+    error_msg = (error_msg or '').lower()
+    return any(marker in error_msg for marker in MIGRATION_RETRY_MARKERS)
+
+
+def migration_state(hmc, params, partition):
+    # The destination system can only be listed when it is managed by this HMC,
+    # and is looked up by partition name, a migrated partition may change of ID
+    dest_system = params['dest_system'] if 'vm_name' in partition and not params['remote_ip'] else None
+    return hmc.getMigrationState(params['src_system'], dest_system, lparName=partition.get('vm_name'), lparID=partition.get('vm_id'))
+
+
+def run_migration_step(hmc, params, opr, partition, retries=0):
+    result = {'status': 'failed', 'msg': None, 'attempts': 0, 'elapsed': 0}
+    started = time.time()
+    lparNames = partition['vm_name'] if 'vm_name' in partition else None
+    lparIDs = partition['vm_id'] if 'vm_id' in partition else None
+    waits = 0
+    while True:
+        result['attempts'] += 1
+        try:
+            hmc.migratePartitions(opr, params['src_system'], params['dest_system'], lparNames=lparNames, lparIDs=lparIDs,
+                                  aLL=False, ip=params['remote_ip'], wait=params['wait'])
+            result['status'] = 'ok'
+            result['msg'] = None
+            break
+        except HmcError as error:
+            result['msg'] = error.message
+            if not is_transient_migration_error(error.message):
+                break
+
+        # The failed attempt may still have moved the partition or left its migration
+        # running, so it is only migrated again once idle on the source system. Every
+        # wait of retry_delay seconds counts as a retry
+        state = None
+        while waits < retries and state in (None, 'migrating'):
+            waits += 1
+            logger.debug("Checking %s of %s again in %ds: %s", opr, partition, params['retry_delay'], result['msg'])
+            time.sleep(params['retry_delay'])
+            try:
+                state = migration_state(hmc, params, partition)
+            except HmcError as error:
+                logger.debug("Unable to read the migration state of %s: %s", partition, error.message)
+                state = None
+        if state == 'destination':
+            result['status'] = 'ok'
+            result['msg'] = None
+            break
+        if state != 'source':
+            break
+    result['elapsed'] = round(time.time() - started, 1)
+    return result
+
+
+def orchestrated_partition_migration(module, params):
+    hmc_host = params['hmc_host']
+    hmc_user = params['hmc_auth']['username']
+    password = params['hmc_auth']['password']
+    operation = params['action']
+    concurrent_migrations = params['concurrent_migrations']
+    validate_parameters(params)
+    if concurrent_migrations < 1:
+        raise ParameterError("concurrent_migrations must be greater than 0")
+    params = dict(params, retries=params.get('retries') or 0, retry_delay=params.get('retry_delay') or 60)
+
+    hmc_conn = HmcCliConnection(module, hmc_host, hmc_user, password)
+    hmc = Hmc(hmc_conn)
+
+    if params['vm_names']:
+        partitions = [{'vm_name': vm_name} for vm_name in params['vm_names']]
+    elif params['vm_ids']:
+        partitions = [{'vm_id': vm_id} for vm_id in params['vm_ids']]
+    elif params['all_vms']:
+        partitions = [{'vm_name': lpar['name']} for lpar in hmc.iter_lpars_details(params['src_system'], 'name,lpar_env')
+                      if lpar['lpar_env'] != 'vioserver']
+    else:
+        module.fail_json(msg="Please provide one of the lpar details vm_names, vm_ids, all_vms")
+
+    # Every partition is validated first, so that one that cannot move does not
+    # hold up the others and is reported before any migration started
+    with ThreadPoolExecutor(max_workers=min(len(partitions), MAX_PARALLEL_VALIDATIONS) or 1) as executor:
+        validations = [executor.submit(run_migration_step, hmc, params, 'v', partition) for partition in partitions]
+        for partition, validation in zip(partitions, validations):
+            result = validation.result()
+            partition['validate_elapsed'] = result['elapsed']
+            partition['status'] = 'validated' if result['status'] == 'ok' else 'validation_failed'
+            partition['msg'] = result['msg']
+
+    changed = False
+    if operation == 'migrate':
+        to_migrate = [partition for partition in partitions if partition['status'] == 'validated']
+        with ThreadPoolExecutor(max_workers=concurrent_migrations) as executor:
+            migrations = dict((executor.submit(run_migration_step, hmc, params, 'm', partition, params['retries']), partition)
+                              for partition in to_migrate)
+            for done, migration in enumerate(as_completed(migrations), 1):
+                partition = migrations[migration]
+                result = migration.result()
+                partition.update(status='migrated' if result['status'] == 'ok' else 'failed', msg=result['msg'],
+                                 attempts=result['attempts'], elapsed=result['elapsed'])
+                changed = changed or result['status'] == 'ok'
+                logger.debug("%d/%d migrations done, %s %s in %ss", done, len(to_migrate), partition.get('vm_name', partition.get('vm_id')),
+                             partition['status'], partition['elapsed'])
+
+    failed = [str(partition.get('vm_name', partition.get('vm_id'))) for partition in partitions
+              if partition['status'] in ('validation_failed', 'failed')]
+    if failed:
+        module.fail_json(changed=changed, msg="{0} failed for partitions: {1}".format(operation, ', '.join(failed)), system_info=partitions)
+    return changed, partitions, None
+
+
 def make_hmc_authentication(module, params):
     hmc_host = params['hmc_host']
     hmc_user = params['hmc_auth']['username']
@@ -300,6 +464,8 @@ def perform_task(module):
     oper = 'action'
     if params['action'] is None:
         oper = 'state'
+    if params.get('concurrent_migrations') and params[oper] in ('migrate', 'validate'):
+        actions[params[oper]] = orchestrated_partition_migration
     try:
         return actions[params[oper]](module, params)
     except Exception as error:
@@ -328,6 +494,9 @@ def run_module():
         remote_username=dict(type='str'),
         remote_passwd=dict(type='str', no_log=True),
         wait=dict(type='int'),
+        concurrent_migrations=dict(type='int'),
+        retries=dict(type='int'),
+        retry_delay=dict(type='int'),
         action=dict(type='str', choices=['validate', 'migrate', 'recover', 'authenticate'], required=True),
     )
 
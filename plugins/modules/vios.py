@@ -127,6 +127,28 @@ options:
             - Default value is False.
             - Valid only for C(state) = I(facts)
         type: bool
+    job_poll:
+        description:
+            - Polling schedule used while waiting for HMC REST jobs (free physical volume discovery) to complete.
+            - The first status check happens after I(initial_interval) seconds and the wait grows by
+              I(backoff_factor) on every poll up to I(max_interval) seconds.
+        type: dict
+        suboptions:
+            initial_interval:
+                description:
+                    - Seconds to wait before the first job status check.
+                    - Default value is 2.
+                type: int
+            max_interval:
+                description:
+                    - Upper bound in seconds for the wait between two job status checks.
+                    - Default value is 30.
+                type: int
+            backoff_factor:
+                description:
+                    - Multiplier applied to the wait after every job status check.
+                    - Default value is 2.
+                type: float
     state:
         description:
             - C(facts) fetch details of specified I(VIOS).
@@ -219,6 +241,8 @@ from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions impor
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import parse_error_response
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcRestClient
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import JobPoller
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcEventListener
 import sys
 import json
 
@@ -275,6 +299,9 @@ def validate_parameters(params):
         else:
             raise ParameterError("unsupported parameters: %s" % (', '.join(collate)))
 
+    # checked before connecting, so that it is not reported as a logon failure
+    JobPoller.from_params(params.get('job_poll'))
+
 
 def fetchViosInfo(module, params):
     hmc_host = params['hmc_host']
@@ -288,7 +315,7 @@ def fetchViosInfo(module, params):
     lpar_config = {}
 
     try:
-        rest_conn = HmcRestClient(hmc_host, hmc_user, password)
+        rest_conn = HmcRestClient(hmc_host, hmc_user, password, job_poll=params.get('job_poll'))
     except Exception as error:
         error_msg = parse_error_response(error)
         module.fail_json(msg=error_msg)
@@ -465,7 +492,12 @@ def installVios(module, params):
             else:
                 module.fail_json(msg="None of adapters part of the profile is reachable through network. Please attach correct network adapter")
 
-        rmc_state, vios_property, ref_code = hmc.checkForOSToBootUpFully(system_name, name, timeout)
+        events = HmcEventListener.connect(hmc_host, hmc_user, password)
+        try:
+            rmc_state, vios_property, ref_code = hmc.checkForOSToBootUpFully(system_name, name, timeout, events)
+        finally:
+            if events:
+                events.close()
         if rmc_state:
             changed = True
         elif ref_code in ['', '00']:
@@ -546,6 +578,13 @@ def run_module():
         timeout=dict(type='int'),
         virtual_optical_media=dict(type='bool'),
         free_pvs=dict(type='bool'),
+        job_poll=dict(type='dict',
+                      options=dict(
+                          initial_interval=dict(type='int'),
+                          max_interval=dict(type='int'),
+                          backoff_factor=dict(type='float'),
+                      )
+                      ),
         state=dict(type='str', choices=['facts', 'present']),
         action=dict(type='str', choices=['install', 'accept_license']),
     )
@@ -0,0 +1,45 @@
+"""
+Per-command latency of HmcCliConnection against a real HMC, with a fresh SSH connection
+per command and with commands multiplexed over a persistent master connection.
+
+Run from the collection root with the collection on the python path:
+    HMC_HOST=<hmc> HMC_USER=<user> HMC_PASSWORD=<password> python tests/benchmarks/bench_cli_ssh_reuse.py [count]
+"""
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import sys
+import subprocess
+
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_cli_client import HmcCliConnection
+
+
+class CommandRunner:
+    """Stands in for AnsibleModule.run_command"""
+
+    def run_command(self, cmd, use_unsafe_shell=False):
+        proc = subprocess.Popen(cmd, shell=use_unsafe_shell, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        stdout, stderr = proc.communicate()
+        return proc.returncode, stdout, stderr
+
+
+def main():
+    host, user, password = os.environ.get('HMC_HOST'), os.environ.get('HMC_USER'), os.environ.get('HMC_PASSWORD')
+    if not (host and user):
+        sys.exit("HMC_HOST and HMC_USER (and HMC_PASSWORD unless key based) must be set")
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print("{0:<12}{1:>12}{2:>12}{3:>12}".format('connection', 'first (ms)', 'mean (ms)', 'max (ms)'))
+    for name, control_persist in (('fresh', 0), ('multiplexed', 30)):
+        conn = HmcCliConnection(CommandRunner(), host, user, password, control_persist=control_persist)
+        for i in range(count):
+            conn.execute('lshmc -V')
+        elapsed = [timing['elapsed'] * 1000 for timing in conn.command_timings]
+        following = elapsed[1:] or elapsed
+        print("{0:<12}{1:>12.0f}{2:>12.0f}{3:>12.0f}".format(name, elapsed[0], sum(following) / len(following), max(following)))
+        if conn.control_path:
+            subprocess.call(['ssh', '-O', 'exit', '-o', 'ControlPath=' + conn.control_path, '{0}@{1}'.format(user, host)])
+
+
+if __name__ == '__main__':
+    main()
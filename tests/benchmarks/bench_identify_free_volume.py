@@ -0,0 +1,158 @@
+"""
+Benchmark of identifyFreeVolume on a frame with four VIOSes, against the previous
+implementation that ran the GetFreePhysicalVolumes job and the ViosStorage GET of
+every VIOS one after another and re-evaluated XPaths inside its sort keys and loops.
+
+The HMC is replayed from recorded responses with simulated latencies, scaled down
+from what is seen on real HMCs (a GetFreePhysicalVolumes job takes 30s or more).
+
+Run from the collection root with the collection on the python path:
+    python tests/benchmarks/bench_identify_free_volume.py
+"""
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import sys
+import json
+import time
+import threading
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unit', 'module_utils'))
+import hmc_feeds  # noqa: E402
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcRestClient, JobPoller  # noqa: E402
+from ansible_collections.ibm.power_hmc.plugins.modules.powervm_lpar_instance import identifyFreeVolume  # noqa: E402
+
+VIOSES = 4
+PVS = 400
+SHARED = 200
+IN_USE = (0, 1, 2)
+JOB_SECONDS = 1.0
+STORAGE_GET_SECONDS = 0.3
+REQUEST_SECONDS = 0.02
+
+
+class RecordedResponse:
+
+    def __init__(self, body):
+        self.code = 200
+        self.body = body
+
+    def read(self):
+        return self.body
+
+
+class RecordedHmc:
+    """Replays the responses of an HMC managing one frame with VIOSES VIOSes"""
+
+    def __init__(self):
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.storage = dict(('vios-uuid-%d' % i, hmc_feeds.vios_storage(i, PVS, SHARED, IN_USE)) for i in range(1, VIOSES + 1))
+        self.free_pvs = dict(('vios-uuid-%d' % i, hmc_feeds.free_pvs_job_response(i, PVS, SHARED)) for i in range(1, VIOSES + 1))
+        self.running = hmc_feeds.job_response(status='RUNNING', operation='GetFreePhysicalVolumes')
+
+    def open_url(self, url, headers=None, method='GET', data=None, timeout=300):
+        if url.endswith('/VirtualIOServer/quick/All'):
+            time.sleep(REQUEST_SECONDS)
+            return RecordedResponse(json.dumps([{'UUID': 'vios-uuid-%d' % i, 'PartitionName': 'vios%d' % i, 'RMCState': 'active'}
+                                                for i in range(1, VIOSES + 1)]))
+        if url.endswith('/do/GetFreePhysicalVolumes'):
+            time.sleep(REQUEST_SECONDS)
+            vios_uuid = url.split('/')[-3]
+            with self.lock:
+                job_id = str(len(self.jobs))
+                self.jobs[job_id] = (vios_uuid, time.time() + JOB_SECONDS)
+            return RecordedResponse(hmc_feeds.job_response(status='NOT_STARTED').replace(b'1600000000001', job_id.encode()))
+        if '/jobs/' in url:
+            time.sleep(REQUEST_SECONDS)
+            vios_uuid, done = self.jobs[url.split('/')[-1]]
+            return RecordedResponse(self.free_pvs[vios_uuid] if time.time() >= done else self.running)
+        if url.endswith('?group=ViosStorage'):
+            time.sleep(STORAGE_GET_SECONDS)
+            return RecordedResponse(self.storage[url.split('/')[-1].split('?')[0]])
+        raise ValueError(url)
+
+
+def rest_client():
+    rest_conn = HmcRestClient.__new__(HmcRestClient)
+    rest_conn.hmc_ip = 'hmc'
+    rest_conn.session = 'session'
+    rest_conn.job_poll = JobPoller(initial_interval=0.1, max_interval=0.5)
+    rest_conn._open_url = RecordedHmc().open_url
+    return rest_conn
+
+
+def legacy_fetchAllInUsePhyVolumes(rest_conn, vios_uuid):
+    pvid_in_use = []
+    vios_response = rest_conn.getVirtualIOServer(vios_uuid, group="ViosStorage")
+    phy_vol_list = vios_response.xpath("//MoverServicePartition/following-sibling::PhysicalVolumes/PhysicalVolume")
+    for each_phy_vol in phy_vol_list:
+        if each_phy_vol.xpath("AvailableForUsage")[0].text == "false":
+            pvid_in_use.append(each_phy_vol.xpath("UniqueDeviceID")[0].text)
+    return pvid_in_use
+
+
+def legacy_identifyFreeVolume(rest_conn, system_uuid, volume_size=0, pvid_list=None):
+    # previous implementation, trimmed to the volume_size selection used here
+    vios_list = json.loads(rest_conn.getVirtualIOServersQuick(system_uuid))
+    vios_uuid_list = [(vios['UUID'], vios['PartitionName']) for vios in vios_list if vios['RMCState'] == 'active']
+    pv_complex = []
+    keys_list = []
+    pvs_in_use = []
+    for vios_uuid, viosname in vios_uuid_list:
+        each_vios_pv_complex = {}
+        pv_xml_list = rest_conn.getFreePhyVolume(vios_uuid)
+        pvs_in_use += legacy_fetchAllInUsePhyVolumes(rest_conn, vios_uuid)
+        for each in pv_xml_list:
+            if (pvid_list and each.xpath("UniqueDeviceID")[0].text in pvid_list):
+                continue
+            if volume_size > 0 and int(each.xpath("VolumeCapacity")[0].text) >= volume_size:
+                each_vios_pv_complex.update({each.xpath("UniqueDeviceID")[0].text: each})
+        if each_vios_pv_complex:
+            sorted_each_vios_pv_complex = dict(sorted(each_vios_pv_complex.items(), key=lambda x: int(x[1].xpath("VolumeCapacity")[0].text)))
+            keys_list += sorted_each_vios_pv_complex.keys()
+            pv_complex.append((sorted_each_vios_pv_complex, vios_uuid, viosname))
+
+    unique_keys = list(OrderedDict.fromkeys(keys_list))
+    found_list = []
+    first_singlepath_incidence = []
+    for each_DVID in unique_keys:
+        if each_DVID in pvs_in_use:
+            continue
+        for each_pv_complex in pv_complex:
+            if each_DVID in each_pv_complex[0]:
+                found_list += [(each_pv_complex[0][each_DVID].xpath("VolumeName")[0].text, each_pv_complex[2], each_pv_complex[0][each_DVID])]
+        if len(found_list) >= 2:
+            singlepath_l = [each for each in found_list if each[2].xpath("ReservePolicy")[0].text == 'SinglePath']
+            if singlepath_l and (len(found_list) - len(singlepath_l)) <= 1:
+                if not first_singlepath_incidence:
+                    first_singlepath_incidence.append(singlepath_l[0])
+                found_list = []
+                continue
+            return list(set(found_list) - set(singlepath_l))
+        found_list = []
+    return first_singlepath_incidence or None
+
+
+def picked(volumes):
+    return sorted((name, vios) for name, vios, pv in volumes)
+
+
+def main():
+    print("{0} VIOSes, {1} free PVs each, {2:.1f}s jobs, {3:.1f}s ViosStorage GETs".format(VIOSES, PVS, JOB_SECONDS, STORAGE_GET_SECONDS))
+    print("{0:<26}{1:>12}{2:>12}{3:>10}".format('volume_size', 'before (s)', 'after (s)', 'speedup'))
+    for volume_size in (10240, 14000):
+        start = time.time()
+        before_volumes = legacy_identifyFreeVolume(rest_client(), 'ms-uuid', volume_size=volume_size)
+        before = time.time() - start
+        start = time.time()
+        after_volumes = identifyFreeVolume(rest_client(), 'ms-uuid', volume_size=volume_size)
+        after = time.time() - start
+        assert picked(before_volumes) == picked(after_volumes)
+        print("{0:<26}{1:>12.2f}{2:>12.2f}{3:>9.1f}x".format(volume_size, before, after, before / after))
+
+
+if __name__ == '__main__':
+    main()
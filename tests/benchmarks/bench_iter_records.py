@@ -0,0 +1,52 @@
+"""
+Micro-benchmark of a partition lookup through HmcCommandStack.iter_records, which parses
+the lines of an lssyscfg listing one at a time and stops at the match, against the
+previous path, which parsed the whole output with parseMultiLineCSV.
+
+Both paths start from the whole output, as returned by HmcCliConnection.execute: only
+the parsing stops early, the listing is still read in full.
+
+Run from the collection root with the collection on the python path:
+    python tests/benchmarks/bench_iter_records.py
+"""
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unit', 'module_utils'))
+import hmc_cli_outputs  # noqa: E402
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_command_stack import HmcCommandStack  # noqa: E402
+
+
+def lssyscfg_output(lpars):
+    # stands in for an lssyscfg listing, one partition per line
+    return ''.join(hmc_cli_outputs.LSSYSCFG_LPAR.replace('name=vios1,lpar_id=1,', 'name=lpar{0},lpar_id={0},'.format(lpar_id), 1)
+                   for lpar_id in range(1, lpars + 1))
+
+
+def full_parse_lookup(output, name):
+    return next(record for record in HmcCommandStack().parseMultiLineCSV(output) if record['NAME'] == name)
+
+
+def early_stop_lookup(output, name):
+    return next(record for record in HmcCommandStack().iter_records(output.splitlines()) if record['NAME'] == name)
+
+
+def main():
+    lpars = 5000
+    output = lssyscfg_output(lpars)
+    header = ('match', 'before (ms)', 'after (ms)', 'speedup')
+    print("{0:<22}{1:>14}{2:>14}{3:>10}".format(*header))
+    for position in (10, lpars // 2, lpars):
+        name = 'lpar{0}'.format(position)
+        assert full_parse_lookup(output, name) == early_stop_lookup(output, name)
+        before = min(timeit.repeat(lambda: full_parse_lookup(output, name), number=1, repeat=3)) * 1000
+        after = min(timeit.repeat(lambda: early_stop_lookup(output, name), number=1, repeat=3)) * 1000
+        print("{0:<22}{1:>14.1f}{2:>14.1f}{3:>9.1f}x".format('{0} of {1}'.format(position, lpars), before, after, before / after))
+
+
+if __name__ == '__main__':
+    main()
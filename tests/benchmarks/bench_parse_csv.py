@@ -0,0 +1,157 @@
+"""
+Micro-benchmark of HmcCommandStack.parseCSV, which scans every line once with the
+HMC_CSV_FIELD tokenizer, against the previous parser, which split on every comma
+and reassembled quoted values through exception driven lookahead.
+
+Run from the collection root with the collection on the python path:
+    python tests/benchmarks/bench_parse_csv.py
+"""
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unit', 'module_utils'))
+import hmc_cli_outputs  # noqa: E402
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_command_stack import HmcCommandStack  # noqa: E402
+
+
+def legacy_parse_csv(csvData):
+    self = HmcCommandStack()
+    dict = {}
+    key_bkup = ""
+    value_bkup = ""
+    valueHasColonDelim = False
+    caseLshmccert = False
+    csvList = csvData.split(',')
+    csvIter = iter(csvList)
+    next(csvIter)
+    prevdata = ""
+    for each in csvList:
+        if csvIter.__length_hint__():
+            nextdata = next(csvIter)
+        else:
+            nextdata = ""
+        try:
+            if valueHasColonDelim:
+                if '=' not in each:
+                    value_bkup += ',' + each
+                    continue
+                if ': ' in each and '=' not in each.split(': ')[0]:
+                    value_bkup += ',' + each
+                    if nextdata == "":
+                        dict[key_bkup].append(self.parseColonSV(value_bkup))
+                    continue
+                # To handle colon seperated data which starts with double quote
+                if ': ' in each and '""' in each[0: 2]:
+                    if value_bkup:
+                        dict[key_bkup].append(self.parseColonSV(value_bkup))
+
+                    value_bkup = each.strip('""')
+                    continue
+                # To handle simple colon seperated data
+                if ': ' in each:
+                    if value_bkup:
+                        dict[key_bkup].append(self.parseColonSV(value_bkup))
+
+                    value_bkup = ""
+                    # Identifying the end of colon data
+                    if ': ' not in nextdata and '=' in nextdata:
+                        dict[key_bkup].append(self.parseColonSV(each))
+                        valueHasColonDelim = False
+                        continue
+                # To confirm that the colon data finised, here handling
+                #  the next non colon data as well and going out of colon
+                #  parsing
+                else:
+                    if value_bkup:
+                        dict[key_bkup].append(self.parseColonSV(value_bkup))
+
+                    key, value = each.split('=')
+                    key = key.strip('"').strip('\r\n')
+                    value = value.strip('\r\n')
+                    dict.update({key.upper(): value})
+                    valueHasColonDelim = False
+            else:
+                if caseLshmccert:
+                    key = key_bkup
+                    value = dict[key_bkup] + ',' + each.strip('"')
+                    if '"' in each[-1]:
+                        caseLshmccert = False
+                elif '<' in each and ('>' in each or '>' in nextdata[-4]):
+                    t = each.split('=')
+                    if t[0][0] != '<':
+                        key = t.pop(0)
+                        value = '='.join(t)
+                        value = value.strip('"')
+                    else:
+                        key = dict.keys()[0]
+                        value = dict[key] + ',' + '='.join(t)
+                elif '<' in prevdata and '>' in each[-4]:
+                    key = key_bkup
+                    value = dict[key_bkup] + ',' + each.strip('"')
+                elif '"' in each[0]:
+                    t = each.split('=')
+                    if len(t) == 3:
+                        key = t[0].strip('"')
+                        value = t[1] + '=' + t[2]
+                        caseLshmccert = True
+                    else:
+                        key, value = each.split('=')
+                else:
+                    key, value = each.split('=', 1)
+                key = key.strip('"').strip('\r\n')
+                value = value.strip('\r\n')
+                dict.update({key.upper(): value})
+
+        except ValueError as errMsg:
+            if "too many values to unpack" in repr(errMsg):
+                if ': ' in each:
+                    temp = each.split('=')
+                    valueHasColonDelim = True
+                    key = temp[0].strip('"')
+                    dict.update({key.upper(): []})
+                    value = each.lstrip('"')
+                    value = value.strip(key)
+                    value = value.strip('=')
+                    # if the next data is empty, then handle the parsing of
+                    # colon data here itself
+                    if nextdata == "":
+                        dict[key.upper()].append(self.parseColonSV(value))
+            else:
+                value = each.strip('"').strip('\r\n')
+                value = value_bkup + ',' + value.strip('\r\n')
+                dict.pop(key_bkup)
+                dict.update({key_bkup: value})
+        key_bkup, value_bkup = key.upper(), value
+        prevdata = each
+
+    return dict
+
+
+def wide_list_line(slots):
+    # a profile holding a long quoted list, reassembled piece by piece by the legacy parser
+    io_slots = ','.join('2101{0:04X}/none/0'.format(slot) for slot in range(slots))
+    return 'name=default_profile,lpar_name=lpar1,lpar_id=2,"io_slots={0}",lpar_io_pool_ids=none\n'.format(io_slots)
+
+
+def main():
+    cases = [('lssyscfg -r sys', hmc_cli_outputs.LSSYSCFG_SYS),
+             ('lssyscfg -r lpar', hmc_cli_outputs.LSSYSCFG_LPAR),
+             ('lssyscfg -r prof', hmc_cli_outputs.LSSYSCFG_PROF),
+             ('lsrefcode', hmc_cli_outputs.LSREFCODE),
+             ('lshmcldap -r config', hmc_cli_outputs.LSHMCLDAP_CONFIG),
+             ('1k slot io_slots', wide_list_line(1000))]
+    current = HmcCommandStack().parseCSV
+    print("{0:<22}{1:>8}{2:>14}{3:>14}{4:>10}".format('output', 'attrs', 'before (us)', 'after (us)', 'speedup'))
+    for name, line in cases:
+        attrs = len(current(line))
+        before = min(timeit.repeat(lambda: legacy_parse_csv(line), number=2000, repeat=5)) / 2000 * 1000000
+        after = min(timeit.repeat(lambda: current(line), number=2000, repeat=5)) / 2000 * 1000000
+        print("{0:<22}{1:>8}{2:>14.1f}{3:>14.1f}{4:>9.1f}x".format(name, attrs, before, after, before / after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Micro-benchmark of the vSCSI partition index of fetchSCSIIndexFromVIOS against the
+previous per-partition scan, which parsed the ViosSCSIMapping feed for every queried
+partition and merged multipath volumes by scanning the details collected so far.
+
+Run from the collection root with the collection on the python path:
+    python tests/benchmarks/bench_scsi_index.py
+"""
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import sys
+import timeit
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unit', 'module_utils'))
+import hmc_feeds  # noqa: E402
+from bench_vios_mapping_xpaths import VIOS_LIST, legacy_scsi_details, rest_client  # noqa: E402
+
+
+def indexed_scsi_details(feed, lpar_ids):
+    rest_conn = rest_client(feed)
+    rest_conn.scsi_indexes = {}
+    return [rest_conn.fetchSCSIDetailsFromVIOS('ms-uuid', lpar_id, VIOS_LIST) for lpar_id in lpar_ids]
+
+
+def main():
+    warnings.simplefilter('ignore', FutureWarning)
+    print("{0:<34}{1:>14}{2:>14}{3:>10}".format('ViosSCSIMapping 10k', 'before (ms)', 'after (ms)', 'speedup'))
+    for lpars in (50, 10):
+        feed = hmc_feeds.vios_scsi_feed(10000, lpars=lpars)
+        for queried in (1, lpars):
+            lpar_ids = list(range(10, 10 + queried))
+            assert [legacy_scsi_details(feed, lpar_id) for lpar_id in lpar_ids] == indexed_scsi_details(feed, lpar_ids)
+            repeat = 1 if queried > 1 else 3
+            before = min(timeit.repeat(lambda: [legacy_scsi_details(feed, lpar_id) for lpar_id in lpar_ids], number=1, repeat=repeat)) * 1000
+            after = min(timeit.repeat(lambda: indexed_scsi_details(feed, lpar_ids), number=1, repeat=repeat)) * 1000
+            name = "{0} of {1} partitions queried".format(queried, lpars)
+            print("{0:<34}{1:>14.1f}{2:>14.1f}{3:>9.1f}x".format(name, before, after, before / after))
+
+
+if __name__ == '__main__':
+    main()
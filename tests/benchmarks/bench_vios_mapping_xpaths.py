@@ -0,0 +1,112 @@
+"""
+Micro-benchmark of fetchSCSIDetailsFromVIOS and fetchFCDetailsFromVIOS, which evaluate
+the precompiled relative queries of HMC_XPATHS, against the previous loops that wrapped
+every mapping in an ElementTree and rescanned it with '//' expressions.
+
+Run from the collection root with the collection on the python path:
+    python tests/benchmarks/bench_vios_mapping_xpaths.py
+"""
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import sys
+import timeit
+import warnings
+
+from lxml import etree
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unit', 'module_utils'))
+import hmc_feeds  # noqa: E402
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import HmcRestClient  # noqa: E402
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import xml_strip_namespace  # noqa: E402
+
+VIOS_LIST = [{'PartitionID': 1, 'PartitionName': 'vios1'}, {'PartitionID': 2, 'PartitionName': 'vios2'}]
+VIOS_DICT = {vios['PartitionID']: vios['PartitionName'] for vios in VIOS_LIST}
+
+
+def legacy_fc_details(feed, lpar_id):
+    vfcs = []
+    for vios_fc_raw in xml_strip_namespace(feed).xpath('//VirtualFibreChannelMapping'):
+        vfc_dict = {}
+        vios_fc = etree.ElementTree(vios_fc_raw)
+        if vios_fc.find('//ClientAdapter') is None:
+            continue
+        part_id = vios_fc.xpath('//ClientAdapter/LocalPartitionID')[0].text
+        if str(lpar_id) == str(part_id):
+            vios_id = int(vios_fc.xpath('//ClientAdapter/ConnectingPartitionID')[0].text)
+            vfc_dict['PortName'] = vios_fc.xpath('//ServerAdapter/PhysicalPort/PortName')[0].text
+            vfc_dict['vios'] = VIOS_DICT[vios_id]
+            vfc_dict['LocationCode'] = vios_fc.xpath('//ServerAdapter/PhysicalPort/LocationCode')[0].text
+            vfc_dict['WWPNs'] = vios_fc.xpath('//ClientAdapter/WWPNs')[0].text
+            vfc_dict['ClientVirtualSlotNumber'] = vios_fc.xpath('//ClientAdapter/VirtualSlotNumber')[0].text
+            vfc_dict['ServerVirtualSlotNumber'] = vios_fc.xpath('//ClientAdapter/ConnectingVirtualSlotNumber')[0].text
+            vfcs.append(vfc_dict)
+    return vfcs
+
+
+def legacy_scsi_details(feed, lpar_id):
+    vscsis = []
+    for vios_scsi_raw in xml_strip_namespace(feed).xpath('//VirtualSCSIMapping'):
+        vscsi_dict = {}
+        vios_scsi = etree.ElementTree(vios_scsi_raw)
+        if len(vios_scsi.xpath('//ClientAdapter')) < 1:
+            continue
+        part_id = vios_scsi.xpath('//ClientAdapter/LocalPartitionID')[0].text
+        if str(lpar_id) == str(part_id):
+            if len(vios_scsi.xpath('//Storage/PhysicalVolume/VolumeUniqueID')) >= 1:
+                volumeUniqueID = vios_scsi.xpath('//Storage/PhysicalVolume/VolumeUniqueID')[0].text
+                vscsi_dict['VolumeUniqueID'] = volumeUniqueID
+                vios_id = int(vios_scsi.xpath('//ClientAdapter/RemoteLogicalPartitionID')[0].text)
+                vol_dict = {"vios": VIOS_DICT[vios_id], 'name': vios_scsi.xpath('//Storage/PhysicalVolume/VolumeName')[0].text}
+                vscsi_dict['Volume'] = [vol_dict]
+                flag = False
+                for vscsi in vscsis:
+                    if 'VolumeUniqueID' in vscsi and vscsi['VolumeUniqueID'] == volumeUniqueID:
+                        vscsi['Volume'].append(vol_dict)
+                        flag = True
+                if not flag:
+                    vscsi_dict['ClientVirtualSlotNumber'] = vios_scsi.xpath('//ClientAdapter/VirtualSlotNumber')[0].text
+                    vscsi_dict['ServerVirtualSlotNumber'] = vios_scsi.xpath('//ClientAdapter/RemoteSlotNumber')[0].text
+                    vscsi_dict['TargetDeviceName'] = vios_scsi.xpath('//TargetDevice//TargetName')[0].text
+                    vscsi_dict['VolumeCapacity'] = vios_scsi.xpath('//Storage/PhysicalVolume/VolumeCapacity')[0].text
+                    vscsis.append(vscsi_dict)
+            elif len(vios_scsi.xpath('//TargetDevice/VirtualOpticalTargetDevice')) >= 1:
+                vscsi_dict['ClientVirtualSlotNumber'] = vios_scsi.xpath('//ClientAdapter/VirtualSlotNumber')[0].text
+                vscsi_dict['ServerVirtualSlotNumber'] = vios_scsi.xpath('//ClientAdapter/RemoteSlotNumber')[0].text
+                vscsi_dict['TargetName'] = vios_scsi.xpath('//TargetDevice/VirtualOpticalTargetDevice/TargetName')[0].text
+                if len(vios_scsi.xpath('//Storage')) >= 1:
+                    vscsi_dict['MediaName'] = vios_scsi.xpath('//Storage//MediaName')[0].text
+                    vscsi_dict['MountType'] = vios_scsi.xpath('//Storage//MountType')[0].text
+                    vscsi_dict['Size'] = vios_scsi.xpath('//Storage//Size')[0].text
+                vscsis.append(vscsi_dict)
+    return vscsis
+
+
+def rest_client(feed):
+    # No HMC session is needed, the mapping feed is served from memory
+    rest_conn = HmcRestClient.__new__(HmcRestClient)
+    rest_conn.getVirtualIOServers = lambda system_uuid, group: feed
+    return rest_conn
+
+
+def main():
+    # the legacy loop relies on ElementTree.find('//...'), which lxml flags with a FutureWarning
+    warnings.simplefilter('ignore', FutureWarning)
+    cases = [('ViosSCSIMapping 5k', hmc_feeds.vios_scsi_feed(5000), legacy_scsi_details, 'fetchSCSIDetailsFromVIOS'),
+             ('ViosFCMapping 5k', hmc_feeds.vios_fc_feed(5000), legacy_fc_details, 'fetchFCDetailsFromVIOS')]
+    # Both sides parse the feed, so the parse time is also reported to show the cost of the loops alone
+    print("{0:<22}{1:>12}{2:>14}{3:>14}{4:>10}{5:>14}".format('feed', 'parse (ms)', 'before (ms)', 'after (ms)', 'speedup',
+                                                              'loop speedup'))
+    for name, feed, legacy, method in cases:
+        current = getattr(rest_client(feed), method)
+        assert legacy(feed, 10) == current('ms-uuid', 10, VIOS_LIST)
+        before = min(timeit.repeat(lambda: legacy(feed, 10), number=3, repeat=3)) / 3 * 1000
+        after = min(timeit.repeat(lambda: current('ms-uuid', 10, VIOS_LIST), number=3, repeat=3)) / 3 * 1000
+        parse = min(timeit.repeat(lambda: xml_strip_namespace(feed), number=3, repeat=3)) / 3 * 1000
+        print("{0:<22}{1:>12.1f}{2:>14.1f}{3:>14.1f}{4:>9.1f}x{5:>13.1f}x".format(name, parse, before, after, before / after,
+                                                                                  (before - parse) / (after - parse)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Micro-benchmark of xml_strip_namespace against the previous implementation, which
+renamed every parsed tag and then ran objectify.deannotate over the tree.
+
+Run from the collection root with the collection on the python path:
+    python tests/benchmarks/bench_xml_strip_namespace.py
+"""
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import sys
+import timeit
+
+from lxml import etree, objectify
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unit', 'module_utils'))
+import hmc_feeds  # noqa: E402
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client import xml_strip_namespace  # noqa: E402
+
+
+def legacy_xml_strip_namespace(xml_str):
+    parser = etree.XMLParser(recover=True, encoding='utf-8')
+    root = etree.fromstring(xml_str, parser)
+    for elem in root.iter():
+        if not hasattr(elem.tag, 'find'):
+            continue
+        i = elem.tag.find('}')
+        if i >= 0:
+            elem.tag = elem.tag[i + 1:]
+
+    objectify.deannotate(root, cleanup_namespaces=True)
+    return root
+
+
+def main():
+    feeds = [('JobResponse', hmc_feeds.job_response()),
+             ('ViosFCMapping 1k', hmc_feeds.vios_fc_feed(1000)),
+             ('ViosSCSIMapping 5k', hmc_feeds.vios_scsi_feed(5000))]
+    print("{0:<22}{1:>10}{2:>14}{3:>14}{4:>10}".format('feed', 'size', 'before (ms)', 'after (ms)', 'speedup'))
+    for name, feed in feeds:
+        assert etree.tostring(legacy_xml_strip_namespace(feed)) == etree.tostring(xml_strip_namespace(feed))
+        number = max(1, 2000000 // len(feed))
+        before = min(timeit.repeat(lambda: legacy_xml_strip_namespace(feed), number=number, repeat=3)) / number * 1000
+        after = min(timeit.repeat(lambda: xml_strip_namespace(feed), number=number, repeat=3)) / number * 1000
+        print("{0:<22}{1:>10}{2:>14.3f}{3:>14.3f}{4:>9.1f}x".format(name, len(feed), before, after, before / after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Outputs of the HMC commands parsed by HmcCommandStack, in the attribute=value format
+printed by the HMC CLI, used by the module_utils unit tests and the scripts under
+tests/benchmarks.
+"""
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+LSSYSCFG_SYS = (
+    'name=Server-8286-42A-SN2100DEW,type_model=8286-42A,serial_num=2100DEW,ipaddr=10.10.10.12,'
+    'ipaddr_secondary=10.10.10.13,state=Operating,detailed_state=None,sys_time=10/17/2026 09:15:02,'
+    'power_off_policy=1,power_on_side=temp,power_on_speed=fast,power_on_speed_override=none,'
+    'power_on_lpar_start_policy=userinit,power_on_option=autostart,power_on_method=02,'
+    'active_lpar_mobility_capable=1,inactive_lpar_mobility_capable=1,active_lpar_share_idle_procs_capable=1,'
+    'active_mem_dedup_capable=0,active_mem_expansion_capable=1,hardware_active_mem_expansion_capable=1,'
+    'active_mem_mirroring_hypervisor_capable=0,active_mem_sharing_capable=1,addr_broadcast_perf_policy_capable=0,'
+    'bsr_capable=1,cod_mem_capable=1,cod_proc_capable=1,custom_mac_addr_capable=1,dynamic_platform_optimization_capable=1,'
+    'electronic_err_reporting_capable=1,firmware_power_saver_capable=1,hardware_power_saver_capable=1,'
+    'hardware_discovery_capable=0,hca_capable=1,huge_page_mem_capable=0,lpar_affinity_group_capable=1,'
+    'lpar_avail_priority_capable=1,lpar_proc_compat_mode_capable=1,lpar_remote_restart_capable=0,'
+    'powervm_lpar_remote_restart_capable=1,lpar_suspend_capable=1,micro_lpar_capable=1,os400_capable=0,'
+    '5250_application_capable=0,os400_net_install_capable=0,redundant_err_path_reporting_capable=1,'
+    'shared_eth_failover_capable=1,sp_failover_capable=0,vet_activation_capable=1,virtual_eth_disable_capable=1,'
+    'virtual_fc_capable=1,virtual_io_server_capable=1,virtual_switch_capable=1,vlan_stats_capable=1,'
+    'vsi_on_veth_capable=1,vsn_phase2_capable=1,vtpm_capable=1,assign_5250_cpw_percent=0,max_lpars=480,'
+    'max_power_ctrl_lpars=1,curr_max_lpars_per_hca=16,pend_max_lpars_per_hca=16,hca_bandwidth_capabilities=25.0/12.5/6.25,'
+    'service_lpar_id=none,"lpar_proc_compat_modes=default,POWER6,POWER6_Plus,POWER7,POWER8",curr_turbocore=0,'
+    'pend_turbocore=0,curr_sys_keylock=norm,pend_sys_keylock=norm,curr_power_on_side=temp,pend_power_on_side=temp,'
+    'curr_power_on_speed=fast,pend_power_on_speed=fast,power_on_type=power on,power_on_lpar_start_policy_source=user,'
+    'pend_power_on_option=autostart,pend_power_on_lpar_start_policy=userinit,power_on_method_source=user,'
+    'power_on_attr=none,sp_boot_attr=none,sp_boot_major_type=08,sp_boot_minor_type=01,sp_version=00070000,'
+    'mfg_default_config=0,curr_mfg_default_ipl_source=a,pend_mfg_default_ipl_source=a,curr_mfg_default_boot_mode=norm,'
+    'pend_mfg_default_boot_mode=norm,mem_mirroring_mode=none,pend_mem_mirroring_mode=none,mem_region_size=256,'
+    'vet_activation_code=,max_vet_activation_code_len=32\n'
+)
+
+LSSYSCFG_LPAR = (
+    'name=vios1,lpar_id=1,lpar_env=vioserver,state=Running,resource_config=1,os_version=VIOS 3.1.2.10,'
+    'logical_serial_num=2100DEW1,default_profile=default_profile,curr_profile=default_profile,work_group_id=none,'
+    'shared_proc_pool_util_auth=0,allow_perf_collection=0,power_ctrl_lpar_ids=none,boot_mode=norm,lpar_keylock=norm,'
+    'auto_start=0,redundant_err_path_reporting=0,rmc_state=active,rmc_ipaddr=10.10.10.21,time_ref=0,'
+    'lpar_avail_priority=191,desired_lpar_proc_compat_mode=default,curr_lpar_proc_compat_mode=POWER8,'
+    'sync_curr_profile=1,affinity_group_id=none,vtpm_enabled=0,migr_storage_vios_data_status=Enabled,'
+    'migr_storage_vios_data_timestamp=Mon Oct 12 10:02:31 UTC 2026,powervm_mgmt_capable=1,pend_secure_boot=0,'
+    'curr_secure_boot=0,keystore_kbytes=0,linux_dynamic_key_secure_boot=0\n'
+)
+
+LSSYSCFG_PROF = (
+    'name=default_profile,lpar_name=vios1,lpar_id=1,lpar_env=vioserver,all_resources=0,min_mem=2048,'
+    'desired_mem=8192,max_mem=16384,min_num_huge_pages=0,desired_num_huge_pages=0,max_num_huge_pages=0,'
+    'mem_mode=ded,mem_expansion=0.0,hpt_ratio=1:128,proc_mode=shared,min_proc_units=0.5,desired_proc_units=1.0,'
+    'max_proc_units=2.0,min_procs=1,desired_procs=2,max_procs=4,sharing_mode=uncap,uncap_weight=255,'
+    'shared_proc_pool_id=0,shared_proc_pool_name=DefaultPool,affinity_group_id=none,'
+    '"io_slots=21010010/none/1,21010011/none/0",lpar_io_pool_ids=none,max_virtual_slots=200,'
+    '"virtual_serial_adapters=0/server/1/any//any/1,1/server/1/any//any/1",'
+    '"virtual_scsi_adapters=3/server/any/any/any/1,4/server/5/lpar5/2/0",'
+    '"virtual_eth_adapters=""2/0/1/20,30,40/0/1/ETHERNET0//all/none"",""3/0/99//0/0/ETHERNET0//all/none""",'
+    'virtual_eth_vsi_profiles=none,"virtual_fc_adapters=""5/server/5/lpar5/3//0"",""6/server/6/lpar6/3//0""",'
+    'vtpm_adapters=none,hca_adapters=none,boot_mode=norm,conn_monitoring=1,auto_start=0,power_ctrl_lpar_ids=none,'
+    'work_group_id=none,redundant_err_path_reporting=0,bsr_arrays=0,lpar_proc_compat_mode=default,electronic_err_reporting=null,'
+    'sriov_eth_logical_ports=none,sriov_roce_logical_ports=none\n'
+)
+
+LSREFCODE = 'lpar_name=vios1,lpar_id=1,time_stamp=10/17/2026 09:11:45,refcode=,word2=03D00000\n'
+
+LSPWDPOLICY_STATUS = 'active_policy=ibmStrictPolicy,min_pwage=1,pwage=180,warn_pwage=7,min_length=8,hist_size=10,' \
+    'min_digits=0,min_uppercase_chars=0,min_lowercase_chars=1,min_special_chars=0\n'
+
+LSPWDPOLICY_POLICIES = (
+    'name=ibmDefaultPolicy,"description=IBM default policy, no aging",min_pwage=0,pwage=99999,warn_pwage=7,'
+    'min_length=8,hist_size=10,min_digits=0,min_uppercase_chars=0,min_lowercase_chars=1,min_special_chars=0\n'
+    'name=ibmStrictPolicy,description=IBM strict policy,min_pwage=1,pwage=180,warn_pwage=7,min_length=8,'
+    'hist_size=10,min_digits=0,min_uppercase_chars=0,min_lowercase_chars=1,min_special_chars=0\n'
+)
+
+LSHMCUSR = (
+    'name=hscroot,taskrole=hmcsuperadmin,description=HMC Super User,pwage=99999,resourcerole=,'
+    'authentication_type=local,remote_webui_access=1,remote_ssh_access=1,min_pwage=0,session_timeout=0,'
+    'verify_timeout=15,idle_timeout=0,inactivity_expiration=0,locked=0,disabled=0,max_webui_login_attempts=0,'
+    'webui_login_suspend_time=0\n'
+    'name=ansible,taskrole=hmcoperator,"description=Automation user, ""ansible"" playbooks",pwage=180,'
+    'resourcerole=ALL:,authentication_type=ldap,remote_webui_access=0,remote_ssh_access=1,min_pwage=1,'
+    'session_timeout=120,verify_timeout=15,idle_timeout=60,inactivity_expiration=90,locked=0,disabled=0,'
+    'max_webui_login_attempts=3,webui_login_suspend_time=5\n'
+)
+
+LSHMCLDAP_CONFIG = (
+    'primary=ldaps://ldap1.example.com:636,backup=ldaps://ldap2.example.com:636,'
+    '"basedn=ou=people,dc=example,dc=com",timelimit=30,referrals=1,auth=ldap,loginattribute=uid,'
+    '"binddn=cn=hmcbind,ou=system,dc=example,dc=com",automanage=1,'
+    '"searchfilter=(&(objectClass=person)(memberOf=cn=hmc,ou=groups,dc=example,dc=com))",scope=sub,'
+    '"hmcgroups=hmcadmins,hmcoperators",auth_search=0,"groupmemberattributes=member,uniqueMember",tls_cacert=\n'
+)
+
+LSHWRES_IO_SLOT = (
+    'unit_phys_loc=U78C9.001.WZS0B32,bus_id=2,phys_loc=C12,drc_index=21010010,lpar_name=vios1,lpar_id=1,'
+    'slot_io_pool_id=none,description=PCIe2 4-port (10Gb FCoE & 1GbE) SR&RJ45 Adapter,feature_codes=EN0H,'
+    'pci_vendor_id=1077,pci_device_id=2001,pci_subs_vendor_id=1077,pci_subs_device_id=017C,pci_class=0200,'
+    'pci_revision_id=02,bus_grouping=0,iop=0,"iop_info_stale=null",parent_slot_drc_index=none,drc_name=U78C9.001.WZS0B32-P1-C12,'
+    '"sriov_capabilities=""adapter_id=1: phys_port_count=4: logical_port_count=48"",""adapter_id=2: '
+    'phys_port_count=2: logical_port_count=24"""\n'
+)
+
+# (command, output, number of attributes per record, expected attributes per record)
+CORPUS = [
+    ('lssyscfg -r sys -m Server-8286-42A-SN2100DEW', LSSYSCFG_SYS, [93],
+     [{'NAME': 'Server-8286-42A-SN2100DEW', 'STATE': 'Operating', 'SYS_TIME': '10/17/2026 09:15:02',
+       'LPAR_PROC_COMPAT_MODES': 'default,POWER6,POWER6_Plus,POWER7,POWER8', 'POWER_ON_TYPE': 'power on',
+       'MEM_REGION_SIZE': '256', 'VET_ACTIVATION_CODE': '', 'MAX_VET_ACTIVATION_CODE_LEN': '32'}]),
+    ('lssyscfg -r lpar -m Server-8286-42A-SN2100DEW --filter "lpar_names=vios1"', LSSYSCFG_LPAR, [33],
+     [{'NAME': 'vios1', 'LPAR_ENV': 'vioserver', 'OS_VERSION': 'VIOS 3.1.2.10', 'RMC_STATE': 'active',
+       'MIGR_STORAGE_VIOS_DATA_TIMESTAMP': 'Mon Oct 12 10:02:31 UTC 2026', 'LINUX_DYNAMIC_KEY_SECURE_BOOT': '0'}]),
+    ('lssyscfg -r prof -m Server-8286-42A-SN2100DEW --filter "lpar_names=vios1,profile_names=default_profile"', LSSYSCFG_PROF, [47],
+     [{'NAME': 'default_profile', 'HPT_RATIO': '1:128', 'IO_SLOTS': '21010010/none/1,21010011/none/0',
+       'VIRTUAL_SERIAL_ADAPTERS': '0/server/1/any//any/1,1/server/1/any//any/1',
+       'VIRTUAL_SCSI_ADAPTERS': '3/server/any/any/any/1,4/server/5/lpar5/2/0',
+       'VIRTUAL_ETH_ADAPTERS': '"2/0/1/20,30,40/0/1/ETHERNET0//all/none","3/0/99//0/0/ETHERNET0//all/none"',
+       'VIRTUAL_FC_ADAPTERS': '"5/server/5/lpar5/3//0","6/server/6/lpar6/3//0"', 'SRIOV_ROCE_LOGICAL_PORTS': 'none'}]),
+    ('lsrefcode -r lpar -m Server-8286-42A-SN2100DEW --filter "lpar_names=vios1"', LSREFCODE, [5],
+     [{'LPAR_NAME': 'vios1', 'TIME_STAMP': '10/17/2026 09:11:45', 'REFCODE': '', 'WORD2': '03D00000'}]),
+    ('lspwdpolicy -t s', LSPWDPOLICY_STATUS, [10],
+     [{'ACTIVE_POLICY': 'ibmStrictPolicy', 'MIN_SPECIAL_CHARS': '0'}]),
+    ('lspwdpolicy -t p', LSPWDPOLICY_POLICIES, [11, 11],
+     [{'NAME': 'ibmDefaultPolicy', 'DESCRIPTION': 'IBM default policy, no aging', 'PWAGE': '99999'},
+      {'NAME': 'ibmStrictPolicy', 'DESCRIPTION': 'IBM strict policy', 'PWAGE': '180'}]),
+    ('lshmcusr', LSHMCUSR, [17, 17],
+     [{'NAME': 'hscroot', 'RESOURCEROLE': '', 'WEBUI_LOGIN_SUSPEND_TIME': '0'},
+      {'NAME': 'ansible', 'DESCRIPTION': 'Automation user, "ansible" playbooks', 'RESOURCEROLE': 'ALL:',
+       'AUTHENTICATION_TYPE': 'ldap'}]),
+    ('lshmcldap -r config', LSHMCLDAP_CONFIG, [15],
+     [{'PRIMARY': 'ldaps://ldap1.example.com:636', 'BASEDN': 'ou=people,dc=example,dc=com',
+       'BINDDN': 'cn=hmcbind,ou=system,dc=example,dc=com',
+       'SEARCHFILTER': '(&(objectClass=person)(memberOf=cn=hmc,ou=groups,dc=example,dc=com))',
+       'HMCGROUPS': 'hmcadmins,hmcoperators', 'GROUPMEMBERATTRIBUTES': 'member,uniqueMember', 'TLS_CACERT': ''}]),
+    ('lshwres -r io --rsubtype slot -m Server-8286-42A-SN2100DEW', LSHWRES_IO_SLOT, [21],
+     [{'DESCRIPTION': 'PCIe2 4-port (10Gb FCoE & 1GbE) SR&RJ45 Adapter', 'IOP_INFO_STALE': 'null',
+       'SRIOV_CAPABILITIES': [{'ADAPTER_ID': '1', 'PHYS_PORT_COUNT': '4', 'LOGICAL_PORT_COUNT': '48'},
+                              {'ADAPTER_ID': '2', 'PHYS_PORT_COUNT': '2', 'LOGICAL_PORT_COUNT': '24'}]}]),
+]
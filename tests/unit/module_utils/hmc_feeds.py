@@ -0,0 +1,323 @@
+"""
+Synthetic HMC REST responses, shaped like the feeds returned by the HMC, used by the
+module_utils unit tests and the scripts under tests/benchmarks.
+"""
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from xml.sax.saxutils import escape
+
+UOM_NS = "http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/"
+
+FEED = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:ns2="http://a9.com/-/spec/opensearch/1.1/" xmlns:ns3="http://www.w3.org/1999/xhtml">
+    <id>feed-{kind}</id>
+    <updated>2023-01-01T00:00:00.000+00:00</updated>
+    <link rel="SELF" href="https://hmc:443/rest/api/uom/ManagedSystem/ms-uuid/{kind}"/>
+    <generator>IBM Power Systems Management Console</generator>
+{entries}
+</feed>'''
+
+ENTRY = '''    <entry>
+        <id>{uuid}</id>
+        <title>{kind}</title>
+        <published>2023-01-01T00:00:00.000+00:00</published>
+        <link rel="SELF" href="https://hmc:443/rest/api/uom/ManagedSystem/ms-uuid/{kind}/{uuid}"/>
+        <author><name>IBM Power Systems Management Console</name></author>
+        <etag:etag xmlns:etag="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/">1234</etag:etag>
+        <content type="application/vnd.ibm.powervm.uom+xml; type={kind}">
+            <{kind}:{kind} xmlns:{kind}="{ns}" xmlns="{ns}" xmlns:ns2="http://www.w3.org/XML/1998/namespace/k2" schemaVersion="V1_8_0">
+                <Metadata><Atom><AtomID>{uuid}</AtomID><AtomCreated>0</AtomCreated></Atom></Metadata>
+{body}
+            </{kind}:{kind}>
+        </content>
+    </entry>'''
+
+SCSI_PV_MAPPING = '''                    <VirtualSCSIMapping schemaVersion="V1_8_0">
+                        <Metadata><Atom/></Metadata>
+                        <AssociatedLogicalPartition kb="CUR" kxe="false" rel="related"
+                         href="https://hmc:443/rest/api/uom/ManagedSystem/ms-uuid/LogicalPartition/lpar-{lpar_id}"/>
+                        <ClientAdapter kb="CUR" kxe="false" schemaVersion="V1_8_0">
+                            <Metadata><Atom/></Metadata>
+                            <AdapterType kb="ROR" kxe="false">Client</AdapterType>
+                            <LocalPartitionID kb="CUR" kxe="false">{lpar_id}</LocalPartitionID>
+                            <RequiredAdapter kb="CUD" kxe="false">false</RequiredAdapter>
+                            <VirtualSlotNumber kb="COD" kxe="false">{client_slot}</VirtualSlotNumber>
+                            <RemoteLogicalPartitionID kb="CUR" kxe="false">{vios_id}</RemoteLogicalPartitionID>
+                            <RemoteSlotNumber kb="CUR" kxe="false">{server_slot}</RemoteSlotNumber>
+                        </ClientAdapter>
+                        <ServerAdapter kb="CUR" kxe="false" schemaVersion="V1_8_0">
+                            <Metadata><Atom/></Metadata>
+                            <AdapterType kb="ROR" kxe="false">Server</AdapterType>
+                            <LocalPartitionID kb="CUR" kxe="false">{vios_id}</LocalPartitionID>
+                            <VirtualSlotNumber kb="COD" kxe="false">{server_slot}</VirtualSlotNumber>
+                            <RemoteLogicalPartitionID kb="CUR" kxe="false">{lpar_id}</RemoteLogicalPartitionID>
+                        </ServerAdapter>
+                        <Storage kb="CUR" kxe="false">
+                            <PhysicalVolume schemaVersion="V1_8_0">
+                                <Metadata><Atom/></Metadata>
+                                <VolumeCapacity kb="CUR" kxe="false">{capacity}</VolumeCapacity>
+                                <VolumeName kb="CUR" kxe="false">hdisk{disk}</VolumeName>
+                                <VolumeState kb="ROR" kxe="false">active</VolumeState>
+                                <VolumeUniqueID kb="ROR" kxe="false">{unique_id}</VolumeUniqueID>
+                            </PhysicalVolume>
+                        </Storage>
+                        <TargetDevice kb="CUR" kxe="false">
+                            <PhysicalVolumeVirtualTargetDevice schemaVersion="V1_8_0">
+                                <Metadata><Atom/></Metadata>
+                                <TargetName kb="CUR" kxe="false">vtscsi{disk}</TargetName>
+                            </PhysicalVolumeVirtualTargetDevice>
+                        </TargetDevice>
+                    </VirtualSCSIMapping>'''
+
+SCSI_VOD_MAPPING = '''                    <VirtualSCSIMapping schemaVersion="V1_8_0">
+                        <Metadata><Atom/></Metadata>
+                        <ClientAdapter kb="CUR" kxe="false" schemaVersion="V1_8_0">
+                            <Metadata><Atom/></Metadata>
+                            <LocalPartitionID kb="CUR" kxe="false">{lpar_id}</LocalPartitionID>
+                            <VirtualSlotNumber kb="COD" kxe="false">{client_slot}</VirtualSlotNumber>
+                            <RemoteLogicalPartitionID kb="CUR" kxe="false">{vios_id}</RemoteLogicalPartitionID>
+                            <RemoteSlotNumber kb="CUR" kxe="false">{server_slot}</RemoteSlotNumber>
+                        </ClientAdapter>
+                        <Storage kb="CUR" kxe="false">
+                            <VirtualOpticalMedia schemaVersion="V1_8_0">
+                                <Metadata><Atom/></Metadata>
+                                <MediaName kb="CUR" kxe="false">media{lpar_id}.iso</MediaName>
+                                <MountType kb="CUD" kxe="false">rw</MountType>
+                                <Size kb="CUR" kxe="false">4.0000</Size>
+                            </VirtualOpticalMedia>
+                        </Storage>
+                        <TargetDevice kb="CUR" kxe="false">
+                            <VirtualOpticalTargetDevice schemaVersion="V1_8_0">
+                                <Metadata><Atom/></Metadata>
+                                <TargetName kb="CUR" kxe="false">vtopt{lpar_id}</TargetName>
+                            </VirtualOpticalTargetDevice>
+                        </TargetDevice>
+                    </VirtualSCSIMapping>'''
+
+STALE_SCSI_MAPPING = '''                    <VirtualSCSIMapping schemaVersion="V1_8_0">
+                        <Metadata><Atom/></Metadata>
+                        <ServerAdapter kb="CUR" kxe="false" schemaVersion="V1_8_0">
+                            <Metadata><Atom/></Metadata>
+                            <LocalPartitionID kb="CUR" kxe="false">{vios_id}</LocalPartitionID>
+                        </ServerAdapter>
+                    </VirtualSCSIMapping>'''
+
+FC_MAPPING = '''                    <VirtualFibreChannelMapping schemaVersion="V1_8_0">
+                        <Metadata><Atom/></Metadata>
+                        <ClientAdapter kb="CUR" kxe="false" schemaVersion="V1_8_0">
+                            <Metadata><Atom/></Metadata>
+                            <LocalPartitionID kb="CUR" kxe="false">{lpar_id}</LocalPartitionID>
+                            <VirtualSlotNumber kb="COD" kxe="false">{client_slot}</VirtualSlotNumber>
+                            <ConnectingPartitionID kb="CUR" kxe="false">{vios_id}</ConnectingPartitionID>
+                            <ConnectingVirtualSlotNumber kb="CUR" kxe="false">{server_slot}</ConnectingVirtualSlotNumber>
+                            <WWPNs kb="CUR" kxe="false">c05076000000{lpar_id:04d} c05076000001{lpar_id:04d}</WWPNs>
+                        </ClientAdapter>
+                        <ServerAdapter kb="CUR" kxe="false" schemaVersion="V1_8_0">
+                            <Metadata><Atom/></Metadata>
+                            <PhysicalPort kb="CUR" kxe="false" schemaVersion="V1_8_0">
+                                <Metadata><Atom/></Metadata>
+                                <LocationCode kb="ROR" kxe="false">U78D3.001.WZS0001-P1-C{port}-T1</LocationCode>
+                                <PortName kb="CUR" kxe="false">fcs{port}</PortName>
+                            </PhysicalPort>
+                        </ServerAdapter>
+                    </VirtualFibreChannelMapping>'''
+
+
+def vios_scsi_feed(mappings, lpars=100, vios_ids=(1, 2)):
+    """
+    ViosSCSIMapping feed with mappings PV mappings spread over lpars client partitions.
+    Every volume is mapped through each VIOS (multipath), every partition also gets
+    a virtual optical device and each VIOS carries one stale mapping.
+    """
+    entries = []
+    for vios_id in vios_ids:
+        maps = []
+        for i in range(mappings // len(vios_ids)):
+            lpar_id = 10 + i % lpars
+            maps.append(SCSI_PV_MAPPING.format(lpar_id=lpar_id, vios_id=vios_id, client_slot=100 + i // lpars,
+                                               server_slot=1000 + i, capacity=10240 + i, disk=i, unique_id='3321360050768%08dFC' % i))
+        for lpar_id in range(10, 10 + lpars):
+            maps.append(SCSI_VOD_MAPPING.format(lpar_id=lpar_id, vios_id=vios_id, client_slot=2, server_slot=5000 + lpar_id))
+        maps.append(STALE_SCSI_MAPPING.format(vios_id=vios_id))
+        body = '''                <PartitionID kb="COD" kxe="false">{0}</PartitionID>
+                <PartitionName kb="CUR" kxe="false">vios{0}</PartitionName>
+                <VirtualSCSIMappings kb="CUD" kxe="false" schemaVersion="V1_8_0">
+                    <Metadata><Atom/></Metadata>
+{1}
+                </VirtualSCSIMappings>'''.format(vios_id, '\n'.join(maps))
+        entries.append(ENTRY.format(uuid='vios-uuid-%d' % vios_id, kind='VirtualIOServer', ns=UOM_NS, body=body))
+    return FEED.format(kind='VirtualIOServer', entries='\n'.join(entries)).encode('utf-8')
+
+
+def vios_fc_feed(mappings, lpars=100, vios_ids=(1, 2)):
+    """
+    ViosFCMapping feed with mappings NPIV mappings spread over lpars client partitions
+    """
+    entries = []
+    for vios_id in vios_ids:
+        maps = []
+        for i in range(mappings // len(vios_ids)):
+            lpar_id = 10 + i % lpars
+            maps.append(FC_MAPPING.format(lpar_id=lpar_id, vios_id=vios_id, client_slot=200 + i // lpars, server_slot=3000 + i, port=i % 4))
+        body = '''                <PartitionID kb="COD" kxe="false">{0}</PartitionID>
+                <PartitionName kb="CUR" kxe="false">vios{0}</PartitionName>
+                <VirtualFibreChannelMappings kb="CUD" kxe="false" schemaVersion="V1_8_0">
+                    <Metadata><Atom/></Metadata>
+{1}
+                </VirtualFibreChannelMappings>'''.format(vios_id, '\n'.join(maps))
+        entries.append(ENTRY.format(uuid='vios-uuid-%d' % vios_id, kind='VirtualIOServer', ns=UOM_NS, body=body))
+    return FEED.format(kind='VirtualIOServer', entries='\n'.join(entries)).encode('utf-8')
+
+
+def job_response(status='COMPLETED_OK', operation='PowerOn', results=''):
+    return '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<entry xmlns="http://www.w3.org/2005/Atom" xmlns:ns2="http://a9.com/-/spec/opensearch/1.1/" xmlns:ns3="http://www.w3.org/1999/xhtml">
+    <id>job-uuid</id>
+    <content type="application/vnd.ibm.powervm.web+xml; type=JobResponse">
+        <JobResponse:JobResponse xmlns:JobResponse="http://www.ibm.com/xmlns/systems/power/firmware/web/mc/2012_10/"
+         xmlns="http://www.ibm.com/xmlns/systems/power/firmware/web/mc/2012_10/" xmlns:ns2="http://www.w3.org/XML/1998/namespace/k2" schemaVersion="V1_0">
+            <Metadata><Atom/></Metadata>
+            <RequestURL kb="ROR" kxe="false" href="LogicalPartition/lpar-uuid/do/{operation}" rel="via" title="Job"/>
+            <TargetUuid kb="ROR" kxe="false">lpar-uuid</TargetUuid>
+            <JobID kb="ROR" kxe="false">1600000000001</JobID>
+            <TimeStarted kb="ROR" kxe="false">1600000000000</TimeStarted>
+            <Status kb="ROR" kxe="false">{status}</Status>
+            <JobRequestInstance kb="ROR" kxe="false" schemaVersion="V1_0">
+                <Metadata><Atom/></Metadata>
+                <RequestedOperation kb="CUR" kxe="false" schemaVersion="V1_0">
+                    <Metadata><Atom/></Metadata>
+                    <OperationName kb="ROR" kxe="false">{operation}</OperationName>
+                    <GroupName kb="ROR" kxe="false">LogicalPartition</GroupName>
+                </RequestedOperation>
+            </JobRequestInstance>
+            <Results kb="ROR" kxe="false" schemaVersion="V1_0">
+                <Metadata><Atom/></Metadata>
+{results}
+            </Results>
+        </JobResponse:JobResponse>
+    </content>
+</entry>'''.format(status=status, operation=operation, results=results).encode('utf-8')
+
+
+GROUP_ENTRY = '''    <entry>
+        <id>{uuid}</id>
+        <content type="application/vnd.ibm.powervm.uom+xml; type=Group">
+            <Group:Group xmlns:Group="{ns}" xmlns="{ns}" xmlns:ns2="http://www.w3.org/XML/1998/namespace/k2" schemaVersion="V1_8_0">
+                <Metadata><Atom><AtomID>{uuid}</AtomID></Atom></Metadata>
+                <GroupName kb="CUR" kxe="false">{name}</GroupName>
+                <AssociatedLogicalPartitions kb="CUR" kxe="false">
+{lpars}
+                </AssociatedLogicalPartitions>
+                <AssociatedManagedSystems kb="CUR" kxe="false">
+{systems}
+                </AssociatedManagedSystems>
+                <AssociatedVirtualIOServers kb="CUR" kxe="false">
+{vioses}
+                </AssociatedVirtualIOServers>
+            </Group:Group>
+        </content>
+    </entry>'''
+
+GROUP_LINK = '''                    <link href="https://hmc:443/rest/api/uom/{kind}/{uuid}" rel="related"/>'''
+
+
+def group_feed(groups, members):
+    """
+    Group feed of tagged groups, where members maps a group name to the uuids of the
+    partitions, systems and VIOSes ('lpar', 'ms' and 'vios' keys) it holds.
+    """
+    entries = []
+    for i, name in enumerate(groups):
+        links = {}
+        for key, kind in (('lpar', 'LogicalPartition'), ('ms', 'ManagedSystem'), ('vios', 'VirtualIOServer')):
+            links[key] = '\n'.join(GROUP_LINK.format(kind=kind, uuid=uuid) for uuid in members.get(name, {}).get(key, []))
+        entries.append(GROUP_ENTRY.format(uuid='group-uuid-%d' % i, ns=UOM_NS, name=name, lpars=links['lpar'],
+                                          systems=links['ms'], vioses=links['vios']))
+    return FEED.format(kind='Group', entries='\n'.join(entries)).encode('utf-8')
+
+
+FREE_PV = '''<PhysicalVolume schemaVersion="V1_0">
+    <Metadata><Atom/></Metadata>
+    <Description kb="CUD" kxe="false">MPIO IBM 2076 FC Disk</Description>
+    <ReservePolicy kb="CUD" kxe="false">{policy}</ReservePolicy>
+    <UniqueDeviceID kb="ROR" kxe="false">{udid}</UniqueDeviceID>
+    <AvailableForUsage kb="CUD" kxe="false">{available}</AvailableForUsage>
+    <VolumeCapacity kb="CUR" kxe="false">{capacity}</VolumeCapacity>
+    <VolumeName kb="CUR" kxe="false">hdisk{disk}</VolumeName>
+    <VolumeState kb="ROR" kxe="false">active</VolumeState>
+</PhysicalVolume>'''
+
+
+def vios_pvs(vios_id, pvs, shared, in_use=()):
+    """
+    Physical volumes seen by a VIOS: the first shared ones are visible by every VIOS
+    (multipath, NoReserve), the others only by this VIOS (SinglePath). Volumes listed
+    in in_use are reported as not available for usage.
+    """
+    volumes = []
+    for i in range(pvs):
+        udid = '01M0lCTTIxNDUxMjQ2MDA1MDc2ODAyODEwMDAwMDAwMDAw%04d' % i if i < shared else '01M0lCTTIxNDUxMjQ2%04d%08d' % (vios_id, i)
+        volumes.append(FREE_PV.format(policy='NoReserve' if i < shared else 'SinglePath', udid=udid,
+                                      available='false' if i in in_use else 'true', capacity=10240 + (i * 7919) % 4096, disk=i))
+    return volumes
+
+
+def free_pvs_job_response(vios_id, pvs, shared):
+    """
+    Completed GetFreePhysicalVolumes job of a VIOS, the free volumes being returned
+    as an escaped document in the result parameter
+    """
+    free_pvs = '<PhysicalVolumes>{0}</PhysicalVolumes>'.format(''.join(vios_pvs(vios_id, pvs, shared)))
+    results = '''                <JobParameter schemaVersion="V1_0">
+                    <Metadata><Atom/></Metadata>
+                    <ParameterName kb="ROR" kxe="false">result</ParameterName>
+                    <ParameterValue kb="ROR" kxe="false">{0}</ParameterValue>
+                </JobParameter>'''.format(escape(free_pvs))
+    return job_response(operation='GetFreePhysicalVolumes', results=results)
+
+
+def vios_storage(vios_id, pvs, shared, in_use=()):
+    """
+    VirtualIOServer entry of the ViosStorage group listing every PV of the VIOS
+    """
+    body = '''                <MoverServicePartition kb="CUD" kxe="false">false</MoverServicePartition>
+                <PhysicalVolumes kb="CUD" kxe="false" schemaVersion="V1_0">
+                    <Metadata><Atom/></Metadata>
+{0}
+                </PhysicalVolumes>'''.format('\n'.join(vios_pvs(vios_id, pvs, shared, in_use)))
+    return ENTRY.format(uuid='vios-uuid-%d' % vios_id, kind='VirtualIOServer', ns=UOM_NS, body=body).encode('utf-8')
+
+
+LPAR_BODY = '''                <PartitionName kb="CUR" kxe="false">{name}</PartitionName>
+                <PartitionMemoryConfiguration kb="CUD" kxe="false" schemaVersion="V1_8_0">
+                    <Metadata><Atom/></Metadata>
+                    <CurrentMemory kb="ROO" kxe="false">{mem}</CurrentMemory>
+                    <DesiredMemory kb="CUD" kxe="false">{mem}</DesiredMemory>
+                </PartitionMemoryConfiguration>'''
+
+
+def lpar_feed(lpars):
+    """
+    LogicalPartition feed with one entry per (uuid, partition name, memory in MB) tuple of lpars.
+    """
+    entries = [ENTRY.format(uuid=uuid, kind='LogicalPartition', ns=UOM_NS, body=LPAR_BODY.format(name=name, mem=mem))
+               for uuid, name, mem in lpars]
+    return FEED.format(kind='LogicalPartition', entries='\n'.join(entries))
+
+
+EVENT = '''                <EventType kb="ROO" kxe="false">{event_type}</EventType>
+                <EventID kb="ROO" kxe="false">{event_id}</EventID>
+                <EventData kb="ROO" kxe="false">{data}</EventData>
+                <EventDetail kb="ROO" kxe="false">{detail}</EventDetail>'''
+
+
+def event_feed(events):
+    """
+    Event feed holding one entry per (event type, changed uri, detail) tuple of events.
+    """
+    entries = []
+    for i, (event_type, data, detail) in enumerate(events):
+        body = EVENT.format(event_type=event_type, event_id=i, data=escape(data), detail=detail)
+        entries.append(ENTRY.format(uuid='event-uuid-%d' % i, kind='Event', ns=UOM_NS, body=body))
+    return FEED.format(kind='Event', entries='\n'.join(entries))
@@ -0,0 +1,86 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import pytest
+import importlib
+
+IMPORT_HMC_CLI_CLIENT = "ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_cli_client"
+
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
+
+
+def common_mock_setup(mocker, tmp_path, results):
+    hmc_cli_client = importlib.import_module(IMPORT_HMC_CLI_CLIENT)
+    mocker.patch.object(hmc_cli_client, 'SSH_CONTROL_DIR', str(tmp_path))
+    module = mocker.Mock()
+    module.run_command.side_effect = results
+    return hmc_cli_client, module
+
+
+def test_commands_share_a_multiplexed_connection(mocker, tmp_path, monkeypatch):
+    monkeypatch.setenv('ANSIBLE_POWER_HMC_SSH_CONTROL_PERSIST', '60')
+    hmc_cli_client, module = common_mock_setup(mocker, tmp_path, [(0, 'V10R2', ''), (0, 'V10R2', '')])
+    conn = hmc_cli_client.HmcCliConnection(module, '0.0.0.0', 'hscroot', 'password')
+    assert conn.execute('lshmc -V') == 'V10R2'
+    ssh_cmd = module.run_command.call_args[0][0]
+    assert "-o ControlMaster=auto -o ControlPath='{0}' -o ControlPersist=60s".format(conn.control_path) in ssh_cmd
+    assert conn.control_path.startswith(str(tmp_path))
+
+    # a live master connection leaves its socket at the control path
+    open(conn.control_path, 'w').close()
+    conn.execute('lshmc -V')
+    assert [(timing['cmd'], timing['reused']) for timing in conn.command_timings] == [('lshmc', False), ('lshmc', True)]
+
+
+@pytest.mark.parametrize("control_persist", [None, '0', 'false'])
+def test_multiplexing_disabled(mocker, tmp_path, monkeypatch, control_persist):
+    if control_persist is None:
+        monkeypatch.delenv('ANSIBLE_POWER_HMC_SSH_CONTROL_PERSIST', raising=False)
+    else:
+        monkeypatch.setenv('ANSIBLE_POWER_HMC_SSH_CONTROL_PERSIST', control_persist)
+    hmc_cli_client, module = common_mock_setup(mocker, tmp_path, [(3, 'lshmc failed', '')])
+    conn = hmc_cli_client.HmcCliConnection(module, '0.0.0.0', 'hscroot', 'password')
+    with pytest.raises(HmcError):
+        conn.execute('lshmc -V')
+    assert 'Control' not in module.run_command.call_args[0][0]
+    assert conn.control_path is None
+
+
+def test_multiplexing_refuses_shared_socket_directory(mocker, tmp_path):
+    hmc_cli_client, module = common_mock_setup(mocker, tmp_path, [(0, 'V10R2', '')])
+    tmp_path.chmod(0o777)
+    conn = hmc_cli_client.HmcCliConnection(module, '0.0.0.0', 'hscroot', 'password', control_persist=60)
+    tmp_path.chmod(0o700)
+    conn.execute('lshmc -V')
+    assert 'Control' not in module.run_command.call_args[0][0]
+    assert conn.control_path is None
+
+
+def batch_output(*results):
+    hmc_cli_client = importlib.import_module(IMPORT_HMC_CLI_CLIENT)
+    return ''.join('{0}{1}{2}\n'.format(output, hmc_cli_client.BATCH_DELIMITER, rc) for rc, output in results)
+
+
+def test_execute_batch_splits_per_command_results(mocker, tmp_path):
+    stdout = batch_output((0, 'name=lpar1,lpar_id=1\n'), (0, 'name=default_profile'), (1, 'HSCL8012 The profile does not exist\n'))
+    hmc_cli_client, module = common_mock_setup(mocker, tmp_path, [(0, stdout, ''), (0, stdout, '')])
+    conn = hmc_cli_client.HmcCliConnection(module, '0.0.0.0', 'hscroot', 'password', control_persist=0)
+    cmds = ['lssyscfg -r lpar -m sys', 'lssyscfg -r prof -m sys', 'lssyscfg -r prof -m sys --filter "profile_names=p2"']
+    results = conn.execute_batch(cmds, raise_on_error=False)
+    assert results == [(0, 'name=lpar1,lpar_id=1\n'), (0, 'name=default_profile'), (1, 'HSCL8012 The profile does not exist\n')]
+    assert module.run_command.call_count == 1
+    remote_cmd = module.run_command.call_args[0][0]
+    assert 'lssyscfg -r prof -m sys --filter "profile_names=p2" 2>&1; echo "{0}$?";'.format(hmc_cli_client.BATCH_DELIMITER) in remote_cmd
+    assert conn.command_timings[0]['cmd'] == 'lssyscfg,lssyscfg,lssyscfg'
+
+    with pytest.raises(HmcError) as e:
+        conn.execute_batch(cmds)
+    assert e.value.message == 'HSCL8012 The profile does not exist'
+
+
+def test_execute_batch_raises_when_ssh_fails(mocker, tmp_path):
+    hmc_cli_client, module = common_mock_setup(mocker, tmp_path, [(5, '', 'Permission denied, please try again.\n')])
+    conn = hmc_cli_client.HmcCliConnection(module, '0.0.0.0', 'hscroot', 'password', control_persist=0)
+    with pytest.raises(HmcError) as e:
+        conn.execute_batch(['lshmc -V', 'lshmc -n'])
+    assert e.value.message == 'Permission denied, please try again.'
@@ -0,0 +1,51 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_command_stack import HmcCommandStack
+
+from hmc_cli_outputs import CORPUS
+
+
+@pytest.mark.parametrize("command, output, attr_counts, expected", CORPUS, ids=[entry[0].split(' -m')[0] for entry in CORPUS])
+def test_parse_command_outputs(command, output, attr_counts, expected):
+    records = HmcCommandStack().parseMultiLineCSV(output)
+    assert [len(record) for record in records] == attr_counts
+    for record, expected_attrs in zip(records, expected):
+        assert dict((key, record[key]) for key in expected_attrs) == expected_attrs
+
+
+@pytest.mark.parametrize("line, expected", [
+    ('name=lpar1,"description=a ""quoted"" word",lpar_id=5', {'NAME': 'lpar1', 'DESCRIPTION': 'a "quoted" word', 'LPAR_ID': '5'}),
+    ('name=lpar1,"records=a=1: b=2,a=3: b=4"', {'NAME': 'lpar1', 'RECORDS': [{'A': '1', 'B': '2'}, {'A': '3', 'B': '4'}]}),
+    ('name=lpar1,"description=Note: see the manual"', {'NAME': 'lpar1', 'DESCRIPTION': 'Note: see the manual'}),
+    ('name=lpar1,"description=not terminated, at all', {'NAME': 'lpar1', 'DESCRIPTION': 'not terminated, at all'}),
+    ('name=lpar1,io_slots=21010010/none/1,21010011/none/0\r\n', {'NAME': 'lpar1', 'IO_SLOTS': '21010010/none/1,21010011/none/0'}),
+    ('', {}),
+])
+def test_parse_csv_edge_cases(line, expected):
+    assert HmcCommandStack().parseCSV(line) == expected
+
+
+def test_iter_records_parses_lines_lazily():
+    def lines():
+        yield 'name=lpar1,lpar_id=1\n'
+        yield '\n'
+        yield 'name=lpar2,lpar_id=2\r\n'
+        raise AssertionError('read past the matching record')
+
+    records = HmcCommandStack().iter_records(lines())
+    assert next(record for record in records if record['NAME'] == 'lpar2') == {'NAME': 'lpar2', 'LPAR_ID': '2'}
+    assert list(HmcCommandStack().iter_records(['lpar1,1\n'], {'-F': 'name,lpar_id'})) == [{'name': 'lpar1', 'lpar_id': '1'}]
+
+
+@pytest.mark.parametrize("fields, output, expected", [
+    (['state'], 'Power Off\n', {'state': 'Power Off'}),
+    (['name', 'lpar_proc_compat_modes', 'refcode'], 'sys1,"default,POWER8",\n',
+     {'name': 'sys1', 'lpar_proc_compat_modes': 'default,POWER8', 'refcode': ''}),
+])
+def test_parse_projected_fields(fields, output, expected):
+    command_stack = HmcCommandStack()
+    assert command_stack.fieldsBuilder('LSSYSCFG', fields) == ' -F ' + ','.join(fields)
+    assert command_stack.parseCSV(output, {'-F': ','.join(fields)}) == expected
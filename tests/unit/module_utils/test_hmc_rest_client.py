@@ -0,0 +1,534 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import pytest
+import importlib
+import threading
+import time
+
+from lxml import etree, objectify
+
+import hmc_feeds
+
+IMPORT_HMC_REST_CLIENT = "ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client"
+
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
+
+JOB_XML = '''<JobResponse xmlns="http://www.ibm.com/xmlns/systems/power/firmware/web/mc/2012_10/">
+<Status>{0}</Status>
+<JobRequestInstance><RequestedOperation><OperationName>PowerOn</OperationName></RequestedOperation></JobRequestInstance>
+</JobResponse>'''
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+
+    def __init__(self, body, code=200):
+        self.body = body
+        self.code = code
+
+    def read(self):
+        return self.body.encode()
+
+
+def common_mock_setup(mocker, statuses):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    mocker.patch.object(hmc_rest_client.HmcRestClient, 'logon', return_value='session')
+    responses = [FakeResponse(JOB_XML.format(status)) for status in statuses]
+    mocker.patch.object(hmc_rest_client, 'open_url', side_effect=responses)
+    return hmc_rest_client
+
+
+def test_poller_schedule_backs_off_to_cap():
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    poller = hmc_rest_client.JobPoller(initial_interval=1, max_interval=10, backoff_factor=3)
+    intervals = poller.intervals()
+    assert [next(intervals) for i in range(5)] == [1, 3, 9, 10, 10]
+
+
+@pytest.mark.parametrize("job_poll, expectedError", [
+    ({'initial_interval': 0}, "ParameterError: job_poll initial_interval must be greater than 0"),
+    ({'initial_interval': 40}, "ParameterError: job_poll max_interval must be greater than or equal to initial_interval"),
+    ({'backoff_factor': 0.5}, "ParameterError: job_poll backoff_factor must be greater than or equal to 1")])
+def test_poller_invalid_params(job_poll, expectedError):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    with pytest.raises(ParameterError) as e:
+        hmc_rest_client.JobPoller.from_params(job_poll)
+    assert expectedError == repr(e.value)
+
+
+def test_fetch_job_status_polls_on_schedule(mocker):
+    hmc_rest_client = common_mock_setup(mocker, ['RUNNING', 'RUNNING', 'COMPLETED_OK'])
+    clock = FakeClock()
+    rest_conn = hmc_rest_client.HmcRestClient('0.0.0.0', 'hscroot', 'password', keep_alive=False,
+                                              job_poll=hmc_rest_client.JobPoller(clock=clock))
+    doc = rest_conn.fetchJobStatus('1234')
+    assert doc.xpath('//Status')[0].text == 'COMPLETED_OK'
+    assert clock.sleeps == [2, 4, 8]
+
+
+def test_fetch_job_status_times_out(mocker):
+    hmc_rest_client = common_mock_setup(mocker, ['RUNNING'] * 10)
+    clock = FakeClock()
+    poll = hmc_rest_client.JobPoller(initial_interval=30, max_interval=60, clock=clock)
+    rest_conn = hmc_rest_client.HmcRestClient('0.0.0.0', 'hscroot', 'password', keep_alive=False)
+    with pytest.raises(HmcError) as e:
+        rest_conn.fetchJobStatus('1234', timeout_in_min=2, poll=poll)
+    assert "Job: PowerOn timed out!!" == e.value.message
+    assert clock.sleeps == [30, 60, 30]
+
+
+class FakeHTTPResponse:
+
+    def __init__(self, status, body, will_close=False):
+        self.status = status
+        self.reason = 'reason'
+        self.msg = {}
+        self.body = body
+        self.will_close = will_close
+
+    def read(self):
+        return self.body
+
+
+class FakeHTTPSConnection:
+
+    created = []
+
+    def __init__(self, host, timeout=None, context=None):
+        self.host = host
+        self.sock = None
+        self.requests = []
+        self.closed = False
+        FakeHTTPSConnection.created.append(self)
+
+    def request(self, method, path, body=None, headers=None):
+        self.requests.append((method, path))
+
+    def getresponse(self):
+        if self.requests[-1][1].endswith('missing'):
+            return FakeHTTPResponse(404, b'')
+        return FakeHTTPResponse(200, b'<ok/>')
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_reuses_connection(mocker):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    FakeHTTPSConnection.created = []
+    mocker.patch.object(hmc_rest_client.http_client, 'HTTPSConnection', FakeHTTPSConnection)
+    mocker.patch.object(hmc_rest_client.HmcRestClient, 'logon', return_value='session')
+    rest_conn = hmc_rest_client.HmcRestClient('0.0.0.0', 'hscroot', 'password', keep_alive=True)
+    for i in range(3):
+        resp = rest_conn._open_url('https://0.0.0.0/rest/api/uom/ManagedSystem/quick/All', headers={})
+        assert resp.code == 200 and resp.read() == b'<ok/>'
+    assert len(FakeHTTPSConnection.created) == 1
+    assert len(FakeHTTPSConnection.created[0].requests) == 3
+    assert [timing['method'] for timing in rest_conn.request_timings] == ['GET', 'GET', 'GET']
+
+
+def test_pool_raises_http_error(mocker):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    mocker.patch.object(hmc_rest_client.http_client, 'HTTPSConnection', FakeHTTPSConnection)
+    pool = hmc_rest_client.HmcConnectionPool('0.0.0.0')
+    with pytest.raises(hmc_rest_client.urllib_error.HTTPError) as e:
+        pool.request('https://0.0.0.0/rest/api/uom/missing')
+    assert e.value.code == 404
+
+
+class DroppedHTTPSConnection(FakeHTTPSConnection):
+    """Connection the HMC closes while its answer is awaited, like an idle keep-alive connection"""
+
+    def getresponse(self):
+        raise importlib.import_module(IMPORT_HMC_REST_CLIENT).http_client.RemoteDisconnected('closed')
+
+
+@pytest.mark.parametrize("method, replayed", [('GET', True), ('DELETE', True), ('PUT', False), ('POST', False)])
+def test_pool_replays_only_idempotent_requests(mocker, method, replayed):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    FakeHTTPSConnection.created = []
+    mocker.patch.object(hmc_rest_client.http_client, 'HTTPSConnection', FakeHTTPSConnection)
+    pool = hmc_rest_client.HmcConnectionPool('0.0.0.0')
+    stale = DroppedHTTPSConnection('0.0.0.0')
+    pool._idle.append(stale)
+    if replayed:
+        assert pool.request('https://0.0.0.0/rest/api/uom/Job', method=method).code == 200
+        assert len(FakeHTTPSConnection.created) == 2
+    else:
+        with pytest.raises(hmc_rest_client.http_client.RemoteDisconnected):
+            pool.request('https://0.0.0.0/rest/api/uom/Job', method=method, data='<job/>')
+        assert FakeHTTPSConnection.created == [stale]
+    assert stale.closed and stale.requests == [(method, '/rest/api/uom/Job')]
+
+
+def test_session_cache_expires(tmp_path):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    clock = FakeClock()
+    cache = hmc_rest_client.HmcSessionCache(60, directory=str(tmp_path), clock=clock)
+    assert cache.load('0.0.0.0', 'hscroot') is None
+    cache.store('0.0.0.0', 'hscroot', 'session1')
+    assert cache.load('0.0.0.0', 'hscroot') == 'session1'
+    assert cache.load('0.0.0.0', 'hmcuser') is None
+    clock.now = 60
+    assert cache.load('0.0.0.0', 'hscroot') is None
+
+
+def test_cached_session_relogon_on_401(mocker, tmp_path):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    cache = hmc_rest_client.HmcSessionCache(600, directory=str(tmp_path))
+    cache.store('0.0.0.0', 'hscroot', 'stale')
+    mocker.patch.object(hmc_rest_client, 'HmcSessionCache', return_value=cache)
+    logon = mocker.patch.object(hmc_rest_client.HmcRestClient, 'logon', return_value='fresh')
+    expired = hmc_rest_client.urllib_error.HTTPError('url', 401, 'Unauthorized', {}, None)
+    open_url = mocker.patch.object(hmc_rest_client, 'open_url', side_effect=[expired, FakeResponse('<ok/>')])
+
+    rest_conn = hmc_rest_client.HmcRestClient('0.0.0.0', 'hscroot', 'password', keep_alive=False, session_cache_ttl=600)
+    assert rest_conn.session == 'stale' and not logon.called
+    rest_conn.generic_get('https://0.0.0.0/rest/api/uom/ManagedSystem')
+    assert rest_conn.session == 'fresh'
+    assert open_url.call_args[1]['headers']['X-API-Session'] == 'fresh'
+    assert cache.load('0.0.0.0', 'hscroot') == 'fresh'
+
+    rest_conn.logoff()
+    assert open_url.call_count == 2
+
+
+def test_forks_on_a_cold_cache_log_on_once(mocker, tmp_path):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    cache = hmc_rest_client.HmcSessionCache(600, directory=str(tmp_path))
+    mocker.patch.object(hmc_rest_client, 'HmcSessionCache', return_value=cache)
+    sessions = iter(['session1', 'session2'])
+
+    def logon(self):
+        time.sleep(0.05)
+        return next(sessions)
+    mocker.patch.object(hmc_rest_client.HmcRestClient, 'logon', autospec=True, side_effect=logon)
+    clients = []
+
+    def start():
+        clients.append(hmc_rest_client.HmcRestClient('0.0.0.0', 'hscroot', 'password', keep_alive=False, session_cache_ttl=600))
+    threads = [threading.Thread(target=start) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(client.session for client in clients) == ['session1', 'session1']
+    assert hmc_rest_client.HmcRestClient.logon.call_count == 1
+
+
+@pytest.mark.parametrize("ttl", ['ten', '1.5'])
+def test_session_cache_ttl_must_be_seconds(mocker, monkeypatch, ttl):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    monkeypatch.setenv('ANSIBLE_POWER_HMC_SESSION_CACHE_TTL', ttl)
+    logon = mocker.patch.object(hmc_rest_client.HmcRestClient, 'logon', return_value='session')
+    with pytest.raises(ParameterError, match="ANSIBLE_POWER_HMC_SESSION_CACHE_TTL must be a number of seconds, not '{0}'".format(ttl)):
+        hmc_rest_client.HmcRestClient('0.0.0.0', 'hscroot', 'password', keep_alive=False)
+    assert not logon.called
+
+
+def test_session_cache_ignores_shared_directory(tmp_path):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    cache = hmc_rest_client.HmcSessionCache(600, directory=str(tmp_path))
+    cache.store('0.0.0.0', 'hscroot', 'session1')
+    assert cache.load('0.0.0.0', 'hscroot') == 'session1'
+    tmp_path.chmod(0o777)
+    assert cache.load('0.0.0.0', 'hscroot') is None
+    cache.store('0.0.0.0', 'hmcuser', 'session2')
+    tmp_path.chmod(0o700)
+    assert cache.load('0.0.0.0', 'hmcuser') is None
+
+
+def test_renewed_session_replayed_without_second_logon(mocker, tmp_path):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    cache = hmc_rest_client.HmcSessionCache(600, directory=str(tmp_path))
+    cache.store('0.0.0.0', 'hscroot', 'stale')
+    mocker.patch.object(hmc_rest_client, 'HmcSessionCache', return_value=cache)
+    logon = mocker.patch.object(hmc_rest_client.HmcRestClient, 'logon', return_value='fresh')
+    expired = hmc_rest_client.urllib_error.HTTPError('url', 401, 'Unauthorized', {}, None)
+    open_url = mocker.patch.object(hmc_rest_client, 'open_url', side_effect=[expired, FakeResponse('<ok/>'), expired, FakeResponse('<ok/>')])
+
+    rest_conn = hmc_rest_client.HmcRestClient('0.0.0.0', 'hscroot', 'password', keep_alive=False, session_cache_ttl=600)
+    rest_conn.generic_get('https://0.0.0.0/rest/api/uom/ManagedSystem')
+    # a request another thread sent with the stale session before the renewal
+    rest_conn._open_url('https://0.0.0.0/rest/api/uom/ManagedSystem', headers={'X-API-Session': 'stale'})
+    assert logon.call_count == 1
+    assert open_url.call_args[1]['headers']['X-API-Session'] == 'fresh'
+
+
+def tree_xml_strip_namespace(xml_str):
+    # reference implementation renaming the tags of the parsed tree
+    root = etree.fromstring(xml_str, etree.XMLParser(recover=True, encoding='utf-8'))
+    for elem in root.iter(etree.Element):
+        elem.tag = etree.QName(elem).localname
+    objectify.deannotate(root, cleanup_namespaces=True)
+    return root
+
+
+@pytest.mark.parametrize("xml", [
+    hmc_feeds.job_response(),
+    hmc_feeds.vios_scsi_feed(20, lpars=4),
+    hmc_feeds.vios_fc_feed(20, lpars=4),
+    b'<a:root xmlns:a="urn:a" xmlns:b="urn:b"><a:child b:attr="1">text</a:child><b:child/></a:root>',
+    b'<root xmlns="urn:a"><child xml:lang="en"><![CDATA[<x:y>]]></child></root>',
+    b'<root xmlns="urn:a"><Desc>value with xmlns="x" text</Desc><Desc>xmlns:a=\'y\' a:b</Desc></root>',
+    b'<a:root xmlns:a="urn:a"><a:Desc><![CDATA[<a:x xmlns:a="z"> xmlns="x"]]></a:Desc><!-- <a:y xmlns="x"> --></a:root>',
+    b'<a:root xmlns:a="urn:a" attr="a > b xmlns=\'x\'"><a:child/></a:root>'])
+def test_xml_strip_namespace(xml):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    assert etree.tostring(hmc_rest_client.xml_strip_namespace(xml)) == etree.tostring(tree_xml_strip_namespace(xml))
+    assert etree.tostring(hmc_rest_client.xml_strip_namespace(xml.decode())) == etree.tostring(tree_xml_strip_namespace(xml))
+
+
+def test_xml_strip_namespace_keeps_text():
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    root = hmc_rest_client.xml_strip_namespace(
+        b'<a:root xmlns:a="urn:a"><a:Desc>value with xmlns="x" text</a:Desc><a:Data><![CDATA[<a:x xmlns:a="z">]]></a:Data></a:root>')
+    assert root.tag == 'root'
+    assert root.findtext('Desc') == 'value with xmlns="x" text'
+    assert root.findtext('Data') == '<a:x xmlns:a="z">'
+
+
+def vios_mapping_client(mocker, feed):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    mocker.patch.object(hmc_rest_client.HmcRestClient, 'logon', return_value='session')
+    mocker.patch.object(hmc_rest_client.HmcRestClient, 'getVirtualIOServers', return_value=feed)
+    return hmc_rest_client.HmcRestClient('0.0.0.0', 'hscroot', 'password', keep_alive=False)
+
+
+VIOS_LIST = [{'PartitionID': 1, 'PartitionName': 'vios1'}, {'PartitionID': 2, 'PartitionName': 'vios2'}]
+
+
+def test_fetch_scsi_details_from_vios(mocker):
+    rest_conn = vios_mapping_client(mocker, hmc_feeds.vios_scsi_feed(20, lpars=4))
+    vscsis = rest_conn.fetchSCSIDetailsFromVIOS('ms-uuid', 10, VIOS_LIST)
+    assert [vscsi.get('VolumeUniqueID', vscsi.get('TargetName')) for vscsi in vscsis] == \
+        ['332136005076800000000FC', '332136005076800000004FC', '332136005076800000008FC', 'vtopt10', 'vtopt10']
+    assert vscsis[1] == {'VolumeUniqueID': '332136005076800000004FC',
+                         'Volume': [{'vios': 'vios1', 'name': 'hdisk4'}, {'vios': 'vios2', 'name': 'hdisk4'}],
+                         'ClientVirtualSlotNumber': '101', 'ServerVirtualSlotNumber': '1004',
+                         'TargetDeviceName': 'vtscsi4', 'VolumeCapacity': '10244'}
+    assert vscsis[4] == {'ClientVirtualSlotNumber': '2', 'ServerVirtualSlotNumber': '5010', 'TargetName': 'vtopt10',
+                         'MediaName': 'media10.iso', 'MountType': 'rw', 'Size': '4.0000'}
+
+
+def test_fetch_scsi_details_leaves_index_untouched(mocker):
+    rest_conn = vios_mapping_client(mocker, hmc_feeds.vios_scsi_feed(20, lpars=4))
+    vscsis = rest_conn.fetchSCSIDetailsFromVIOS('ms-uuid', 10, VIOS_LIST)
+    vscsis[1]['Volume'].append({'vios': 'vios3', 'name': 'hdisk9'})
+    vscsis[1]['VolumeCapacity'] = '0'
+    del vscsis[0]
+    assert rest_conn.fetchSCSIDetailsFromVIOS('ms-uuid', 10, VIOS_LIST)[1] == \
+        {'VolumeUniqueID': '332136005076800000004FC',
+         'Volume': [{'vios': 'vios1', 'name': 'hdisk4'}, {'vios': 'vios2', 'name': 'hdisk4'}],
+         'ClientVirtualSlotNumber': '101', 'ServerVirtualSlotNumber': '1004',
+         'TargetDeviceName': 'vtscsi4', 'VolumeCapacity': '10244'}
+    assert rest_conn.getVirtualIOServers.call_count == 1
+
+
+def test_fetch_fc_details_from_vios(mocker):
+    rest_conn = vios_mapping_client(mocker, hmc_feeds.vios_fc_feed(8, lpars=2))
+    vfcs = rest_conn.fetchFCDetailsFromVIOS('ms-uuid', 11, VIOS_LIST)
+    assert [(vfc['vios'], vfc['ServerVirtualSlotNumber']) for vfc in vfcs] == \
+        [('vios1', '3001'), ('vios1', '3003'), ('vios2', '3001'), ('vios2', '3003')]
+    assert vfcs[0] == {'PortName': 'fcs1', 'vios': 'vios1', 'LocationCode': 'U78D3.001.WZS0001-P1-C1-T1',
+                       'WWPNs': 'c050760000000011 c050760000010011', 'ClientVirtualSlotNumber': '200',
+                       'ServerVirtualSlotNumber': '3001'}
+
+
+def test_fetch_tagged_group_membership(mocker):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    mocker.patch.object(hmc_rest_client.HmcRestClient, 'logon', return_value='session')
+    members = {'prod': {'lpar': ['l1', 'l2'], 'ms': ['m1'], 'vios': ['v1']}, 'db': {'lpar': ['l2'], 'ms': ['m1']}}
+    feed = hmc_feeds.group_feed(['prod', 'empty', 'db'], members)
+    mocker.patch.object(hmc_rest_client, 'open_url', side_effect=lambda *args, **kwargs: FakeResponse(feed.decode()))
+    rest_conn = hmc_rest_client.HmcRestClient('0.0.0.0', 'hscroot', 'password', keep_alive=False)
+    assert rest_conn.fetchTaggedGroupMembership() == {'l1': ['prod'], 'l2': ['prod', 'db'], 'm1': ['prod', 'db'], 'v1': ['prod']}
+
+
+def test_scsi_index_answers_every_partition_from_one_feed(mocker):
+    rest_conn = vios_mapping_client(mocker, hmc_feeds.vios_scsi_feed(40, lpars=4))
+    scsi_index = rest_conn.fetchSCSIIndexFromVIOS('ms-uuid', VIOS_LIST)
+    assert sorted(scsi_index) == ['10', '11', '12', '13']
+    for lpar_id in range(10, 14):
+        vscsis = rest_conn.fetchSCSIDetailsFromVIOS('ms-uuid', lpar_id, VIOS_LIST)
+        assert vscsis == scsi_index[str(lpar_id)]
+        assert [len(vscsi['Volume']) for vscsi in vscsis if 'Volume' in vscsi] == [2] * 5
+    assert rest_conn.fetchSCSIDetailsFromVIOS('ms-uuid', 99, VIOS_LIST) == []
+    assert rest_conn.getVirtualIOServers.call_count == 1
+
+    mocker.patch.object(rest_conn, '_open_url', return_value=FakeResponse('<ok/>'))
+    rest_conn.updateVirtualIOServer(etree.fromstring('<VirtualIOServer><AtomID>vios-uuid-1</AtomID></VirtualIOServer>'))
+    rest_conn.fetchSCSIDetailsFromVIOS('ms-uuid', 10, VIOS_LIST)
+    assert rest_conn.getVirtualIOServers.call_count == 2
+
+
+def test_scsi_index_skips_mappings_it_cannot_read(mocker):
+    expected = vios_mapping_client(mocker, hmc_feeds.vios_scsi_feed(8, lpars=2)).fetchSCSIIndexFromVIOS('ms-uuid', VIOS_LIST)
+    # mappings served by a VIOS missing from the list come first in the feed
+    rest_conn = vios_mapping_client(mocker, hmc_feeds.vios_scsi_feed(12, lpars=2, vios_ids=(3, 1, 2)))
+    scsi_index = rest_conn.fetchSCSIIndexFromVIOS('ms-uuid', VIOS_LIST)
+    assert sorted(scsi_index) == ['10', '11']
+    for lpar_id in scsi_index:
+        assert [vscsi for vscsi in scsi_index[lpar_id] if 'Volume' in vscsi] == [vscsi for vscsi in expected[lpar_id] if 'Volume' in vscsi]
+    rest_conn.fetchSCSIIndexFromVIOS('ms-uuid', VIOS_LIST)
+    assert rest_conn.getVirtualIOServers.call_count == 1
+
+
+class FakeJobs:
+    """Serves the status of fake HMC jobs, each job being RUNNING for a number of checks before its final status"""
+
+    def __init__(self, jobs):
+        self.jobs = dict((job_id, ['RUNNING'] * checks + [status]) for job_id, (checks, status) in jobs.items())
+        self.submitted = []
+        self.running = set()
+        self.max_running = 0
+
+    def submit(self, job_id, timeout_in_min=30):
+        hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+        self.submitted.append(job_id)
+        self.running.add(job_id)
+        self.max_running = max(self.max_running, len(self.running))
+        return hmc_rest_client.HmcJob(job_id, timeout_in_min=timeout_in_min, result=lambda doc: job_id + ' done')
+
+    def open_url(self, url, **kwargs):
+        job_id = url.split('/')[-1]
+        statuses = self.jobs[job_id]
+        status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+        if status != 'RUNNING':
+            self.running.discard(job_id)
+        return FakeResponse(JOB_XML.format(status))
+
+
+def test_partition_doms_from_one_feed(mocker):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    mocker.patch.object(hmc_rest_client.HmcRestClient, 'logon', return_value='session')
+    feed = hmc_feeds.lpar_feed([('uuid-1', 'lpar1', 2048), ('uuid-2', 'lpar2', 4096)])
+    open_url = mocker.patch.object(hmc_rest_client, 'open_url', return_value=FakeResponse(feed))
+    rest_conn = hmc_rest_client.HmcRestClient('0.0.0.0', 'hscroot', 'password', keep_alive=False)
+
+    partitions = rest_conn.getLogicalPartitionDoms('ms-uuid')
+    assert open_url.call_count == 1
+    assert dict((name, uuid) for name, (uuid, dom) in partitions.items()) == {'lpar1': 'uuid-1', 'lpar2': 'uuid-2'}
+    # every partition dom stands alone, as the updates POST it whole
+    rest_conn.updateMem(partitions['lpar1'][1], '8192')
+    assert [rest_conn.getMem(dom) for uuid, dom in partitions.values()] == ['2048', '4096']
+    assert partitions['lpar2'][1].xpath('//DesiredMemory')[0].text == '4096'
+    assert partitions['lpar1'][1].xpath('//LogicalPartition')[0].xpath('//DesiredMemory')[0].text == '8192'
+
+
+def job_manager_setup(mocker, jobs, max_concurrent):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    mocker.patch.object(hmc_rest_client.HmcRestClient, 'logon', return_value='session')
+    fake_jobs = FakeJobs(jobs)
+    mocker.patch.object(hmc_rest_client, 'open_url', side_effect=fake_jobs.open_url)
+    clock = FakeClock()
+    rest_conn = hmc_rest_client.HmcRestClient('0.0.0.0', 'hscroot', 'password', keep_alive=False,
+                                              job_poll=hmc_rest_client.JobPoller(clock=clock))
+    return hmc_rest_client.HmcJobManager(rest_conn, max_concurrent=max_concurrent), fake_jobs, clock
+
+
+def test_job_manager_polls_jobs_together_under_cap(mocker):
+    jobs = {'j1': (2, 'COMPLETED_OK'), 'j2': (0, 'COMPLETED_OK'), 'j3': (0, 'COMPLETED_OK'), 'j4': (1, 'COMPLETED_OK')}
+    job_manager, fake_jobs, clock = job_manager_setup(mocker, jobs, max_concurrent=2)
+    for job_id in sorted(jobs):
+        job_manager.add(job_id, lambda job_id=job_id: fake_jobs.submit(job_id))
+    completed = [(key, result, error) for key, result, error in job_manager.as_completed()]
+    assert completed == [('j2', 'j2 done', None), ('j3', 'j3 done', None), ('j1', 'j1 done', None), ('j4', 'j4 done', None)]
+    assert fake_jobs.max_running == 2
+    # one poll loop for all the jobs
+    assert clock.sleeps == [2, 4, 8, 16]
+
+
+def test_job_manager_run_raises_first_error_after_all_jobs(mocker):
+    jobs = {'j1': (1, 'FAILED_BEFORE_COMPLETION'), 'j2': (3, 'COMPLETED_OK'), 'j3': (50, 'COMPLETED_OK')}
+    job_manager, fake_jobs, clock = job_manager_setup(mocker, jobs, max_concurrent=4)
+    job_manager.add('j1', lambda: fake_jobs.submit('j1'))
+    job_manager.add('j2', lambda: fake_jobs.submit('j2'))
+    job_manager.add('j3', lambda: fake_jobs.submit('j3', timeout_in_min=1))
+    completed = dict((key, (result, error)) for key, result, error in job_manager.as_completed())
+    assert completed['j1'][1].message == 'Job failed.'
+    assert completed['j2'] == ('j2 done', None)
+    assert completed['j3'][1].message == 'Job: PowerOn timed out!!'
+
+    job_manager, fake_jobs, clock = job_manager_setup(mocker, jobs, max_concurrent=4)
+    job_manager.add('j1', lambda: fake_jobs.submit('j1'))
+    job_manager.add('j2', lambda: fake_jobs.submit('j2'))
+    with pytest.raises(HmcError) as e:
+        job_manager.run()
+    assert e.value.message == 'Job failed.'
+    assert fake_jobs.jobs['j2'] == ['COMPLETED_OK']
+
+    job_manager, fake_jobs, clock = job_manager_setup(mocker, {'j1': (0, 'COMPLETED_OK'), 'j2': (1, 'COMPLETED_OK')}, max_concurrent=4)
+    job_manager.add('j2', lambda: fake_jobs.submit('j2'))
+    job_manager.add('j1', lambda: fake_jobs.submit('j1'))
+    assert list(job_manager.run().items()) == [('j2', 'j2 done'), ('j1', 'j1 done')]
+
+
+def test_get_events_parses_feed(mocker):
+    hmc_rest_client = common_mock_setup(mocker, [])
+    rest_conn = hmc_rest_client.HmcRestClient('0.0.0.0', 'hscroot', 'password', keep_alive=False)
+    uri = 'https://hmc:443/rest/api/uom/ManagedSystem/ms-uuid/LogicalPartition/lpar-uuid'
+    hmc_rest_client.open_url.side_effect = [FakeResponse(hmc_feeds.event_feed([('MODIFY_URI', uri, 'RMCState')])),
+                                            FakeResponse('', code=204)]
+    assert rest_conn.getEvents() == [{'EventType': 'MODIFY_URI', 'EventID': '0', 'EventData': uri, 'EventDetail': 'RMCState'}]
+    assert rest_conn.getEvents() == []
+
+
+def event_listener_setup(mocker, events):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    rest_conn = mocker.Mock()
+    rest_conn.getEvents.side_effect = events
+    clock = FakeClock()
+    return hmc_rest_client.HmcEventListener(rest_conn, clock=clock), rest_conn, clock
+
+
+def test_event_listener_checks_on_watched_events(mocker):
+    other = {'EventType': 'MODIFY_URI', 'EventData': '/LogicalPartition/other-uuid', 'EventDetail': 'PartitionState'}
+    watched = {'EventType': 'MODIFY_URI', 'EventData': '/LogicalPartition/lpar-uuid', 'EventDetail': 'RMCState'}
+    listener, rest_conn, clock = event_listener_setup(mocker, [[other], [], [watched]])
+    check = mocker.Mock(side_effect=[False, True])
+    assert listener.wait(check, 600, watch=['lpar-uuid'])
+    assert check.call_count == 2
+    # only the empty answer is followed by a pause, before reading the feed again
+    assert clock.sleeps == [5]
+
+
+def test_event_listener_falls_back_to_polling(mocker):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    error = hmc_rest_client.urllib_error.HTTPError('url', 404, 'Not Found', {}, None)
+    listener, rest_conn, clock = event_listener_setup(mocker, error)
+    check = mocker.Mock(return_value=False)
+    assert not listener.wait(check, 75)
+    assert clock.sleeps == [30, 30, 15]
+    assert check.call_count == 4
+    assert rest_conn.getEvents.call_count == 1
+
+
+def test_event_listener_logs_off_its_own_session(mocker, monkeypatch):
+    hmc_rest_client = importlib.import_module(IMPORT_HMC_REST_CLIENT)
+    monkeypatch.setenv('ANSIBLE_POWER_HMC_SESSION_CACHE_TTL', '600')
+    monkeypatch.setenv('ANSIBLE_POWER_HMC_KEEP_ALIVE', 'false')
+    session_cache = mocker.patch.object(hmc_rest_client, 'HmcSessionCache')
+    mocker.patch.object(hmc_rest_client.HmcRestClient, 'logon', return_value='session')
+    open_url = mocker.patch.object(hmc_rest_client, 'open_url', return_value=FakeResponse('', code=204))
+    listener = hmc_rest_client.HmcEventListener.connect('0.0.0.0', 'hscroot', 'password')
+    assert listener.rest_client.session_cache is None
+    assert not session_cache.called
+    listener.close()
+    assert open_url.call_args[1]['method'] == 'DELETE'
+    assert open_url.call_args[1]['headers']['X-API-Session'] == 'session'
@@ -3,6 +3,8 @@ __metaclass__ = type
 
 import pytest
 import importlib
+import threading
+import time
 
 IMPORT_CECFW = "ansible_collections.ibm.power_hmc.plugins.modules.firmware_update"
 
@@ -162,3 +164,100 @@ def test_call_inside_accept_level(mocker, cecfw_test_input, expectedError):
         assert expectedError == repr(e.value)
     else:
         cecfw_update_upgrade.accept_level(cecfw_update_upgrade, cecfw_test_input)
+
+
+def test_plan_waves_keeps_ha_pairs_apart():
+    cecfw_update_upgrade = importlib.import_module(IMPORT_CECFW)
+    waves = cecfw_update_upgrade.plan_waves(['a1', 'a2', 'b1', 'b2', 'c1'], 2, [['a1', 'a2'], ['b1', 'b2']])
+    assert waves == [['a1', 'b1'], ['a2', 'b2'], ['c1']]
+    assert cecfw_update_upgrade.plan_waves(['a1', 'a2', 'c1'], 3) == [['a1', 'a2', 'c1']]
+
+
+def test_firmware_levels_read_in_one_batch(mocker):
+    hmc_resource = importlib.import_module('ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_resource')
+    hmc_conn = mocker.Mock()
+    hmc_conn.execute_batch.return_value = [(0, 'FW940.20,55,01VL940\n'), (1, 'HSCL8012 The managed system cannot be found.\n')]
+    levels = hmc_resource.Hmc(hmc_conn).get_firmware_levels(['sys1', 'sys2'])
+    assert levels == {'sys1': {'service_pack': 'FW940.20', 'level': '55', 'ecnumber': '01VL940'}, 'sys2': None}
+    assert hmc_conn.execute_batch.call_args[0][0] == ['lslic -m sys1 -F activated_spname,activated_level,ecnumber',
+                                                      'lslic -m sys2 -F activated_spname,activated_level,ecnumber']
+
+
+def test_rolling_update_stops_after_a_failed_wave(mocker):
+    cecfw_update_upgrade = common_mock_setup(mocker)
+    hmc = cecfw_update_upgrade.Hmc.return_value
+    levels = {'sys1': '55', 'sys2': '55', 'sys3': '55', 'sys4': '55', 'sys5': '55'}
+    hmc.get_firmware_levels.side_effect = lambda names: dict((name, {'level': levels[name]}) for name in names)
+    running = []
+    waves = []
+    lock = threading.Lock()
+
+    def update_managed_system(system_name, upgrade, repo, level, remote_repo):
+        with lock:
+            running.append(system_name)
+            waves.append(sorted(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(system_name)
+        if system_name == 'sys3':
+            raise cecfw_update_upgrade.HmcError('HSCF0180 the update failed')
+        levels[system_name] = '61'
+    hmc.update_managed_system.side_effect = update_managed_system
+    module = mocker.Mock()
+    module.fail_json.side_effect = SystemExit
+    module.params = {'hmc_host': 'hmc_host', 'hmc_auth': hmc_auth, 'state': 'updated', 'action': None, 'system_name': None,
+                     'system_names': ['sys1', 'sys2', 'sys3', 'sys4', 'sys5'], 'wave_size': 2, 'ha_pairs': [['sys1', 'sys2']],
+                     'level': 'latest', 'repository': 'ibmwebsite', 'remote_repo': None}
+
+    with pytest.raises(SystemExit):
+        cecfw_update_upgrade.perform_task(module)
+    kwargs = module.fail_json.call_args[1]
+    assert kwargs['changed'] and kwargs['msg'] == 'system update failed for sys3'
+    assert [(each['system_name'], each['wave'], each['status']) for each in kwargs['systems']] == \
+        [('sys1', 1, 'changed'), ('sys2', 2, 'skipped'), ('sys3', 1, 'failed'), ('sys4', 2, 'skipped'), ('sys5', 3, 'skipped')]
+    assert max(waves, key=len) == ['sys1', 'sys3']
+    hmc.get_firmware_levels.assert_called_with(['sys1', 'sys3'])
+    assert kwargs['systems'][0]['diff'] == {'before': {'level': '55'}, 'after': {'level': '61'}}
+
+
+def test_rolling_update_reports_unreadable_levels_as_unknown(mocker):
+    cecfw_update_upgrade = common_mock_setup(mocker)
+    hmc = cecfw_update_upgrade.Hmc.return_value
+    hmc.get_firmware_levels.side_effect = [{'sys1': {'level': '55'}, 'sys2': None, 'sys3': {'level': '55'}},
+                                           {'sys1': {'level': '55'}, 'sys2': {'level': '61'}, 'sys3': None}]
+    module = mocker.Mock()
+    module.params = {'hmc_host': 'hmc_host', 'hmc_auth': hmc_auth, 'state': 'updated', 'action': None, 'system_name': None,
+                     'system_names': ['sys1', 'sys2', 'sys3'], 'wave_size': 3, 'ha_pairs': None,
+                     'level': 'latest', 'repository': 'ibmwebsite', 'remote_repo': None}
+
+    changed, info, error = cecfw_update_upgrade.perform_task(module)
+    assert changed and error is None
+    assert [(each['system_name'], each['status'], each['msg']) for each in info['systems']] == \
+        [('sys1', 'unchanged', None), ('sys2', 'unknown', 'firmware level could not be read before the update'),
+         ('sys3', 'unknown', 'firmware level could not be read after the update')]
+
+
+def test_rolling_update_reports_systems_as_unknown_when_levels_cannot_be_read_after(mocker):
+    cecfw_update_upgrade = common_mock_setup(mocker)
+    hmc = cecfw_update_upgrade.Hmc.return_value
+    initial_levels = {'sys1': {'level': '55'}, 'sys2': {'level': '55'}}
+    hmc.get_firmware_levels.side_effect = [initial_levels, {'sys1': {'level': '61'}},
+                                           initial_levels, cecfw_update_upgrade.HmcError('HSCL0001 lslic failed')]
+    module = mocker.Mock()
+    module.params = {'hmc_host': 'hmc_host', 'hmc_auth': hmc_auth, 'state': 'updated', 'action': None, 'system_name': None,
+                     'system_names': ['sys1', 'sys2'], 'wave_size': 2, 'ha_pairs': None,
+                     'level': 'latest', 'repository': 'ibmwebsite', 'remote_repo': None}
+
+    # sys2 is missing from the levels read after the update
+    changed, info, error = cecfw_update_upgrade.perform_task(module)
+    assert changed and error is None
+    assert [(each['system_name'], each['status'], each['msg']) for each in info['systems']] == \
+        [('sys1', 'changed', None), ('sys2', 'unknown', 'firmware level could not be read after the update')]
+
+    # no level could be read after the update
+    changed, info, error = cecfw_update_upgrade.perform_task(module)
+    assert changed and error is None
+    assert [(each['system_name'], each['status'], each['msg']) for each in info['systems']] == \
+        [('sys1', 'unknown', 'firmware level could not be read after the update'),
+         ('sys2', 'unknown', 'firmware level could not be read after the update')]
+    assert 'diff' not in info['systems'][0]
@@ -129,3 +129,12 @@ def test_call_inside_fetchManagedSysDetails(mocker, power_system_test_input, exp
         assert expectedError == repr(e.value)
     else:
         hmc_power_system.fetchManagedSysDetails(hmc_power_system, power_system_test_input)
+
+
+def test_state_polling_projects_the_state_attribute(mocker):
+    hmc_resource = importlib.import_module('ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_resource')
+    hmc_conn = mocker.Mock()
+    hmc_conn.execute.return_value = 'Power Off\n'
+    hmc = hmc_resource.Hmc(hmc_conn)
+    assert hmc.checkManagedSysState('system_name', ['Power Off'])
+    assert hmc_conn.execute.call_args[0][0] == 'lssyscfg -r sys -m system_name -F state'
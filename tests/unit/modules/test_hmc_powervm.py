@@ -2,7 +2,11 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import pytest
+import json
 import importlib
+from collections import defaultdict
+
+from lxml import etree
 
 IMPORT_HMC_POWERVM = "ansible_collections.ibm.power_hmc.plugins.modules.powervm_lpar_instance"
 
@@ -101,6 +105,10 @@ test_data3 = [
     # hmc_auth is missing
     ({'hmc_host': "0.0.0.0", 'hmc_auth': None, 'state': None, 'action': 'poweron',
       'system_name': "systemname", 'vm_name': "vmname"}, "ParameterError: mandatory parameter 'hmc_auth' is missing"),
+    # invalid job_poll, reported before logging on
+    (defaultdict(lambda: None, {'hmc_host': "0.0.0.0", 'hmc_auth': hmc_auth, 'state': None, 'action': 'poweron',
+                                'system_name': "systemname", 'vm_name': "vmname", 'job_poll': {'initial_interval': 0}}),
+     "ParameterError: job_poll initial_interval must be greater than 0"),
     # unsupported parameter os_type,proc,mem
     ({'hmc_host': "0.0.0.0", 'hmc_auth': hmc_auth, 'state': None, 'action': 'poweron',
       'system_name': "systemname", 'vm_name': 'vmname', 'proc': '4', 'mem':
@@ -163,3 +171,174 @@ def test_call_inside_powervm_poweron_partition(mocker, powervm_test_input, expec
         assert expectedError == repr(e.value)
     else:
         hmc_powervm.poweron_partition(hmc_powervm, powervm_test_input)
+
+
+def free_pv(udid, name, capacity, policy='NoReserve', available='true'):
+    return etree.fromstring('<PhysicalVolume><ReservePolicy>{0}</ReservePolicy><UniqueDeviceID>{1}</UniqueDeviceID>'
+                            '<AvailableForUsage>{2}</AvailableForUsage><VolumeCapacity>{3}</VolumeCapacity>'
+                            '<VolumeName>{4}</VolumeName></PhysicalVolume>'.format(policy, udid, available, capacity, name))
+
+
+def test_identify_free_volume_picks_smallest_multipath_volume(mocker):
+    hmc_powervm = importlib.import_module(IMPORT_HMC_POWERVM)
+    hmc_rest_client = importlib.import_module("ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client")
+    free_pvs = {'vios-uuid-1': [free_pv('shared-big', 'hdisk1', 8192), free_pv('shared-small', 'hdisk2', 4096),
+                                free_pv('local1', 'hdisk3', 2048, 'SinglePath'), free_pv('in-use', 'hdisk4', 2048)],
+                'vios-uuid-2': [free_pv('shared-small', 'hdisk7', 4096), free_pv('shared-big', 'hdisk8', 8192),
+                                free_pv('in-use', 'hdisk9', 2048)]}
+    storage = etree.fromstring('<VirtualIOServer><MoverServicePartition>false</MoverServicePartition><PhysicalVolumes>'
+                               '<PhysicalVolume><UniqueDeviceID>in-use</UniqueDeviceID><AvailableForUsage>false</AvailableForUsage>'
+                               '</PhysicalVolume></PhysicalVolumes></VirtualIOServer>')
+    rest_conn = mocker.Mock()
+    rest_conn.job_poll = hmc_rest_client.JobPoller(clock=mocker.Mock(time=mocker.Mock(return_value=0)))
+    rest_conn.getVirtualIOServersQuick.return_value = json.dumps([
+        {'UUID': 'vios-uuid-1', 'PartitionName': 'vios1', 'RMCState': 'active'},
+        {'UUID': 'vios-uuid-2', 'PartitionName': 'vios2', 'RMCState': 'active'},
+        {'UUID': 'vios-uuid-3', 'PartitionName': 'vios3', 'RMCState': 'inactive'}])
+    rest_conn.getFreePhyVolume.side_effect = lambda vios_uuid, wait: hmc_rest_client.HmcJob(vios_uuid, result=lambda doc: free_pvs[vios_uuid])
+    rest_conn.checkJobStatus.return_value = (True, None)
+    rest_conn.getVirtualIOServer.return_value = storage
+
+    volumes = hmc_powervm.identifyFreeVolume(rest_conn, 'ms-uuid', volume_size=2048)
+    assert sorted(volume[:2] for volume in volumes) == [('hdisk2', 'vios1'), ('hdisk7', 'vios2')]
+    assert rest_conn.getFreePhyVolume.call_count == 2 and rest_conn.getVirtualIOServer.call_count == 2
+
+
+def test_identify_managed_system_lists_all_systems_in_one_batch(mocker, tmp_path, monkeypatch):
+    monkeypatch.delenv('ANSIBLE_POWER_HMC_LPAR_INDEX_TTL', raising=False)
+    hmc_resource = importlib.import_module('ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_resource')
+    hmc_file_cache = importlib.import_module('ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_file_cache')
+    mocker.patch.object(hmc_file_cache, 'CACHE_ROOT', str(tmp_path))
+    systems = 'sys1,Operating\nsys2,Power Off\nsys3,Operating\nsys4,Operating\n'
+    hmc_conn = mocker.Mock(ip='0.0.0.0', user='hscroot')
+    hmc_conn.execute.return_value = systems
+    hmc_conn.execute_batch.side_effect = [
+        [(0, 'lpar1\nvios1\n'), (1, 'HSCL8012 No results were found.\n'), (0, 'lpar2\nvios1\n')],
+        [(0, systems), (0, 'lpar2\n')],
+    ]
+    powervm = importlib.import_module(IMPORT_HMC_POWERVM)
+    hmc = hmc_resource.Hmc(hmc_conn)
+
+    assert powervm.identify_ManagedSystem_of_lpar(hmc, 'lpar2') == 'sys4'
+    assert hmc_conn.execute.call_count == 1
+    cmds = hmc_conn.execute_batch.call_args[0][0]
+    assert [cmd.split(' -m ')[1].split()[0] for cmd in cmds] == ['sys1', 'sys3', 'sys4']
+
+    # a later task resolves the name from the index after one confirming batch
+    assert powervm.identify_ManagedSystem_of_lpar(hmc_resource.Hmc(hmc_conn), 'lpar2') == 'sys4'
+    assert hmc_conn.execute.call_count == 1
+    assert 'lpar_names=lpar2' in hmc_conn.execute_batch.call_args[0][0][1]
+
+    # a system coming up rebuilds the index, which finds the name there too
+    hmc_conn.execute.return_value = systems + 'sys5,Operating\n'
+    hmc_conn.execute_batch.side_effect = [
+        [(0, systems + 'sys5,Operating\n'), (0, 'lpar2\n')],
+        [(0, 'lpar1\n'), (0, ''), (0, 'lpar2\n'), (0, 'lpar2\n')],
+    ]
+    with pytest.raises(ParameterError, match="found in more than one managed systems"):
+        powervm.identify_ManagedSystem_of_lpar(hmc, 'lpar2')
+    assert hmc_conn.execute.call_count == 2
+
+    with pytest.raises(ParameterError, match="found in more than one managed systems"):
+        hmc_conn.execute_batch.side_effect = [[(0, 'vios1\n'), (0, 'vios1\n')]]
+        powervm.identify_ManagedSystem_of_lpar(hmc, 'vios1')
+
+
+def test_os_boot_wait_follows_partition_events(mocker):
+    hmc_resource = importlib.import_module('ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_resource')
+    hmc_rest_client = importlib.import_module('ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client')
+    rest_conn = mocker.Mock()
+    rest_conn.getManagedSystemsQuick.return_value = json.dumps([{'SystemName': 'sys1', 'UUID': 'ms-uuid'}])
+    rest_conn.getLogicalPartitionsQuick.return_value = json.dumps([{'PartitionName': 'lpar1', 'UUID': 'lpar-uuid'}])
+    rest_conn.getEvents.return_value = [{'EventType': 'MODIFY_URI', 'EventData': '/LogicalPartition/lpar-uuid', 'EventDetail': 'RMCState'}]
+    mocker.patch.object(hmc_resource.time, 'sleep', side_effect=AssertionError('fixed sleep while following events'))
+    hmc_conn = mocker.Mock()
+    # the RMC state left active by the previous boot is only trusted once it went down
+    hmc_conn.execute.side_effect = ['active\n', 'inactive\n', 'active\n', 'name=lpar1,rmc_state=active\n']
+    hmc = hmc_resource.Hmc(hmc_conn)
+    events = hmc_rest_client.HmcEventListener(rest_conn)
+
+    rmc_active, conf_dict, ref_code = hmc.checkForOSToBootUpFully('sys1', 'lpar1', 60, events)
+    assert rmc_active and ref_code is None
+    assert conf_dict == {'name': 'lpar1', 'rmc_state': 'active'}
+    assert hmc_conn.execute.call_args_list[0][0][0].endswith(' -F rmc_state')
+
+
+class StepClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_bulk_shutdown_lists_partitions_once_per_system(mocker):
+    hmc_powervm = common_mock_setup(mocker)
+    hmc_rest_client = importlib.import_module('ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client')
+    rest_conn = hmc_powervm.HmcRestClient.return_value
+    rest_conn.job_poll = hmc_rest_client.JobPoller(initial_interval=5, clock=StepClock())
+    rest_conn.getManagedSystemsQuick.return_value = json.dumps([{'SystemName': 'sys1', 'UUID': 'ms1'}, {'SystemName': 'sys2', 'UUID': 'ms2'}])
+    lpars = {'ms1': [{'PartitionName': 'lp1', 'UUID': 'u1', 'PartitionState': 'running', 'PartitionType': 'AIX/Linux'},
+                     {'PartitionName': 'lp2', 'UUID': 'u2', 'PartitionState': 'not activated', 'PartitionType': 'AIX/Linux'}],
+             'ms2': [{'PartitionName': 'lp3', 'UUID': 'u3', 'PartitionState': 'running', 'PartitionType': 'AIX/Linux'},
+                     {'PartitionName': 'lp4', 'UUID': 'u4', 'PartitionState': 'running', 'PartitionType': 'AIX/Linux'}]}
+    rest_conn.getLogicalPartitionsQuick.side_effect = lambda uuid: json.dumps(lpars[uuid])
+    rest_conn.poweroffPartition.side_effect = lambda uuid, restart, option, wait: hmc_rest_client.HmcJob('job-' + uuid)
+    # lp4 is still shutting down at its second check
+    checks = {'job-u1': [True], 'job-u3': [True], 'job-u4': [False, True]}
+    rest_conn.checkJobStatus.side_effect = lambda job_id, template: (checks[job_id].pop(0), None)
+    params = defaultdict(lambda: None, {'hmc_host': '0.0.0.0', 'hmc_auth': hmc_auth, 'action': 'shutdown', 'vm_names': ['lp1', 'lp2', 'lp3', 'lp4'],
+                                        'max_concurrent': 2, 'shutdown_option': 'Immediate'})
+
+    changed, info, warning = hmc_powervm.perform_task(mocker.Mock(params=params))
+    assert changed
+    assert rest_conn.getLogicalPartitionsQuick.call_count == 2
+    assert [each['status'] for each in info] == ['changed', 'unchanged', 'changed', 'changed']
+    assert [each['system_name'] for each in info] == ['sys1', 'sys1', 'sys2', 'sys2']
+    # lp4 only starts once lp1 completed, then needs the polls after 10s and 20s
+    assert [each['elapsed'] for each in info] == [5.0, 0, 5.0, 30.0]
+    rest_conn.poweroffPartition.assert_any_call('u4', 'false', 'Immediate', wait=False)
+
+
+def test_bulk_poweron_reports_every_partition_on_failure(mocker):
+    hmc_powervm = common_mock_setup(mocker)
+    rest_conn = hmc_powervm.HmcRestClient.return_value
+    rest_conn.job_poll = importlib.import_module('ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client').JobPoller()
+    rest_conn.getManagedSystemsQuick.return_value = json.dumps([{'SystemName': 'sys1', 'UUID': 'ms1'}, {'SystemName': 'sys2', 'UUID': 'ms2'}])
+    rest_conn.getLogicalPartitionsQuick.return_value = json.dumps([{'PartitionName': 'lp1', 'UUID': 'u1', 'PartitionState': 'running'}])
+    module = mocker.Mock(params=defaultdict(lambda: None, {'hmc_host': '0.0.0.0', 'hmc_auth': hmc_auth, 'action': 'poweron', 'vm_names': ['lp1', 'lp9']}))
+    module.fail_json.side_effect = SystemExit
+
+    with pytest.raises(SystemExit):
+        hmc_powervm.perform_task(module)
+    kwargs = module.fail_json.call_args[1]
+    assert kwargs['msg'] == 'poweron failed for partitions: lp1, lp9'
+    assert [each['msg'] for each in kwargs['partition_info']] == ["Logical Partition found in multiple managed systems: sys1, sys2."
+                                                                  " Please provide the system_name parameter",
+                                                                  "Logical Partition not found in any of the managed systems"]
+    rest_conn.poweronPartition.assert_not_called()
+
+
+def test_bulk_poweron_goes_on_when_a_failed_partition_state_is_unreadable(mocker):
+    hmc_powervm = common_mock_setup(mocker)
+    hmc_exceptions = importlib.import_module('ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions')
+    rest_conn = hmc_powervm.HmcRestClient.return_value
+    rest_conn.job_poll = importlib.import_module('ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_rest_client').JobPoller()
+    rest_conn.getManagedSystemsQuick.return_value = json.dumps([{'SystemName': 'sys1', 'UUID': 'ms1'}])
+    rest_conn.getLogicalPartitionsQuick.return_value = json.dumps([
+        {'PartitionName': name, 'UUID': name, 'PartitionState': 'not activated', 'PartitionType': 'AIX/Linux'} for name in ('lp1', 'lp2')])
+    job_error = hmc_exceptions.HmcError("Activation failed")
+    rest_conn.poweronPartition.side_effect = job_error
+    rest_conn.getLogicalPartitionQuick.side_effect = [hmc_exceptions.HmcError("HMC unreachable"), json.dumps({'PartitionState': 'error'})]
+    module = mocker.Mock(params=defaultdict(lambda: None, {'hmc_host': '0.0.0.0', 'hmc_auth': hmc_auth, 'action': 'poweron', 'vm_names': ['lp1', 'lp2']}))
+    module.fail_json.side_effect = SystemExit
+
+    with pytest.raises(SystemExit):
+        hmc_powervm.perform_task(module)
+    kwargs = module.fail_json.call_args[1]
+    assert kwargs['msg'] == 'poweron failed for partitions: lp1'
+    job_msg = hmc_powervm.parse_error_response(job_error)
+    assert [(each['status'], each['msg']) for each in kwargs['partition_info']] == [('failed', job_msg), ('changed', job_msg)]
@@ -1,9 +1,12 @@
 import pytest
 import importlib
+import threading
+import time
 
 IMPORT_DLPAR = "ansible_collections.ibm.power_hmc.plugins.modules.powervm_dlpar"
 
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
 
 hmc_auth = {'username': 'hscroot', 'password': 'password_value'}
 
@@ -228,3 +231,95 @@ def test_call_inside_update_vod(mocker, user_test_input, expectedError):
         assert expectedError == repr(e.value)
     else:
         powervm_dlpar.update_vod(powervm_dlpar, user_test_input)
+
+
+def test_batch_update_proc_mem_per_system(mocker):
+    powervm_dlpar = common_mock_setup(mocker)
+    rest_conn = powervm_dlpar.HmcRestClient.return_value
+    rest_conn.getManagedSystem.side_effect = lambda name: ('uuid-' + name, None)
+    rest_conn.getLogicalPartitionDoms.side_effect = lambda uuid: dict((name, ('uuid-' + name, name)) for name in ('lp1', 'lp2', 'lp3'))
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def apply_proc_mem(rest_conn, system_uuid, partition_uuid, partition_dom, settings, timeout):
+        with lock:
+            running.append(partition_dom)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(partition_dom)
+        return settings['mem'] is not None, dict(settings, system_uuid=system_uuid)
+    mocker.patch.object(powervm_dlpar, 'apply_proc_mem', side_effect=apply_proc_mem)
+    params = {'hmc_host': '0.0.0.0', 'hmc_auth': hmc_auth, 'action': 'update_proc_mem', 'system_name': 'sys1', 'vm_name': None,
+              'proc_settings': {'proc': 2}, 'mem_settings': {'mem': 3072}, 'timeout': None, 'max_concurrent': 2,
+              'pv_settings': None, 'npiv_settings': None, 'vod_settings': None,
+              'partitions': [{'vm_name': 'lp1', 'system_name': None, 'proc_settings': None, 'mem_settings': None},
+                             {'vm_name': 'lp2', 'system_name': None, 'proc_settings': {'proc': 4}, 'mem_settings': None},
+                             {'vm_name': 'lp3', 'system_name': None, 'proc_settings': None, 'mem_settings': None},
+                             {'vm_name': 'lp1', 'system_name': 'sys2', 'proc_settings': None, 'mem_settings': {'mem': 1024}}]}
+
+    changed, info, warning = powervm_dlpar.update_lpar(mocker.Mock(params=params), params)
+    assert changed
+    assert rest_conn.getLogicalPartitionDoms.call_count == 2
+    assert [(each['vm_name'], each['system_name'], each['status']) for each in info] == \
+        [('lp1', 'sys1', 'changed'), ('lp2', 'sys1', 'changed'), ('lp3', 'sys1', 'changed'), ('lp1', 'sys2', 'changed')]
+    assert [(each['partition_info']['proc'], each['partition_info']['mem']) for each in info] == [(2, 3072), (4, 3072), (2, 3072), (2, 1024)]
+    assert info[3]['partition_info']['system_uuid'] == 'uuid-sys2'
+    # sys1 runs two partitions at a time while sys2 runs alongside
+    assert max(peak) == 3
+
+
+def test_batch_update_proc_mem_reports_every_partition_on_failure(mocker):
+    powervm_dlpar = common_mock_setup(mocker)
+    rest_conn = powervm_dlpar.HmcRestClient.return_value
+    rest_conn.getManagedSystem.return_value = ('uuid-sys1', None)
+    rest_conn.getLogicalPartitionDoms.return_value = {'lp1': ('uuid-lp1', 'lp1')}
+    mocker.patch.object(powervm_dlpar, 'apply_proc_mem',
+                        side_effect=powervm_dlpar.ProcMemValidationError("Given sharing mode is not supported with shared processor configuration"))
+    module = mocker.Mock()
+    module.fail_json.side_effect = SystemExit
+    params = {'hmc_host': '0.0.0.0', 'hmc_auth': hmc_auth, 'action': 'update_proc_mem', 'system_name': 'sys1', 'vm_name': None,
+              'proc_settings': {'sharing_mode': 'keep_idle_procs'}, 'mem_settings': None, 'timeout': None, 'max_concurrent': None,
+              'pv_settings': None, 'npiv_settings': None, 'vod_settings': None,
+              'partitions': [{'vm_name': 'lp1'}, {'vm_name': 'lp9'}]}
+
+    with pytest.raises(SystemExit):
+        powervm_dlpar.update_lpar(module, params)
+    kwargs = module.fail_json.call_args[1]
+    assert kwargs['msg'] == 'update_proc_mem failed for partitions: lp1, lp9'
+    assert [each['msg'] for each in kwargs['partition_info']] == ["Given sharing mode is not supported with shared processor configuration",
+                                                                  "Given powervm instance is not present"]
+
+
+def test_batch_update_proc_mem_looks_up_every_system_first(mocker):
+    powervm_dlpar = common_mock_setup(mocker)
+    rest_conn = powervm_dlpar.HmcRestClient.return_value
+    rest_conn.getManagedSystem.side_effect = lambda name: ('uuid-' + name, None)
+
+    def partition_doms(system_uuid):
+        if system_uuid == 'uuid-sys2':
+            raise HmcError("HSCL350B The user does not have the appropriate authority")
+        return {'lp1': ('uuid-lp1', 'lp1')}
+    rest_conn.getLogicalPartitionDoms.side_effect = partition_doms
+    submitted = []
+
+    def apply_proc_mem(rest_conn, system_uuid, partition_uuid, partition_dom, settings, timeout):
+        submitted.append(rest_conn.getLogicalPartitionDoms.call_count)
+        return True, settings
+    mocker.patch.object(powervm_dlpar, 'apply_proc_mem', side_effect=apply_proc_mem)
+    module = mocker.Mock()
+    module.fail_json.side_effect = SystemExit
+    params = {'hmc_host': '0.0.0.0', 'hmc_auth': hmc_auth, 'action': 'update_proc_mem', 'system_name': 'sys1', 'vm_name': None,
+              'proc_settings': {'proc': 2}, 'mem_settings': None, 'timeout': None, 'max_concurrent': None,
+              'pv_settings': None, 'npiv_settings': None, 'vod_settings': None,
+              'partitions': [{'vm_name': 'lp1'}, {'vm_name': 'lp1', 'system_name': 'sys2'}]}
+
+    with pytest.raises(SystemExit):
+        powervm_dlpar.update_lpar(module, params)
+    # both systems were looked up before the update of sys1 started
+    assert submitted == [2]
+    kwargs = module.fail_json.call_args[1]
+    assert kwargs['msg'] == 'update_proc_mem failed for partitions: lp1'
+    assert [(each['system_name'], each['status'], each['msg']) for each in kwargs['partition_info']] == \
+        [('sys1', 'changed', None), ('sys2', 'failed', 'HSCL350B The user does not have the appropriate authority')]
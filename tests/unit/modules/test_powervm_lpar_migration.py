@@ -3,10 +3,13 @@ __metaclass__ = type
 
 import pytest
 import importlib
+import threading
+import time
 
 IMPORT_HMC_LPM = "ansible_collections.ibm.power_hmc.plugins.modules.powervm_lpar_migration"
 
 from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import ParameterError
+from ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_exceptions import HmcError
 
 hmc_auth = {'username': 'hscroot', 'password': 'password_value'}
 test_data = [
@@ -89,3 +92,133 @@ def test_call_inside_logical_partition_migration(mocker, lpm_test_input, expecte
         assert expectedError == repr(e.value)
     else:
         hmc_lpm.logical_partition_migration(hmc_lpm, lpm_test_input)
+
+
+def test_orchestrated_migration_validates_all_then_migrates_under_cap(mocker):
+    hmc_lpm = common_mock_setup(mocker)
+    real_sleep = time.sleep
+    retry_sleep = mocker.patch.object(hmc_lpm.time, 'sleep')
+    calls = []
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def migratePartitions(opr, src, dst, lparNames=None, lparIDs=None, aLL=False, ip=None, wait=None):
+        with lock:
+            calls.append((opr, lparNames))
+            running.append(lparNames)
+            peak.append((opr, len(running)))
+        real_sleep(0.05)
+        with lock:
+            running.remove(lparNames)
+        if opr == 'v' and lparNames == 'lp3':
+            raise HmcError("HSCLA319 The migrating partition's virtual SCSI adapter cannot be hosted")
+        if opr == 'm' and lparNames == 'lp2' and calls.count(('m', 'lp2')) == 1:
+            raise HmcError("HSCL3205 The managed system is busy, please try again later")
+    hmc_lpm.Hmc.return_value.migratePartitions.side_effect = migratePartitions
+    hmc_lpm.Hmc.return_value.getMigrationState.return_value = 'source'
+    module = mocker.Mock()
+    module.fail_json.side_effect = SystemExit
+    module.params = {'hmc_host': '0.0.0.0', 'hmc_auth': hmc_auth, 'action': 'migrate', 'src_system': 'srcsys', 'dest_system': 'dstsys',
+                     'all_vms': None, 'vm_names': ['lp1', 'lp2', 'lp3', 'lp4', 'lp5'], 'vm_ids': None, 'remote_ip': None, 'wait': None,
+                     'concurrent_migrations': 2, 'retries': 1, 'retry_delay': 30}
+
+    with pytest.raises(SystemExit):
+        hmc_lpm.perform_task(module)
+    kwargs = module.fail_json.call_args[1]
+    assert kwargs['changed'] and kwargs['msg'] == 'migrate failed for partitions: lp3'
+    assert [(each['vm_name'], each['status']) for each in kwargs['system_info']] == \
+        [('lp1', 'migrated'), ('lp2', 'migrated'), ('lp3', 'validation_failed'), ('lp4', 'migrated'), ('lp5', 'migrated')]
+    assert [each.get('attempts') for each in kwargs['system_info']] == [1, 2, None, 1, 1]
+    # every validation is done before the first migration starts
+    assert [opr for opr, name in calls[:5]] == ['v'] * 5
+    assert ('m', 'lp3') not in calls
+    assert max(count for opr, count in peak if opr == 'v') == 5
+    assert max(count for opr, count in peak if opr == 'm') == 2
+    retry_sleep.assert_called_once_with(30)
+    hmc_lpm.Hmc.return_value.getMigrationState.assert_called_once_with('srcsys', 'dstsys', lparName='lp2', lparID=None)
+
+
+def test_orchestrated_migration_does_not_retry_permanent_failures(mocker):
+    hmc_lpm = common_mock_setup(mocker)
+
+    def migratePartitions(opr, *args, **kwargs):
+        if opr == 'm':
+            raise HmcError('HSCLA228 The partition is not in a valid state')
+    hmc_lpm.Hmc.return_value.migratePartitions.side_effect = migratePartitions
+    module = mocker.Mock()
+    module.fail_json.side_effect = SystemExit
+    module.params = {'hmc_host': '0.0.0.0', 'hmc_auth': hmc_auth, 'action': 'migrate', 'src_system': 'srcsys', 'dest_system': 'dstsys',
+                     'all_vms': None, 'vm_names': None, 'vm_ids': ['7'], 'remote_ip': None, 'wait': None,
+                     'concurrent_migrations': 1, 'retries': 3, 'retry_delay': None}
+
+    with pytest.raises(SystemExit):
+        hmc_lpm.perform_task(module)
+    info = module.fail_json.call_args[1]['system_info']
+    assert info == [{'vm_id': '7', 'status': 'failed', 'msg': 'HSCLA228 The partition is not in a valid state', 'validate_elapsed': 0.0,
+                     'attempts': 1, 'elapsed': 0.0}]
+    hmc_lpm.Hmc.return_value.migratePartitions.assert_called_with('m', 'srcsys', 'dstsys', lparNames=None, lparIDs='7',
+                                                                  aLL=False, ip=None, wait=None)
+
+
+def test_orchestrated_migration_checks_partition_before_retrying(mocker):
+    hmc_lpm = common_mock_setup(mocker)
+    retry_sleep = mocker.patch.object(hmc_lpm.time, 'sleep')
+
+    def migratePartitions(opr, *args, **kwargs):
+        if opr == 'm':
+            raise HmcError('ssh: connection reset by peer')
+    hmc = hmc_lpm.Hmc.return_value
+    hmc.migratePartitions.side_effect = migratePartitions
+    # the dropped session left the migration running, which then completes
+    hmc.getMigrationState.side_effect = ['migrating', 'destination']
+    module = mocker.Mock()
+    module.params = {'hmc_host': '0.0.0.0', 'hmc_auth': hmc_auth, 'action': 'migrate', 'src_system': 'srcsys', 'dest_system': 'dstsys',
+                     'all_vms': None, 'vm_names': ['lp1'], 'vm_ids': None, 'remote_ip': None, 'wait': None,
+                     'concurrent_migrations': 1, 'retries': 3, 'retry_delay': 30}
+
+    changed, info, warning = hmc_lpm.perform_task(module)
+    assert changed
+    assert [(each['status'], each['msg'], each['attempts']) for each in info] == [('migrated', None, 1)]
+    assert [call[0] for call in hmc.migratePartitions.call_args_list] == [('v', 'srcsys', 'dstsys'), ('m', 'srcsys', 'dstsys')]
+    assert retry_sleep.call_count == 2
+
+
+def test_orchestrated_migration_stops_retrying_a_partition_still_migrating(mocker):
+    hmc_lpm = common_mock_setup(mocker)
+    mocker.patch.object(hmc_lpm.time, 'sleep')
+
+    def migratePartitions(opr, *args, **kwargs):
+        if opr == 'm':
+            raise HmcError('HSCL3205 The managed system is busy, please try again later')
+    hmc = hmc_lpm.Hmc.return_value
+    hmc.migratePartitions.side_effect = migratePartitions
+    hmc.getMigrationState.return_value = 'migrating'
+    module = mocker.Mock()
+    module.fail_json.side_effect = SystemExit
+    module.params = {'hmc_host': '0.0.0.0', 'hmc_auth': hmc_auth, 'action': 'migrate', 'src_system': 'srcsys', 'dest_system': 'dstsys',
+                     'all_vms': None, 'vm_names': None, 'vm_ids': ['7'], 'remote_ip': None, 'wait': None,
+                     'concurrent_migrations': 1, 'retries': 2, 'retry_delay': 30}
+
+    with pytest.raises(SystemExit):
+        hmc_lpm.perform_task(module)
+    info = module.fail_json.call_args[1]['system_info']
+    assert [(each['status'], each['attempts']) for each in info] == [('failed', 1)]
+    hmc.getMigrationState.assert_called_with('srcsys', None, lparName=None, lparID='7')
+    assert hmc.getMigrationState.call_count == 2
+
+
+@pytest.mark.parametrize("results, state", [
+    ([(0, 'Not Migrating\n'), (1, 'HSCL8012 No results were found.\n')], 'source'),
+    ([(0, 'Migration Starting\n'), (0, 'lp1\n')], 'migrating'),
+    ([(1, 'HSCL8012 No results were found.\n'), (0, 'lp1\n')], 'destination'),
+    ([(1, 'HSCL8012 No results were found.\n'), (1, 'HSCL8012 No results were found.\n')], None),
+    ([(255, 'ssh: connect to host 0.0.0.0 port 22: Connection refused\n'), (255, '')], None)])
+def test_migration_state_of_partition(mocker, results, state):
+    hmc_resource = importlib.import_module('ansible_collections.ibm.power_hmc.plugins.module_utils.hmc_resource')
+    hmc_conn = mocker.Mock()
+    hmc_conn.execute_batch.return_value = results
+    assert hmc_resource.Hmc(hmc_conn).getMigrationState('srcsys', 'dstsys', lparName='lp1') == state
+    cmds = hmc_conn.execute_batch.call_args[0][0]
+    assert cmds == ['lslparmigr -r lpar -m srcsys --filter "lpar_names=lp1" -F migration_state',
+                    'lssyscfg -r lpar -m dstsys --filter "lpar_names=lp1" -F name']
@@ -0,0 +1,189 @@
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+import xml.etree.ElementTree as ET
+import time
+import importlib
+
+IMPORT_INVENTORY = "ansible_collections.ibm.power_hmc.plugins.inventory.powervm_inventory"
+
+
+class FakeRestClient:
+
+    def __init__(self, hmc, user, password):
+        self.hmc = hmc
+
+    def getManagedSystemsQuick(self):
+        return json.dumps([{'SystemName': '{0}_sys{1}'.format(self.hmc, i), 'UUID': '{0}-{1}'.format(self.hmc, i)} for i in range(4)])
+
+    def fetchTaggedGroupMembership(self):
+        return {'lpar_{0}-0'.format(self.hmc): ['prod'], '{0}-0'.format(self.hmc): ['prod', 'db']}
+
+    def getLogicalPartitionsQuick(self, system_uuid):
+        # answer the first systems last so a completion ordered result would be reversed
+        time.sleep(0.01 * (4 - int(system_uuid[-1])))
+        return json.dumps([{'PartitionName': 'lpar_' + system_uuid, 'UUID': 'lpar_' + system_uuid}])
+
+    def getVirtualIOServersQuick(self, system_uuid):
+        return json.dumps([])
+
+    def logoff(self):
+        pass
+
+
+def common_mock_setup(mocker):
+    powervm_inventory = importlib.import_module(IMPORT_INVENTORY)
+    mocker.patch.object(powervm_inventory, 'HmcRestClient', FakeRestClient)
+    inventory = powervm_inventory.InventoryModule()
+    inventory.template_handle = mocker.Mock()
+    inventory.template_handle.is_template.return_value = False
+    inventory.get_option = mocker.Mock(return_value=None)
+    inventory.exclude_system = []
+    inventory.advanced_fields = False
+    inventory.incremental_refresh = False
+    return inventory
+
+
+def test_concurrent_fetch_keeps_order(mocker):
+    inventory = common_mock_setup(mocker)
+    inventory.hmc_hosts = [{'hmc': 'hmc{0}'.format(i), 'user': 'hscroot', 'password': 'abc123'} for i in range(3)]
+    inventory.max_workers = 3
+    inventory.max_workers_per_hmc = 4
+    systems = inventory.get_lpars_by_system()
+    assert [system['SystemName'] for system in systems] == ['hmc{0}_sys{1}'.format(h, i) for h in range(3) for i in range(4)]
+    assert [system['lpars'][0]['PartitionName'] for system in systems] == ['lpar_hmc{0}-{1}'.format(h, i) for h in range(3) for i in range(4)]
+    assert systems[0]['lpars'][0]['AssociatedHMC'] == 'hmc0'
+    assert [system['AssociatedGroups'] for system in systems[:2]] == [['prod', 'db'], []]
+    assert [system['lpars'][0]['AssociatedGroups'] for system in systems[:2]] == [['prod'], []]
+
+
+def test_systems_served_from_cache(mocker):
+    inventory = common_mock_setup(mocker)
+    inventory._cache = {}
+    inventory.get_cache_key = mocker.Mock(return_value='key')
+    inventory.get_option = mocker.Mock(side_effect=lambda option: option == 'cache')
+    fetch = mocker.patch.object(inventory, 'get_lpars_by_system', return_value=[{'SystemName': 'sys1', 'lpars': []}])
+
+    # first run misses the cache and fills it
+    assert inventory.get_systems('path', cache=True) == [{'SystemName': 'sys1', 'lpars': []}]
+    assert fetch.call_count == 1
+    assert inventory._cache['key'] == [{'SystemName': 'sys1', 'lpars': []}]
+
+    # second run is served from the cache
+    inventory.get_systems('path', cache=True)
+    assert fetch.call_count == 1
+
+    # --flush-cache refetches and updates the cache
+    fetch.return_value = [{'SystemName': 'sys2', 'lpars': []}]
+    assert inventory.get_systems('path', cache=False) == [{'SystemName': 'sys2', 'lpars': []}]
+    assert fetch.call_count == 2
+    assert inventory._cache['key'] == [{'SystemName': 'sys2', 'lpars': []}]
+
+
+def test_incremental_refresh_fetches_changed_systems(mocker):
+    inventory = common_mock_setup(mocker)
+    inventory._cache = {}
+    inventory.get_cache_key = mocker.Mock(return_value='key')
+    inventory.get_option = mocker.Mock(side_effect=lambda option: option == 'cache')
+    inventory.hmc_hosts = [{'hmc': 'hmc0', 'user': 'hscroot', 'password': 'abc123'}]
+    inventory.max_workers = 1
+    inventory.max_workers_per_hmc = 2
+    inventory.incremental_refresh = True
+    inventory.incremental_max_age = 3600
+    fetch = mocker.spy(FakeRestClient, 'getLogicalPartitionsQuick')
+
+    first = inventory.get_systems('path', cache=True)
+    assert fetch.call_count == 4
+
+    # nothing changed, every system is served from the snapshot
+    assert inventory.get_systems('path', cache=True) == first
+    assert fetch.call_count == 4
+
+    # one system changed its quick properties, only that one is fetched again
+    quick = FakeRestClient.getManagedSystemsQuick
+
+    def changed_quick(self):
+        systems = json.loads(quick(self))
+        systems[2]['CurrentAvailableSystemMemory'] = 1024
+        return json.dumps(systems)
+    mocker.patch.object(FakeRestClient, 'getManagedSystemsQuick', changed_quick)
+    systems = inventory.get_systems('path', cache=True)
+    assert fetch.call_count == 5
+    assert fetch.call_args[0][1] == 'hmc0-2'
+    assert [system['SystemName'] for system in systems] == ['hmc0_sys{0}'.format(i) for i in range(4)]
+    assert systems[1]['lpars'] == first[1]['lpars']
+
+
+LPAR_FEED = b'''<feed xmlns="http://www.w3.org/2005/Atom" xmlns:ns2="http://a9.com/-/spec/opensearch/1.1/">
+<id>feed-id</id>
+<title>LogicalPartition</title>
+{0}
+</feed>'''
+
+LPAR_ENTRY = '''<entry>
+<id>uuid-{0}</id>
+<title>LogicalPartition</title>
+<content type="application/vnd.ibm.powervm.uom+xml; type=LogicalPartition">
+<LogicalPartition:LogicalPartition xmlns:LogicalPartition="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/"
+ xmlns="http://www.ibm.com/xmlns/systems/power/firmware/uom/mc/2012_10/">
+<PartitionName>lpar{0}</PartitionName>
+<PartitionType>AIX/Linux</PartitionType>
+<PartitionState>running</PartitionState>
+<PartitionMemoryConfiguration><CurrentMemory>{1}</CurrentMemory></PartitionMemoryConfiguration>
+<ResourceMonitoringIPAddress>10.0.0.{0}</ResourceMonitoringIPAddress>
+</LogicalPartition:LogicalPartition>
+</content>
+</entry>'''
+
+
+def lpar_feed(count):
+    return LPAR_FEED.replace(b'{0}', ''.join(LPAR_ENTRY.format(i, 1024 * i) for i in range(count)).encode())
+
+
+def tag_text(e):
+    # Recursive flattening of a parsed entry, the reference for the streaming parser
+    lpar_data = {}
+    for child in e:
+        if child.text is None or child.text.strip() == "":
+            lpar_data.update(tag_text(child))
+        else:
+            lpar_data[child.tag.split("}")[-1]] = child.text
+    return lpar_data
+
+
+def test_streaming_parser_matches_tree_parser(mocker):
+    inventory = common_mock_setup(mocker)
+    xml = lpar_feed(5)
+    root = ET.fromstring(xml)
+    expected = [tag_text(entry) for entry in root.findall("{http://www.w3.org/2005/Atom}entry")]
+    assert list(inventory.iter_lpars_xml(xml)) == expected
+    assert [list(lpar.items()) for lpar in inventory.iter_lpars_xml(xml)] == [list(lpar.items()) for lpar in expected]
+    assert expected[3]['CurrentMemory'] == '3072'
+
+
+def test_parser_keeps_referenced_fields(mocker):
+    inventory = common_mock_setup(mocker)
+    inventory.compose = {'memory': 'CurrentMemory'}
+    inventory.groups = {}
+    inventory.keyed_groups = []
+    inventory.filters = {}
+    inventory.identify_unknown_by = 'omit'
+    inventory.fields = []
+    inventory.referenced_fields_only = True
+    inventory.lpar_fields = inventory.get_lpar_fields()
+    lpars = inventory.parse_lpars_xml(lpar_feed(2), 'hmc0', 'hscroot', 'sys0')
+    assert sorted(lpars[1]) == ['AssociatedHMC', 'AssociatedHMCUserName', 'CurrentMemory', 'PartitionName', 'PartitionState',
+                                'PartitionType', 'ResourceMonitoringIPAddress', 'SystemName', 'id']
+
+
+def test_parser_keeps_listed_fields(mocker):
+    inventory = common_mock_setup(mocker)
+    inventory.identify_unknown_by = 'omit'
+    inventory.fields = ['CurrentMemory']
+    inventory.referenced_fields_only = False
+    inventory.lpar_fields = inventory.get_lpar_fields()
+    lpars = list(inventory.iter_lpars_xml(lpar_feed(3), inventory.lpar_fields))
+    assert lpars[2] == {'id': 'uuid-2', 'PartitionName': 'lpar2', 'PartitionType': 'AIX/Linux', 'PartitionState': 'running',
+                        'CurrentMemory': '2048', 'ResourceMonitoringIPAddress': '10.0.0.2'}
+    assert inventory.tag_lookup['{http://www.w3.org/2005/Atom}title'] is None